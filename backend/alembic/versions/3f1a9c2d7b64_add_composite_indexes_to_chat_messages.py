@@ -0,0 +1,45 @@
+"""add composite indexes to chat_messages
+
+Revision ID: 3f1a9c2d7b64
+Revises: 8c09c972aff4
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b64'
+down_revision = '8c09c972aff4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Índices compostos para os padrões de acesso do histórico"""
+    # Histórico por conversa: WHERE conversation_id = ? ORDER BY created_at, id
+    op.create_index(
+        'ix_chat_messages_conversation_created_id',
+        'chat_messages',
+        ['conversation_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+    # Contexto do LLM: WHERE user_id = ? ORDER BY created_at DESC LIMIT 5
+    op.create_index(
+        'ix_chat_messages_user_created',
+        'chat_messages',
+        ['user_id', 'created_at'],
+        unique=False,
+    )
+
+    # Prefixo do índice composto: o índice simples só custava escrita
+    op.drop_index(op.f('ix_chat_messages_conversation_id'), table_name='chat_messages')
+
+
+def downgrade():
+    """Voltar ao índice simples em conversation_id"""
+    op.create_index(op.f('ix_chat_messages_conversation_id'), 'chat_messages', ['conversation_id'], unique=False)
+    op.drop_index('ix_chat_messages_user_created', table_name='chat_messages')
+    op.drop_index('ix_chat_messages_conversation_created_id', table_name='chat_messages')
@@ -37,8 +37,8 @@ def upgrade():
     op.execute("""
         INSERT INTO conversations (user_id, title, created_at, updated_at)
         SELECT DISTINCT user_id, 'Conversa Principal', 
-               COALESCE(MIN(created_at), NOW()), 
-               COALESCE(MAX(created_at), NOW())
+               COALESCE(MIN(created_at), CURRENT_TIMESTAMP), 
+               COALESCE(MAX(created_at), CURRENT_TIMESTAMP)
         FROM chat_messages
         GROUP BY user_id
     """)
@@ -53,26 +53,28 @@ def upgrade():
         )
     """)
     
-    # Tornar conversation_id NOT NULL
-    op.alter_column('chat_messages', 'conversation_id', nullable=False)
-    
-    # Adicionar FK e índice
-    op.create_foreign_key(
-        'fk_chat_messages_conversation_id',
-        'chat_messages', 'conversations',
-        ['conversation_id'], ['id'],
-        ondelete='CASCADE'
-    )
+    # Tornar conversation_id NOT NULL e adicionar FK (batch: no SQLite a
+    # tabela é recriada; nos outros bancos são ALTERs normais)
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.alter_column('conversation_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            'fk_chat_messages_conversation_id',
+            'conversations',
+            ['conversation_id'], ['id'],
+            ondelete='CASCADE'
+        )
+
+    # Índice
     op.create_index(op.f('ix_chat_messages_conversation_id'), 'chat_messages', ['conversation_id'], unique=False)
 
 
 def downgrade():
     # Remover índice e FK
     op.drop_index(op.f('ix_chat_messages_conversation_id'), table_name='chat_messages')
-    op.drop_constraint('fk_chat_messages_conversation_id', 'chat_messages', type_='foreignkey')
-    
-    # Remover coluna
-    op.drop_column('chat_messages', 'conversation_id')
+    # Remover FK e coluna
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.drop_constraint('fk_chat_messages_conversation_id', type_='foreignkey')
+        batch_op.drop_column('conversation_id')
     
     # Remover tabela conversations
     op.drop_index(op.f('ix_conversations_user_id'), table_name='conversations')
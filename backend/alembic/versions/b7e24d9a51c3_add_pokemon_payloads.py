@@ -0,0 +1,161 @@
+"""add deduplicated pokemon_payloads
+
+Revision ID: b7e24d9a51c3
+Revises: 3f1a9c2d7b64
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import hashlib
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e24d9a51c3'
+down_revision = '3f1a9c2d7b64'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# Mesmo formato de app.services.payload_service, copiado para a migração não
+# depender do código da aplicação
+REF_KEY = '$ref'
+CARD_LISTS = ('pokemon_list', 'team_list')
+
+chat_messages = sa.table(
+    'chat_messages',
+    sa.column('id', sa.Integer),
+    sa.column('pokemon_data', sa.JSON),
+    sa.column('pokemon_payload_hash', sa.String),
+)
+pokemon_payloads = sa.table(
+    'pokemon_payloads',
+    sa.column('hash', sa.String),
+    sa.column('data', sa.LargeBinary),
+)
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _pack(pokemon_data):
+    blobs = {}
+    skeleton = dict(pokemon_data)
+    has_cards = False
+    for list_key in CARD_LISTS:
+        cards = pokemon_data.get(list_key)
+        if not isinstance(cards, list):
+            continue
+        refs = []
+        for card in cards:
+            raw = _canonical(card)
+            card_hash = hashlib.sha256(raw).hexdigest()
+            blobs[card_hash] = raw
+            refs.append({REF_KEY: card_hash})
+        skeleton[list_key] = refs
+        has_cards = True
+    raw = _canonical(skeleton if has_cards else pokemon_data)
+    key = hashlib.sha256(raw).hexdigest()
+    blobs[key] = raw
+    return key, blobs
+
+
+def upgrade():
+    """Tabela de payloads endereçados por conteúdo e migração do JSON inline"""
+    op.create_table(
+        'pokemon_payloads',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('hash'),
+    )
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.add_column(sa.Column('pokemon_payload_hash', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_chat_messages_pokemon_payload_hash',
+            'pokemon_payloads',
+            ['pokemon_payload_hash'], ['hash'],
+        )
+
+    # Backfill em lotes: grava os payloads (sem duplicar) e troca o JSON
+    # inline pela chave
+    connection = op.get_bind()
+    known = set()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(chat_messages.c.id, chat_messages.c.pokemon_data)
+            .where(chat_messages.c.id > last_id, chat_messages.c.pokemon_data.isnot(None))
+            .order_by(chat_messages.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        new_payloads = {}
+        updates = []
+        for row in rows:
+            if not row.pokemon_data:
+                continue
+            key, blobs = _pack(row.pokemon_data)
+            for payload_hash, raw in blobs.items():
+                if payload_hash not in known:
+                    new_payloads[payload_hash] = raw
+            updates.append({'message_id': row.id, 'payload_hash': key})
+
+        if new_payloads:
+            connection.execute(
+                pokemon_payloads.insert(),
+                [{'hash': h, 'data': zlib.compress(raw)} for h, raw in new_payloads.items()],
+            )
+            known.update(new_payloads)
+
+        if updates:
+            connection.execute(
+                chat_messages.update()
+                .where(chat_messages.c.id == sa.bindparam('message_id'))
+                .values(pokemon_payload_hash=sa.bindparam('payload_hash'), pokemon_data=sa.null()),
+                updates,
+            )
+
+
+def downgrade():
+    """Devolver o JSON inline às mensagens e remover a tabela de payloads"""
+    connection = op.get_bind()
+    payloads = {
+        row.hash: json.loads(zlib.decompress(row.data))
+        for row in connection.execute(sa.select(pokemon_payloads.c.hash, pokemon_payloads.c.data))
+    }
+
+    def hydrate(key):
+        value = dict(payloads[key])
+        for list_key in CARD_LISTS:
+            items = value.get(list_key)
+            if isinstance(items, list):
+                value[list_key] = [
+                    payloads[item[REF_KEY]] if isinstance(item, dict) and REF_KEY in item else item
+                    for item in items
+                ]
+        return value
+
+    rows = connection.execute(
+        sa.select(chat_messages.c.id, chat_messages.c.pokemon_payload_hash)
+        .where(chat_messages.c.pokemon_payload_hash.isnot(None))
+    ).fetchall()
+    for row in rows:
+        connection.execute(
+            chat_messages.update()
+            .where(chat_messages.c.id == row.id)
+            .values(pokemon_data=hydrate(row.pokemon_payload_hash))
+        )
+
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.drop_constraint('fk_chat_messages_pokemon_payload_hash', type_='foreignkey')
+        batch_op.drop_column('pokemon_payload_hash')
+    op.drop_table('pokemon_payloads')
@@ -0,0 +1,70 @@
+"""server-side timestamps for chat_messages
+
+Revision ID: d41f6a8e2b90
+Revises: b7e24d9a51c3
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f6a8e2b90'
+down_revision = 'b7e24d9a51c3'
+branch_labels = None
+depends_on = None
+
+# Mesmas expressões de app.db.models.utcnow, copiadas para a migração não
+# depender do código da aplicação. No SQLite o texto segue o formato em que
+# o SQLAlchemy grava DateTime (6 casas de microssegundos)
+UTCNOW_DEFAULTS = {
+    'postgresql': "TIMEZONE('utc', CURRENT_TIMESTAMP)",
+    'sqlite': "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))",
+}
+
+
+def _utcnow_default():
+    dialect = op.get_bind().dialect.name
+    return sa.text(UTCNOW_DEFAULTS.get(dialect, 'CURRENT_TIMESTAMP'))
+
+
+def upgrade():
+    """created_at gerado pelo banco e id como desempate no índice por usuário"""
+    # batch: no SQLite o default só muda recriando a tabela; nos outros
+    # bancos é o ALTER COLUMN de sempre
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.alter_column(
+            'created_at',
+            existing_type=sa.DateTime(),
+            existing_nullable=False,
+            server_default=_utcnow_default(),
+        )
+
+    # Mensagem do usuário e do bot são gravadas na mesma transação e recebem o
+    # mesmo created_at; o id garante a ordem no contexto do LLM
+    op.create_index(
+        'ix_chat_messages_user_created_id',
+        'chat_messages',
+        ['user_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.drop_index('ix_chat_messages_user_created', table_name='chat_messages')
+
+
+def downgrade():
+    """Voltar ao created_at preenchido pela aplicação"""
+    op.create_index(
+        'ix_chat_messages_user_created',
+        'chat_messages',
+        ['user_id', 'created_at'],
+        unique=False,
+    )
+    op.drop_index('ix_chat_messages_user_created_id', table_name='chat_messages')
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.alter_column(
+            'created_at',
+            existing_type=sa.DateTime(),
+            existing_nullable=False,
+            server_default=None,
+        )
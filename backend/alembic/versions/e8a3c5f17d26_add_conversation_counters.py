@@ -0,0 +1,112 @@
+"""add message_count and last_message_preview to conversations
+
+Revision ID: e8a3c5f17d26
+Revises: d41f6a8e2b90
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a3c5f17d26'
+down_revision = 'd41f6a8e2b90'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# Mesma regra de app.services.conversation_service.make_preview, copiada
+# para a migração não depender do código da aplicação
+PREVIEW_LENGTH = 120
+
+
+def _make_preview(content):
+    clean = " ".join(content.split())
+    if len(clean) <= PREVIEW_LENGTH:
+        return clean
+    return clean[: PREVIEW_LENGTH - 3].rstrip() + "..."
+
+
+conversations = sa.table(
+    'conversations',
+    sa.column('id', sa.Integer),
+    sa.column('message_count', sa.Integer),
+    sa.column('last_message_preview', sa.String),
+)
+chat_messages = sa.table(
+    'chat_messages',
+    sa.column('id', sa.Integer),
+    sa.column('conversation_id', sa.Integer),
+    sa.column('content', sa.Text),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def upgrade():
+    """Contadores desnormalizados e índice da sidebar"""
+    op.add_column('conversations', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('conversations', sa.Column('last_message_preview', sa.String(length=255), nullable=True))
+
+    # Backfill em lotes de conversas. O preview passa pela mesma função do
+    # runtime, então linhas antigas e novas ficam iguais
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        ids = connection.execute(
+            sa.select(conversations.c.id)
+            .where(conversations.c.id > last_id)
+            .order_by(conversations.c.id)
+            .limit(BATCH_SIZE)
+        ).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        counts = dict(
+            connection.execute(
+                sa.select(chat_messages.c.conversation_id, sa.func.count())
+                .where(chat_messages.c.conversation_id.in_(ids))
+                .group_by(chat_messages.c.conversation_id)
+            ).fetchall()
+        )
+
+        updates = []
+        for conversation_id in ids:
+            last_content = None
+            if counts.get(conversation_id):
+                # Range scan em (conversation_id, created_at, id)
+                last_content = connection.execute(
+                    sa.select(chat_messages.c.content)
+                    .where(chat_messages.c.conversation_id == conversation_id)
+                    .order_by(chat_messages.c.created_at.desc(), chat_messages.c.id.desc())
+                    .limit(1)
+                ).scalar()
+            updates.append({
+                'conversation_id': conversation_id,
+                'count': counts.get(conversation_id, 0),
+                'preview': _make_preview(last_content) if last_content is not None else None,
+            })
+
+        connection.execute(
+            conversations.update()
+            .where(conversations.c.id == sa.bindparam('conversation_id'))
+            .values(
+                message_count=sa.bindparam('count'),
+                last_message_preview=sa.bindparam('preview'),
+            ),
+            updates,
+        )
+
+    # Sidebar: WHERE user_id = ? ORDER BY updated_at DESC
+    op.create_index('ix_conversations_user_updated', 'conversations', ['user_id', 'updated_at'], unique=False)
+    op.drop_index(op.f('ix_conversations_user_id'), table_name='conversations')
+
+
+def downgrade():
+    """Remover contadores e voltar ao índice simples em user_id"""
+    op.create_index(op.f('ix_conversations_user_id'), 'conversations', ['user_id'], unique=False)
+    op.drop_index('ix_conversations_user_updated', table_name='conversations')
+    op.drop_column('conversations', 'last_message_preview')
+    op.drop_column('conversations', 'message_count')
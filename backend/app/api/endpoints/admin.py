@@ -0,0 +1,138 @@
+"""
+Endpoints administrativos (diagnóstico)
+
+Protegidos pelo header X-Admin-Token, comparado com ADMIN_TOKEN. Sem
+ADMIN_TOKEN configurado as rotas respondem 404, como se não existissem.
+"""
+
+import asyncio
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiler import StackSampler, format_collapsed, get_profile, profile_store
+from app.core.security import is_admin_token
+from app.core.tracing import trace_store
+
+router = APIRouter()
+
+# Um profile de worker por vez: dois samplers só dobrariam o custo
+_profile_lock = asyncio.Lock()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Token de admin inválido"
+        )
+
+
+@router.get("/traces", dependencies=[Depends(require_admin)])
+async def list_traces(
+    limit: int = Query(50, ge=1, le=1000),
+    min_duration_ms: float = Query(0, ge=0),
+    name: Optional[str] = None,
+):
+    """
+    Resumo dos traces mais recentes (ring buffer), do mais novo ao mais antigo
+
+    name filtra pelo começo do nome do span raiz, ex.: "POST /api/chat".
+    """
+    traces = [
+        trace.summary()
+        for trace in reversed(trace_store.recent)
+        if trace.duration_ms >= min_duration_ms
+        and (name is None or trace.root.name.startswith(name))
+    ]
+    return {"traces": traces[:limit], "buffered": len(trace_store.recent)}
+
+
+@router.get("/traces/slow", dependencies=[Depends(require_admin)])
+async def slowest_traces(full: bool = False):
+    """Os TRACE_SLOW_KEEP traces mais lentos; full=true inclui a árvore de spans"""
+    return {
+        "traces": [
+            trace.to_dict() if full else {**trace.summary(), "breakdown": trace.breakdown()}
+            for trace in trace_store.slowest()
+        ]
+    }
+
+
+@router.get("/traces/{trace_id}", dependencies=[Depends(require_admin)])
+async def get_trace(trace_id: str):
+    """Trace completo: resumo, tempo agregado por nome de span e árvore de spans"""
+    trace = trace_store.get(trace_id)
+    if trace is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Trace não encontrado"
+        )
+    return trace.to_dict()
+
+
+@router.delete("/traces", dependencies=[Depends(require_admin)])
+async def clear_traces():
+    trace_store.clear()
+    return {"message": "Traces removidos"}
+
+
+@router.get(
+    "/profile", dependencies=[Depends(require_admin)], response_class=PlainTextResponse
+)
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(settings.PROFILE_INTERVAL_MS, ge=1, le=1000),
+    all_threads: bool = False,
+):
+    """
+    Amostra o worker por N segundos e devolve as pilhas no formato collapsed
+
+    Por padrão só a thread do event loop; all_threads=true inclui o pool de
+    threads (bcrypt etc.), com o nome da thread no começo de cada pilha.
+
+        curl -s ".../api/admin/profile?seconds=30" -H "X-Admin-Token: ..." > out.folded
+        flamegraph.pl out.folded > out.svg
+    """
+    if _profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Já existe um profile em andamento"
+        )
+    async with _profile_lock:
+        sampler = StackSampler(
+            interval_ms / 1000,
+            thread_ids=None if all_threads else [threading.get_ident()],
+        ).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+
+    return PlainTextResponse(
+        format_collapsed(sampler.counts),
+        headers={"X-Profile-Samples": str(sampler.samples)},
+    )
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Perfis das requisições feitas com X-Profile: 1 (mais recentes primeiro)"""
+    return {"profiles": [profile.summary() for profile in reversed(profile_store)]}
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    dependencies=[Depends(require_admin)],
+    response_class=PlainTextResponse,
+)
+async def get_request_profile(profile_id: str):
+    """Pilhas (collapsed) de uma requisição profilada; o id vem em X-Profile-Id"""
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile não encontrado"
+        )
+    return PlainTextResponse(format_collapsed(profile.counts))
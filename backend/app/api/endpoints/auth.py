@@ -1,18 +1,23 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from pydantic import BaseModel, EmailStr
 from app.db.database import get_db
 from app.db.models import User
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    hash_password,
+    verify_and_update_password,
     create_access_token,
     get_current_user,
+    Principal,
 )
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -24,39 +29,42 @@ class RegisterRequest(BaseModel):
 
 
 @router.post("/register")
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
     """Registra um novo usuário"""
-    print(f"📝 [AUTH] Tentativa de registro: {request.username} ({request.email})")
+    logger.debug("📝 Tentativa de registro: %s (%s)", request.username, request.email)
 
     # Verificar se username ou email já existem
-    existing_user = (
-        db.query(User)
-        .filter((User.username == request.username) | (User.email == request.email))
-        .first()
+    result = await db.execute(
+        select(User)
+        .where((User.username == request.username) | (User.email == request.email))
+        .limit(1)
     )
+    existing_user = result.scalar_one_or_none()
 
     if existing_user:
         if existing_user.username == request.username:
-            print(f"❌ [AUTH] Username já existe: {request.username}")
+            logger.warning("❌ Username já existe: %s", request.username)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário já existe"
             )
         else:
-            print(f"❌ [AUTH] Email já cadastrado: {request.email}")
+            logger.warning("❌ Email já cadastrado: %s", request.email)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Email já cadastrado"
             )
 
-    hashed_password = get_password_hash(request.password)
+    hashed_password = await hash_password(request.password)
     new_user = User(
         username=request.username, email=request.email, hashed_password=hashed_password
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
-    print(
-        f"✅ [AUTH] Usuário criado: {request.username} (ID: {new_user.id}, Email: {request.email})"
+    logger.info(
+        "✅ Usuário criado: %s (ID: %s, Email: %s)",
+        request.username,
+        new_user.id,
+        request.email,
     )
 
     return {
@@ -71,34 +79,45 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 @router.post("/login")
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
     """Login do usuário"""
-    print(f"📝 [AUTH] Tentativa de login: {form_data.username}")
+    logger.debug("📝 Tentativa de login: %s", form_data.username)
 
-    user = db.query(User).filter(User.username == form_data.username).first()
+    result = await db.execute(select(User).where(User.username == form_data.username))
+    user = result.scalar_one_or_none()
 
     if not user:
-        print(f"❌ [AUTH] Usuário não encontrado: {form_data.username}")
+        logger.warning("❌ Usuário não encontrado: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha incorretos",
         )
 
-    if not verify_password(form_data.password, user.hashed_password):
-        print(f"❌ [AUTH] Senha incorreta para: {form_data.username}")
+    valid, new_hash = await verify_and_update_password(
+        form_data.password, user.hashed_password
+    )
+    if not valid:
+        logger.warning("❌ Senha incorreta para: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha incorretos",
         )
 
+    # Custo do bcrypt mudou desde que a senha foi salva: regrava o hash
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        logger.info("🔐 Hash da senha atualizado para: %s", user.username)
+
     # Criar token com username
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id},
+        expires_delta=access_token_expires,
     )
 
-    print(f"✅ [AUTH] Login bem-sucedido: {user.username} (ID: {user.id})")
+    logger.info("✅ Login bem-sucedido: %s (ID: %s)", user.username, user.id)
 
     return {
         "access_token": access_token,
@@ -108,14 +127,16 @@ async def login(
 
 
 @router.post("/refresh")
-async def refresh_token(current_user: User = Depends(get_current_user)):
+async def refresh_token(current_user: Principal = Depends(get_current_user)):
     """Renova o token JWT do usuário"""
-    print(f"🔄 [AUTH] Renovando token para: {current_user.username}")
+    logger.debug("🔄 Renovando token para: %s", current_user.username)
 
     # Criar novo token com username
-    access_token = create_access_token(data={"sub": current_user.username})
+    access_token = create_access_token(
+        data={"sub": current_user.username, "uid": current_user.id}
+    )
 
-    print(f"✅ [AUTH] Token renovado para: {current_user.username}")
+    logger.debug("✅ Token renovado para: %s", current_user.username)
 
     return {
         "access_token": access_token,
@@ -123,16 +144,16 @@ async def refresh_token(current_user: User = Depends(get_current_user)):
         "user": {
             "id": current_user.id,
             "username": current_user.username,
-            "email": current_user.email if hasattr(current_user, "email") else None,
+            "email": current_user.email,
         },
     }
 
 
 @router.get("/me")
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     """Retorna informações do usuário atual"""
     return {
         "id": current_user.id,
         "username": current_user.username,
-        "email": current_user.email if hasattr(current_user, "email") else None,
+        "email": current_user.email,
     }
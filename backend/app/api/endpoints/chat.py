@@ -2,20 +2,42 @@
 Endpoints de Chat
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from datetime import datetime
 from app.db.database import get_db
-from app.db.models import User, ChatMessage, Conversation
-from app.core.security import get_current_user
-from app.services.chat_service import chat_service
+from app.db.models import ChatMessage, Conversation
+from app.core.config import settings
+from app.core.deadline import (
+    ClientDisconnected,
+    Deadline,
+    cancel_on_disconnect,
+    wait_with_deadline,
+)
+from app.core.logging import SAMPLED
+from app.core.metrics import CHAT_ERRORS, CHAT_FALLBACKS, CHAT_STAGE
+from app.core.tracing import span
+from app.core.responses import FastJSONResponse
+from app.core.security import Principal, get_current_user
+from app.schemas.chat import BotMessage, HistoryResponse, SentMessage
+from app.services.chat_service import chat_service, record_pokemon_lookups
 from app.services.conversation_service import conversation_service
+from app.services.payload_service import payload_service
 from pydantic import BaseModel
+from contextlib import contextmanager
+import asyncio
 import re
+import time
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Status usado (como no nginx) quando o cliente fecha a conexão antes da resposta
+HTTP_CLIENT_CLOSED_REQUEST = 499
+
 
 class MessageRequest(BaseModel):
     message: str
@@ -23,8 +45,8 @@ class MessageRequest(BaseModel):
 
 
 class MessageResponse(BaseModel):
-    user_message: dict
-    bot_response: dict
+    user_message: SentMessage
+    bot_response: BotMessage
     conversation_id: int
     conversation_title: Optional[str] = None  # ← retorna título se foi gerado
 
@@ -115,49 +137,122 @@ def generate_title(message: str, pokemon_data: Optional[dict]) -> str:
     return clean[:35] + ("..." if len(clean) > 35 else "")
 
 
-@router.post("/message", response_model=MessageResponse)
+@contextmanager
+def _stage(name: str):
+    """Etapa do turno do chat: chat_stage_duration_seconds{stage} e span chat.<etapa>"""
+    with CHAT_STAGE.time(stage=name), span(f"chat.{name}"):
+        yield
+
+
+# Os handlers devolvem FastJSONResponse pronta: o schema só documenta a
+# resposta (responses=), não é aplicado como response_model
+@router.post("/message", responses={200: {"model": MessageResponse}})
 async def send_message(
     request: MessageRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    http_request: Request,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    print(f"💬 [CHAT] Mensagem de {current_user.username}: {request.message[:50]}...")
+    # O deadline começa a contar na chegada da requisição e limita
+    # detecção de Pokémon + geração do LLM
+    deadline = Deadline(settings.CHAT_REQUEST_TIMEOUT_SECONDS)
+    started = time.perf_counter()
+    try:
+        return await _send_message(request, http_request, current_user, db, deadline)
+    finally:
+        CHAT_STAGE.observe(time.perf_counter() - started, stage="total")
+
+
+async def _send_message(
+    request: MessageRequest,
+    http_request: Request,
+    current_user: Principal,
+    db: AsyncSession,
+    deadline: Deadline,
+) -> FastJSONResponse:
+    """Um turno do chat; cada etapa alimenta chat_stage_duration_seconds"""
+
+    logger.info(
+        "💬 Mensagem de %s: %s...",
+        current_user.username,
+        request.message[:50],
+        extra=SAMPLED,
+    )
 
     # Obter ou criar conversa
-    if request.conversation_id:
-        conversation = conversation_service.get_conversation_by_id(
-            db, request.conversation_id, current_user.id
-        )
-        if not conversation:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Conversa não encontrada"
+    with _stage("conversation"):
+        if request.conversation_id:
+            conversation = await conversation_service.get_conversation_by_id(
+                db, request.conversation_id, current_user.id
             )
-    else:
-        conversation = conversation_service.get_or_create_default_conversation(
-            db, current_user.id
+        else:
+            conversation = await conversation_service.get_or_create_default_conversation(
+                db, current_user.id
+            )
+            logger.debug("📝 Usando conversa padrão ID: %s", conversation.id)
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Conversa não encontrada"
         )
-        print(f"📝 [CHAT] Usando conversa padrão ID: {conversation.id}")
 
     # Verificar se é a primeira mensagem da conversa (para gerar título)
-    existing_messages = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.conversation_id == conversation.id)
-        .count()
-    )
-    is_first_message = existing_messages == 0
+    is_first_message = conversation.message_count == 0
 
-    # Detectar Pokémon e construir contexto
-    pokemon_data = await chat_service._detect_and_fetch_pokemon(request.message)
-    history = chat_service._get_chat_history(current_user.id, db)
-    context = chat_service._build_context(history, pokemon_data)
+    # Detectar Pokémon e construir contexto (inclui as buscas na PokéAPI,
+    # medidas também em pokeapi_request_duration_seconds)
+    try:
+        with _stage("detection"):
+            pokemon_data = await cancel_on_disconnect(
+                http_request,
+                wait_with_deadline(
+                    chat_service._detect_and_fetch_pokemon(request.message),
+                    deadline,
+                    reserve=settings.CHAT_PERSISTENCE_RESERVE_SECONDS,
+                ),
+            )
+    except asyncio.TimeoutError:
+        logger.warning("⏱️ Deadline estourado na detecção de Pokémon")
+        CHAT_FALLBACKS.inc(reason="detection_timeout")
+        pokemon_data = None
+    except ClientDisconnected:
+        logger.info("🔌 Cliente desconectou durante a detecção de Pokémon")
+        CHAT_ERRORS.inc(stage="detection", error="ClientDisconnected")
+        raise HTTPException(
+            status_code=HTTP_CLIENT_CLOSED_REQUEST, detail="Cliente desconectado"
+        )
+
+    record_pokemon_lookups(pokemon_data)
+
+    with _stage("history"):
+        history = await chat_service._get_chat_history(current_user.id, db)
+    context = chat_service._build_context(pokemon_data)
 
-    # Gerar resposta do LLM
+    # Gerar resposta do LLM (espera por vaga e geração em si ficam em
+    # llm_queue_wait_seconds e llm_generation_seconds)
     try:
-        bot_response_text = await chat_service.llama.generate_response(
-            user_message=request.message, context=context
+        with _stage("llm"):
+            bot_response_text = await cancel_on_disconnect(
+                http_request,
+                chat_service.llama.generate_response(
+                    user_message=request.message,
+                    context=context,
+                    history=history,
+                    deadline=deadline,
+                    intent=chat_service.detect_intent(pokemon_data),
+                ),
+            )
+    except ClientDisconnected:
+        logger.info("🔌 Cliente desconectou, geração do LLM cancelada")
+        CHAT_ERRORS.inc(stage="llm", error="ClientDisconnected")
+        raise HTTPException(
+            status_code=HTTP_CLIENT_CLOSED_REQUEST, detail="Cliente desconectado"
         )
     except Exception as e:
-        print(f"❌ [CHAT] Erro ao gerar resposta do LLM: {e}")
+        logger.error("❌ Erro ao gerar resposta do LLM: %s", e)
+        CHAT_ERRORS.inc(stage="llm", error=type(e).__name__)
+        CHAT_FALLBACKS.inc(
+            reason="llm_timeout" if isinstance(e, asyncio.TimeoutError) else "llm_error"
+        )
         if pokemon_data:
             name = pokemon_data.get("name", "este Pokémon").title()
             bot_response_text = f"Aqui estão as informações sobre {name}! Veja os detalhes no card ao lado."
@@ -166,70 +261,77 @@ async def send_message(
                 "Desculpe, estou com dificuldades técnicas. Tente novamente!"
             )
 
-    # Salvar mensagem do usuário
-    user_message = ChatMessage(
-        conversation_id=conversation.id,
-        user_id=current_user.id,
-        content=request.message,
-        is_bot=False,
-    )
-    db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
-
-    # Salvar resposta do bot
-    bot_message = ChatMessage(
-        conversation_id=conversation.id,
-        user_id=current_user.id,
-        content=bot_response_text,
-        is_bot=True,
-        pokemon_data=pokemon_data,
-    )
-    db.add(bot_message)
-
     # Gerar título automático se for a primeira mensagem e o título for padrão
     new_title = None
     if is_first_message and conversation.title.lower().strip() in DEFAULT_TITLES:
         new_title = generate_title(request.message, pokemon_data)
         conversation.title = new_title
-        print(f"✏️ [CHAT] Título gerado automaticamente: '{new_title}'")
-
-    conversation.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(bot_message)
-
-    print(f"✅ [CHAT] Mensagens salvas na conversa {conversation.id}")
-
-    return MessageResponse(
-        user_message={
-            "id": user_message.id,
-            "content": user_message.content,
-            "timestamp": user_message.created_at.isoformat() + "Z",
-        },
-        bot_response={
-            "id": bot_message.id,
-            "content": bot_message.content,
-            "timestamp": bot_message.created_at.isoformat() + "Z",
-            "pokemon_data": pokemon_data,
-        },
-        conversation_id=conversation.id,
-        conversation_title=new_title,  # None se não foi atualizado
-    )
+        logger.debug("✏️ Título gerado automaticamente: '%s'", new_title)
+
+    # Persistência em uma única transação: as duas mensagens saem num único
+    # INSERT ... RETURNING (id e created_at gerados pelo banco) e o commit é
+    # o único round trip extra
+    with _stage("persistence"):
+        user_message = ChatMessage(
+            conversation_id=conversation.id,
+            user_id=current_user.id,
+            content=request.message,
+            is_bot=False,
+            pokemon_payload_hash=None,  # mesmas colunas do bot → um INSERT em lote
+        )
+        bot_message = ChatMessage(
+            conversation_id=conversation.id,
+            user_id=current_user.id,
+            content=bot_response_text,
+            is_bot=True,
+            pokemon_payload_hash=await payload_service.store(db, pokemon_data),
+        )
+        db.add_all([user_message, bot_message])
+        conversation_service.record_new_messages(conversation, 2, bot_response_text)
+        await db.commit()
 
+    logger.debug("✅ Mensagens salvas na conversa %s", conversation.id)
 
-@router.get("/history")
+    # Devolvida direto: pokemon_data já é JSON puro, sem validar de novo
+    # (FastJSONResponse serializa no construtor)
+    with _stage("serialization"):
+        response = FastJSONResponse(
+            {
+                "user_message": {
+                    "id": user_message.id,
+                    "content": user_message.content,
+                    "timestamp": user_message.created_at.isoformat() + "Z",
+                },
+                "bot_response": {
+                    "id": bot_message.id,
+                    "content": bot_message.content,
+                    "timestamp": bot_message.created_at.isoformat() + "Z",
+                    "pokemon_data": pokemon_data,
+                },
+                "conversation_id": conversation.id,
+                "conversation_title": new_title,  # None se não foi atualizado
+            }
+        )
+    return response
+
+
+@router.get("/history", responses={200: {"model": HistoryResponse}})
 async def get_history(
     conversation_id: Optional[int] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    before_id: Optional[int] = None,
+    limit: int = Query(
+        settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE
+    ),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     if not conversation_id:
-        conversation = conversation_service.get_or_create_default_conversation(
+        conversation = await conversation_service.get_or_create_default_conversation(
             db, current_user.id
         )
         conversation_id = conversation.id
     else:
-        conversation = conversation_service.get_conversation_by_id(
+        conversation = await conversation_service.get_conversation_by_id(
             db, conversation_id, current_user.id
         )
         if not conversation:
@@ -237,45 +339,49 @@ async def get_history(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Conversa não encontrada"
             )
 
-    messages = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.conversation_id == conversation_id)
-        .order_by(ChatMessage.created_at.asc())
-        .all()
+    messages, next_cursor = await conversation_service.get_messages_page(
+        db, conversation_id, before_id, limit
     )
 
-    print(
-        f"📜 [CHAT] Carregadas {len(messages)} mensagens da conversa {conversation_id}"
+    pokemon_payloads = await payload_service.hydrate(db, messages)
+
+    logger.debug(
+        "📜 Carregadas %s mensagens da conversa %s",
+        len(messages),
+        conversation_id,
     )
 
-    return {
-        "conversation_id": conversation_id,
-        "messages": [
-            {
-                "id": msg.id,
-                "content": msg.content,
-                "is_bot": msg.is_bot,
-                "timestamp": msg.created_at.isoformat() + "Z",
-                "pokemon_data": msg.pokemon_data,
-            }
-            for msg in messages
-        ],
-    }
+    return FastJSONResponse(
+        {
+            "conversation_id": conversation_id,
+            "next_cursor": next_cursor,
+            "messages": [
+                {
+                    "id": msg.id,
+                    "content": msg.content,
+                    "is_bot": msg.is_bot,
+                    "timestamp": msg.created_at.isoformat() + "Z",
+                    "pokemon_data": pokemon_payloads.get(msg.id),
+                }
+                for msg in messages
+            ],
+        }
+    )
 
 
 @router.delete("/history")
 async def clear_history(
     conversation_id: Optional[int] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     if not conversation_id:
-        conversation = conversation_service.get_or_create_default_conversation(
+        conversation = await conversation_service.get_or_create_default_conversation(
             db, current_user.id
         )
         conversation_id = conversation.id
     else:
-        conversation = conversation_service.get_conversation_by_id(
+        conversation = await conversation_service.get_conversation_by_id(
             db, conversation_id, current_user.id
         )
         if not conversation:
@@ -283,14 +389,18 @@ async def clear_history(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Conversa não encontrada"
             )
 
-    deleted_count = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.conversation_id == conversation_id)
-        .delete()
+    result = await db.execute(
+        delete(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+    )
+    deleted_count = result.rowcount
+    conversation_service.reset_counters(conversation)
+    await db.commit()
+
+    logger.info(
+        "🗑️ %s mensagens deletadas da conversa %s",
+        deleted_count,
+        conversation_id,
     )
-    db.commit()
-
-    print(f"🗑️ [CHAT] {deleted_count} mensagens deletadas da conversa {conversation_id}")
 
     return {
         "message": "Histórico limpo com sucesso",
@@ -300,26 +410,17 @@ async def clear_history(
 
 
 @router.get("/pokemon-list")
-async def get_pokemon_list():
-    """Retorna lista de Pokémon com sprites para o autocomplete"""
-    from app.services.chat_service import POKEMON_NAMES_CACHE, load_pokemon_names_cache
+async def get_pokemon_list(request: Request):
+    """
+    Retorna lista de Pokémon com sprites para o autocomplete
 
-    if not POKEMON_NAMES_CACHE:
-        await load_pokemon_names_cache()
+    O JSON (e suas versões gzip/brotli) é montado uma vez quando o cache de
+    nomes carrega; clientes que já têm a versão recebem 304 via If-None-Match.
+    """
+    from app.services import chat_service as chat_module
 
-    pokemon_with_sprites = []
-    for idx, name in enumerate(POKEMON_NAMES_CACHE, start=1):
-        pokemon_id = idx if idx <= 1025 else 10000 + (idx - 1025)
-        pokemon_with_sprites.append(
-            {
-                "name": name,
-                "sprite": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pokemon_id}.png",
-            }
-        )
+    if chat_module.POKEMON_LIST_PAYLOAD is None:
+        await chat_module.load_pokemon_names_cache()
 
-    mega_count = sum(1 for p in pokemon_with_sprites if "-mega" in p["name"])
-    print(
-        f"✅ [API] Retornando {len(pokemon_with_sprites)} Pokémon ({mega_count} Megas)"
-    )
+    return chat_module.POKEMON_LIST_PAYLOAD.response(request)
 
-    return {"pokemon": pokemon_with_sprites, "count": len(pokemon_with_sprites)}
@@ -4,25 +4,29 @@ Endpoints de Conversas
 API RESTful para gerenciar conversas dos usuários.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app.db.database import get_db
-from app.db.models import User, ChatMessage
-from app.core.security import get_current_user
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.security import Principal, get_current_user
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationUpdate,
     ConversationResponse,
     ConversationListResponse,
 )
+from app.schemas.chat import ConversationMessagesResponse
 from app.services.conversation_service import conversation_service
+from app.services.payload_service import payload_service
 
 router = APIRouter()
 
 
 @router.get("/", response_model=ConversationListResponse)
 async def list_conversations(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)
 ):
     """
     Lista todas as conversas do usuário autenticado
@@ -30,7 +34,9 @@ async def list_conversations(
     Returns:
         Lista de conversas com contagem de mensagens
     """
-    conversations = conversation_service.get_user_conversations(db, current_user.id)
+    conversations = await conversation_service.get_user_conversations(
+        db, current_user.id
+    )
 
     return ConversationListResponse(
         conversations=conversations, total=len(conversations)
@@ -42,8 +48,8 @@ async def list_conversations(
 )
 async def create_conversation(
     conversation: ConversationCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Cria nova conversa
@@ -54,11 +60,9 @@ async def create_conversation(
     Returns:
         Conversa criada
     """
-    new_conversation = conversation_service.create_conversation(
+    new_conversation = await conversation_service.create_conversation(
         db, current_user.id, conversation
     )
-    # ← REMOVIDO: new_conversation.message_count = 0
-    # message_count é calculado automaticamente pela property
 
     return new_conversation
 
@@ -67,8 +71,8 @@ async def create_conversation(
 async def update_conversation(
     conversation_id: int,
     update_data: ConversationUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Atualiza título da conversa
@@ -83,7 +87,7 @@ async def update_conversation(
     Raises:
         404: Conversa não encontrada ou não pertence ao usuário
     """
-    conversation = conversation_service.update_conversation(
+    conversation = await conversation_service.update_conversation(
         db, conversation_id, current_user.id, update_data
     )
 
@@ -98,8 +102,8 @@ async def update_conversation(
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Deleta conversa e todas as mensagens associadas
@@ -110,7 +114,7 @@ async def delete_conversation(
     Raises:
         404: Conversa não encontrada ou não pertence ao usuário
     """
-    success = conversation_service.delete_conversation(
+    success = await conversation_service.delete_conversation(
         db, conversation_id, current_user.id
     )
 
@@ -122,26 +126,36 @@ async def delete_conversation(
     return None
 
 
-@router.get("/{conversation_id}/messages")
+# Devolve FastJSONResponse pronta: o schema só documenta a resposta
+@router.get(
+    "/{conversation_id}/messages",
+    responses={200: {"model": ConversationMessagesResponse}},
+)
 async def get_conversation_messages(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    before_id: Optional[int] = None,
+    limit: int = Query(
+        settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE
+    ),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Obtém todas as mensagens de uma conversa
+    Obtém uma página de mensagens da conversa (as mais recentes primeiro)
 
     Args:
         conversation_id: ID da conversa
+        before_id: Cursor (next_cursor da página anterior) para mensagens mais antigas
+        limit: Tamanho da página
 
     Returns:
-        Lista de mensagens
+        Mensagens da página em ordem cronológica e next_cursor
 
     Raises:
         404: Conversa não encontrada
     """
     # Verificar se conversa existe e pertence ao usuário
-    conversation = conversation_service.get_conversation_by_id(
+    conversation = await conversation_service.get_conversation_by_id(
         db, conversation_id, current_user.id
     )
 
@@ -151,24 +165,26 @@ async def get_conversation_messages(
         )
 
     # Buscar mensagens
-    messages = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.conversation_id == conversation_id)
-        .order_by(ChatMessage.created_at.asc())
-        .all()
+    messages, next_cursor = await conversation_service.get_messages_page(
+        db, conversation_id, before_id, limit
+    )
+    pokemon_payloads = await payload_service.hydrate(db, messages)
+
+    return FastJSONResponse(
+        {
+            "conversation_id": conversation_id,
+            "next_cursor": next_cursor,
+            "messages": [
+                {
+                    "id": msg.id,
+                    "content": msg.content,
+                    "is_bot": msg.is_bot,
+                    "pokemon_data": pokemon_payloads.get(msg.id),
+                    "created_at": msg.created_at.isoformat() + "Z",
+                }
+                for msg in messages
+            ],
+            # Total da conversa, não da página
+            "total": conversation.message_count,
+        }
     )
-
-    return {
-        "conversation_id": conversation_id,
-        "messages": [
-            {
-                "id": msg.id,
-                "content": msg.content,
-                "is_bot": msg.is_bot,
-                "pokemon_data": msg.pokemon_data,  # ← ADICIONAR pokemon_data
-                "created_at": msg.created_at.isoformat() + "Z",
-            }
-            for msg in messages
-        ],
-        "total": len(messages),
-    }
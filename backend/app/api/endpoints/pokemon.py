@@ -1,74 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import logging
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from typing import Optional
-from app.schemas.pokemon import Pokemon, PokemonList
-from app.services.pokeapi import pokeapi_service
-from app.api.deps import get_current_user
-from app.db.models import User
+from app.core.config import settings
+from app.core.http_cache import conditional_json_response
+from app.services.pokemon_index import pokemon_index
+from app.services.pokemon_store import pokemon_store
+from app.core.security import Principal, get_current_user
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/pokemon", tags=["Pokemon"])
 
+# Respostas dependem só de dados da PokéAPI, mas as rotas exigem login
+CACHE_CONTROL = f"private, max-age={settings.POKEMON_DETAIL_MAX_AGE_SECONDS}"
 
-@router.get("/{identifier}", response_model=dict)
-async def get_pokemon(
-    identifier: str,
-    current_user: User = Depends(get_current_user)
+
+def _pokeapi_unavailable(e: httpx.HTTPError) -> HTTPException:
+    logger.warning("❌ PokéAPI indisponível: %s", e)
+    return HTTPException(
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail="PokéAPI indisponível no momento"
+    )
+
+
+# Declarada antes de /{identifier} para não ser capturada como nome
+@router.get("/suggest", response_model=dict)
+async def suggest_pokemon(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(8, ge=1, le=20),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Busca informações detalhadas de um Pokémon por nome ou ID.
-    
+    Sugestões de nomes para o autocomplete.
+
+    Busca por prefixo no índice em memória, ordenada por popularidade, com
+    fuzzy matching quando nenhum nome começa com o texto digitado.
+
     Args:
-        identifier: Nome ou ID do Pokémon
+        q: Texto digitado (ex: "char", "charizard mega")
+        limit: Máximo de sugestões
         current_user: Usuário autenticado
-    
+
     Returns:
-        Dados completos do Pokémon
-    
-    Raises:
-        HTTPException: Se Pokémon não encontrado
+        Sugestões com nome e sprite
     """
-    pokemon = await pokeapi_service.get_detailed_pokemon_info(identifier)
-    
-    if not pokemon:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Pokémon '{identifier}' não encontrado"
-        )
-    
-    return pokemon
+    await pokemon_store.ensure_index()
+    return pokemon_index.suggest(q, limit)
 
 
-@router.get("/", response_model=dict)
-async def list_pokemon(
+@router.get("/search/{query}", response_model=list)
+async def search_pokemon(
+    query: str,
+    request: Request,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Lista Pokémon com paginação.
+    Busca Pokémon por nome (busca parcial).
     
     Args:
-        limit: Número de resultados por página (1-100)
-        offset: Deslocamento para paginação
+        query: Termo de busca
+        limit: Máximo de resultados
         current_user: Usuário autenticado
     
     Returns:
-        Lista paginada de Pokémon
+        Lista de Pokémon que correspondem à busca
     """
-    pokemon_list = await pokeapi_service.get_pokemon_list(limit, offset)
-    
-    if not pokemon_list:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erro ao buscar lista de Pokémon"
-        )
-    
-    return pokemon_list
+    await pokemon_store.ensure_index()
+    results = pokemon_index.search(query, limit)
+    return conditional_json_response(request, results, CACHE_CONTROL)
 
 
 @router.get("/type/{type_name}", response_model=list)
 async def get_pokemon_by_type(
     type_name: str,
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Busca todos os Pokémon de um tipo específico.
@@ -83,7 +91,7 @@ async def get_pokemon_by_type(
     Raises:
         HTTPException: Se tipo não encontrado
     """
-    pokemon_list = await pokeapi_service.get_pokemon_by_type(type_name.lower())
+    pokemon_list = await pokemon_store.get_type(type_name)
     
     if pokemon_list is None:
         raise HTTPException(
@@ -91,52 +99,116 @@ async def get_pokemon_by_type(
             detail=f"Tipo '{type_name}' não encontrado"
         )
     
-    return pokemon_list
+    return conditional_json_response(request, pokemon_list, CACHE_CONTROL)
 
 
-@router.get("/search/{query}", response_model=list)
-async def search_pokemon(
-    query: str,
-    current_user: User = Depends(get_current_user)
+@router.get("/evolution/{pokemon_id}", response_model=dict)
+async def get_evolution_chain(
+    pokemon_id: int,
+    request: Request,
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Busca Pokémon por nome (busca parcial).
+    Busca a cadeia de evolução de um Pokémon.
     
     Args:
-        query: Termo de busca
+        pokemon_id: ID do Pokémon
         current_user: Usuário autenticado
     
     Returns:
-        Lista de Pokémon que correspondem à busca
+        Cadeia de evolução
+    
+    Raises:
+        HTTPException: Se evolução não encontrada
     """
-    results = await pokeapi_service.search_pokemon(query)
-    return results
+    evolution = await pokemon_store.get_evolution_chain(pokemon_id)
+    
+    if not evolution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Cadeia de evolução não encontrada para Pokémon ID {pokemon_id}"
+        )
+    
+    return conditional_json_response(request, evolution, CACHE_CONTROL)
 
 
-@router.get("/evolution/{pokemon_id}", response_model=dict)
-async def get_evolution_chain(
-    pokemon_id: int,
-    current_user: User = Depends(get_current_user)
+@router.get("/{identifier}", response_model=dict)
+async def get_pokemon(
+    identifier: str,
+    request: Request,
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Busca a cadeia de evolução de um Pokémon.
+    Busca informações detalhadas de um Pokémon por nome ou ID.
     
     Args:
-        pokemon_id: ID do Pokémon
+        identifier: Nome ou ID do Pokémon
         current_user: Usuário autenticado
     
     Returns:
-        Cadeia de evolução
+        Dados completos do Pokémon
     
     Raises:
-        HTTPException: Se evolução não encontrada
+        HTTPException: Se Pokémon não encontrado
     """
-    evolution = await pokeapi_service.get_evolution_chain(pokemon_id)
+    try:
+        pokemon = await pokemon_store.get_detailed(identifier)
+    except httpx.HTTPError as e:
+        raise _pokeapi_unavailable(e)
     
-    if not evolution:
+    if not pokemon:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Cadeia de evolução não encontrada para Pokémon ID {pokemon_id}"
+            detail=f"Pokémon '{identifier}' não encontrado"
         )
     
-    return evolution
\ No newline at end of file
+    return conditional_json_response(request, pokemon, CACHE_CONTROL)
+
+
+@router.get("", response_model=dict)
+async def list_pokemon(
+    request: Request,
+    ids: Optional[str] = Query(
+        None,
+        description="IDs ou nomes separados por vírgula (ex: 1,4,7); ignora limit/offset"
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Lista Pokémon com paginação, ou busca vários de uma vez com ?ids=.
+    
+    Args:
+        ids: Pokémon pedidos em lote
+        limit: Número de resultados por página (1-100)
+        offset: Deslocamento para paginação
+        current_user: Usuário autenticado
+    
+    Returns:
+        Lista paginada de Pokémon, ou {"pokemon": [...], "not_found": [...]}
+        com os dados completos dos Pokémon pedidos em lote
+    """
+    if ids is None:
+        await pokemon_store.ensure_index()
+        return conditional_json_response(
+            request, pokemon_store.list_page(limit, offset), CACHE_CONTROL
+        )
+
+    identifiers = [part.strip() for part in ids.split(",") if part.strip()]
+    if not identifiers or len(identifiers) > settings.POKEMON_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Informe de 1 a {settings.POKEMON_BATCH_MAX_IDS} Pokémon em 'ids'"
+        )
+
+    try:
+        results = await pokemon_store.get_many(identifiers)
+    except httpx.HTTPError as e:
+        raise _pokeapi_unavailable(e)
+
+    content = {
+        "pokemon": [pokemon for pokemon in results.values() if pokemon],
+        "not_found": [key for key, pokemon in results.items() if not pokemon],
+    }
+    return conditional_json_response(request, content, CACHE_CONTROL)
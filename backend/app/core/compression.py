@@ -0,0 +1,232 @@
+"""
+Middleware ASGI de compressão (gzip/brotli) das respostas
+
+- A codificação é negociada pelo Accept-Encoding (brotli preferido quando
+  disponível e aceito)
+- Respostas menores que minimum_size saem sem compressão: o ganho em bytes
+  não compensa o custo de CPU
+- O nível de compressão tem teto configurável (orçamento de CPU por request)
+- Respostas que já têm Content-Encoding (ex.: PrecompressedJSON da lista de
+  Pokémon) passam direto, sem recomprimir
+- Só comprime tipos textuais (JSON, texto, JS, XML)
+- Vary: Accept-Encoding vai em toda resposta que o middleware poderia ter
+  codificado de outro jeito para outro cliente (inclusive as pequenas e as
+  de clientes sem Accept-Encoding), para caches compartilhados não servirem
+  a variante errada
+- Ao comprimir, um ETag forte vira fraco (W/): ele identificava os bytes
+  sem compressão
+
+Os totais de bytes e tempo de compressão ficam em compression_stats.
+"""
+
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.http_cache import accepted_encodings
+from app.core.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, apenas gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+# Eventos precisam chegar um a um; o ganho seria pequeno
+SKIP_TYPES = ("text/event-stream",)
+# Sem corpo: nada a comprimir
+SKIP_STATUS = {204, 304}
+
+
+@dataclass
+class CompressionStats:
+    responses: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+    def record(self, bytes_in: int, bytes_out: int, seconds: float):
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.seconds += seconds
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+
+compression_stats = CompressionStats()
+
+registry.callback(
+    "http_compression_bytes_total",
+    "Bytes antes (in) e depois (out) da compressão das respostas",
+    "counter",
+    ["direction"],
+    lambda: [
+        (("in",), compression_stats.bytes_in),
+        (("out",), compression_stats.bytes_out),
+    ],
+)
+registry.callback(
+    "http_compression_seconds_total",
+    "Tempo de CPU gasto comprimindo respostas",
+    "counter",
+    [],
+    lambda: [((), compression_stats.seconds)],
+)
+registry.callback(
+    "http_compressed_responses_total",
+    "Respostas comprimidas pelo middleware",
+    "counter",
+    [],
+    lambda: [((), compression_stats.responses)],
+)
+
+
+class _Compressor:
+    """Interface única para zlib (gzip) e brotli em modo streaming"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._impl = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._impl.process
+            self._flush = self._impl.flush
+            self._finish = self._impl.finish
+        else:
+            # wbits=31: cabeçalho e trailer gzip
+            self._impl = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._compress = self._impl.compress
+            self._flush = lambda: self._impl.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._impl.flush
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        started = time.perf_counter()
+        out = self._compress(data)
+        # Em streaming cada parte é entregue assim que produzida
+        out += self._finish() if final else self._flush()
+        compression_stats.record(len(data), len(out), time.perf_counter() - started)
+        return out
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = min(max(gzip_level, 1), 9)
+        self.brotli_quality = min(max(brotli_quality, 0), 11)
+
+    def _choose_encoding(self, accept_encoding: Optional[str]) -> Optional[str]:
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+        for encoding in candidates:
+            if accepted.get(encoding, wildcard) > 0:
+                return encoding
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Intercepta o send da aplicação e decide na primeira parte do corpo"""
+
+    def __init__(
+        self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send
+    ):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _should_compress(self, start: Message) -> bool:
+        headers = Headers(raw=start["headers"])
+        if self.encoding is None or start["status"] in SKIP_STATUS:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(
+            SKIP_TYPES
+        )
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(scope=message)
+            if "content-encoding" in headers:
+                # Codificada pela própria aplicação (que cuida do Vary)
+                await self._send(message)
+                self.passthrough = True
+                return
+            headers.add_vary_header("Accept-Encoding")
+            self.start = message
+            self.passthrough = not self._should_compress(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            # Primeira parte do corpo: corpo inteiro pequeno não compensa
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            compression_stats.responses += 1
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            compressed = self.compressor.compress(body, final=not more_body)
+            if more_body:
+                # Streaming: o tamanho final só é conhecido no fim
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            self.start["headers"] = headers.raw
+            await self._send(self.start)
+            await self._send(
+                {"type": "http.response.body", "body": compressed, "more_body": more_body}
+            )
+            return
+
+        await self._send(
+            {
+                "type": "http.response.body",
+                "body": self.compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            }
+        )
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,18 +10,94 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0  # espera máxima por uma conexão livre
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # antes do idle timeout do servidor/proxy
+    DB_POOL_PRE_PING: bool = True
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0  # 0 desativa o cache
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    BCRYPT_ROUNDS: int = 12  # alterar faz o rehash transparente no próximo login
+    PASSWORD_HASH_WORKERS: int = 4  # threads dedicadas ao bcrypt
     
     # Ollama
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "llama3"
+    OLLAMA_NUM_CTX: int = 4096  # janela de contexto enviada ao modelo
+    OLLAMA_NUM_PREDICT: int = 256  # máximo de tokens gerados por resposta
+    OLLAMA_KEEP_ALIVE: str = "30m"  # mantém o modelo (e o KV cache) carregado
+
+    # Roteamento por intenção (lookup, comparison, team, chat)
+    OLLAMA_HOSTS: List[str] = []  # vazio = apenas OLLAMA_BASE_URL
+    OLLAMA_INTENT_MODELS: Dict[str, str] = {}  # ex.: {"lookup": "llama3.2:1b"}
+    OLLAMA_INTENT_HOSTS: Dict[str, List[str]] = {}  # default: OLLAMA_HOSTS
+    LLM_EJECT_AFTER_FAILURES: int = 3  # falhas seguidas até ejetar um host
+    LLM_EJECT_SECONDS: float = 30.0
+    # Gerações simultâneas por host (como o OLLAMA_NUM_PARALLEL do servidor);
+    # o excedente espera aqui, medido em llm_queue_wait_seconds. 0 = sem limite
+    OLLAMA_MAX_CONCURRENT_PER_HOST: int = 4
+
+    # Deadlines e hedging das chamadas ao LLM
+    CHAT_REQUEST_TIMEOUT_SECONDS: float = 60.0  # teto de latência de /api/chat/message
+    CHAT_PERSISTENCE_RESERVE_SECONDS: float = 2.0  # reservado para salvar a resposta
+    LLM_HEDGE_AFTER_SECONDS: Optional[float] = None  # None desativa o hedging
+    OLLAMA_HEDGE_BASE_URL: Optional[str] = None  # host secundário (default: o mesmo)
+    OLLAMA_HEDGE_MODEL: Optional[str] = None  # modelo menor (default: o mesmo)
+
+    # Orçamento de tokens do prompt
+    LLM_HISTORY_TOKEN_BUDGET: int = 1024
+    LLM_FACTS_TOKEN_BUDGET: int = 768
+    LLM_HISTORY_MESSAGE_MAX_TOKENS: int = 192
     
+    # Paginação do histórico (keyset por created_at, id)
+    HISTORY_PAGE_SIZE: int = 50
+    HISTORY_MAX_PAGE_SIZE: int = 200
+
+    # Payloads de Pokémon deduplicados (entradas decodificadas em memória)
+    POKEMON_PAYLOAD_CACHE_SIZE: int = 4096
+
     # PokeAPI
     POKEAPI_BASE_URL: str = "https://pokeapi.co/api/v2"
+    # /api/chat/pokemon-list: revalidado via ETag depois disso
+    POKEMON_LIST_MAX_AGE_SECONDS: int = 86400
+    # Store local de Pokémon (app.services.pokemon_store)
+    POKEMON_CACHE_SIZE: int = 2048  # Pokémon detalhados em memória
+    POKEMON_NEGATIVE_CACHE_TTL_SECONDS: float = 300.0  # nomes inexistentes
+    POKEMON_DETAIL_MAX_AGE_SECONDS: int = 3600  # Cache-Control de /api/pokemon
+    POKEMON_BATCH_MAX_IDS: int = 50
+    
+    # Logging (app.core.logging)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" ou "text"
+    LOG_SAMPLE_RATE: float = 0.1  # fração registrada dos eventos de alto volume
+    
+    # Tracing por requisição (app.core.tracing)
+    TRACE_BUFFER_SIZE: int = 200  # traces recentes mantidos em memória
+    TRACE_SLOW_KEEP: int = 20  # mais lentos mantidos completos
+    TRACE_MAX_SPANS: int = 2000  # por trace; o excedente é contado e descartado
+    TRACE_EXPORT_PATH: Optional[str] = None  # arquivo OTLP/JSON (uma linha por trace)
+    TRACE_OTLP_ENDPOINT: Optional[str] = None  # coletor OTLP/HTTP, ex.: http://localhost:4318
+    
+    # Endpoints de diagnóstico (/api/admin); sem token ficam desativados
+    ADMIN_TOKEN: Optional[str] = None
+    PROFILE_MAX_SECONDS: float = 60.0  # duração máxima de GET /api/admin/profile
+    PROFILE_INTERVAL_MS: float = 5.0  # intervalo entre amostras do profiler
+    PROFILE_KEEP: int = 20  # perfis por requisição (X-Profile) mantidos
+    
+    # Monitor do event loop (app.core.loop_monitor)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.1
+    LOOP_BLOCK_THRESHOLD_SECONDS: float = 0.1  # acima disso a pilha é logada
+    
+    # Compressão das respostas (app.core.compression)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; abaixo disso sai sem compressão
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; acima de ~5 o custo de CPU dispara
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -0,0 +1,74 @@
+"""
+Deadlines por requisição e cancelamento quando o cliente desconecta
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Optional, TypeVar
+
+from fastapi import Request
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """O cliente HTTP fechou a conexão antes da resposta ficar pronta"""
+
+
+class Deadline:
+    """Instante absoluto (relógio monotônico) até o qual a requisição pode rodar"""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self, reserve: float = 0.0) -> float:
+        """Segundos restantes, descontando uma reserva para etapas posteriores"""
+        return max(0.0, self.expires_at - time.monotonic() - reserve)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+async def wait_with_deadline(
+    awaitable: Awaitable[T], deadline: Optional[Deadline], reserve: float = 0.0
+) -> T:
+    """
+    Aguarda o awaitable respeitando o deadline.
+
+    Raises:
+        asyncio.TimeoutError: Se o deadline (menos a reserva) estourar
+    """
+    if deadline is None:
+        return await awaitable
+
+    timeout = deadline.remaining(reserve)
+    if timeout <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise asyncio.TimeoutError()
+    return await asyncio.wait_for(awaitable, timeout=timeout)
+
+
+async def cancel_on_disconnect(
+    request: Request, awaitable: Awaitable[T], poll_interval: float = 0.5
+) -> T:
+    """
+    Executa o awaitable e o cancela se o cliente desconectar no meio do caminho.
+
+    Raises:
+        ClientDisconnected: Se o cliente fechou a conexão
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
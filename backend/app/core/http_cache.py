@@ -0,0 +1,117 @@
+"""
+Respostas pré-serializadas e pré-comprimidas com ETag forte
+
+Para payloads que só mudam quando o processo recarrega dados (ex.: a lista de
+Pokémon): o JSON é serializado e comprimido uma única vez e cada requisição
+apenas escolhe os bytes certos — ou responde 304 se o cliente já tem a versão.
+Respostas montadas por requisição usam conditional_json_response, que só
+acrescenta o ETag e o 304.
+"""
+
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.core.responses import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, serve apenas gzip
+    brotli = None
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding → {codificação: q}"""
+    accepted = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.lower()] = q
+    return accepted
+
+
+def _strong_etag(body: bytes, suffix: str = "") -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + suffix + '"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparação fraca (RFC 9110): W/"x" casa com "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+# Sufixo do ETag de cada codificação: um validador forte identifica os bytes
+# da representação, então identity, gzip e br não podem compartilhar o mesmo
+ETAG_SUFFIXES = {"gzip": "-gz", "br": "-br"}
+
+
+class PrecompressedJSON:
+    """JSON serializado uma vez, com variantes gzip/brotli e ETag forte por variante"""
+
+    def __init__(self, content, cache_control: str):
+        self.body = dumps(content)
+        self.etag = _strong_etag(self.body)
+        self.cache_control = cache_control
+
+        self.encoded: Dict[str, bytes] = {
+            "gzip": gzip.compress(self.body, compresslevel=9, mtime=0)
+        }
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(self.body, quality=11)
+        self.etags = {
+            encoding: _strong_etag(self.body, ETAG_SUFFIXES[encoding])
+            for encoding in self.encoded
+        }
+
+    def _choose_encoding(self, accept_encoding: Optional[str]) -> Optional[str]:
+        accepted = accepted_encodings(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        # Preferência pelo menor payload entre os aceitos
+        for encoding in sorted(self.encoded, key=lambda e: len(self.encoded[e])):
+            if accepted.get(encoding, wildcard) > 0:
+                return encoding
+        return None
+
+    def response(self, request: Request) -> Response:
+        encoding = self._choose_encoding(request.headers.get("accept-encoding"))
+        headers = {
+            "ETag": self.etags[encoding] if encoding else self.etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            body = self.encoded[encoding]
+        else:
+            body = self.body
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def conditional_json_response(request: Request, content, cache_control: str) -> Response:
+    """JSON com ETag forte; 304 sem corpo se o cliente já tem a mesma versão"""
+    body = dumps(content)
+    headers = {"ETag": _strong_etag(body), "Cache-Control": cache_control}
+
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
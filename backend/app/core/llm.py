@@ -1,6 +1,171 @@
+import logging
+import asyncio
+import time
 import ollama
-from typing import Optional
+from typing import Dict, List, Optional
 from app.core.config import settings
+from app.core.deadline import Deadline, wait_with_deadline
+from app.core.metrics import LLM_GENERATION, LLM_HEDGES, LLM_QUEUE_WAIT
+from app.core.prompt import PromptBuilder
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def _ollama_host(base_url: str) -> str:
+    # No Windows, 'localhost' pode resolver para ::1 (IPv6) causando WinError 10049.
+    # Forçamos 127.0.0.1 (IPv4) para garantir compatibilidade.
+    return base_url.replace("localhost", "127.0.0.1")
+
+
+# Intenções usadas para escolher modelo/host
+INTENT_LOOKUP = "lookup"  # "Encontrei Pikachu", um único Pokémon
+INTENT_COMPARISON = "comparison"
+INTENT_TEAM = "team"
+INTENT_CHAT = "chat"  # conversa livre, sem dados de Pokémon
+INTENTS = (INTENT_LOOKUP, INTENT_COMPARISON, INTENT_TEAM, INTENT_CHAT)
+
+
+class OllamaBackend:
+    """Um host Ollama com contagem de requisições em andamento e estado de saúde"""
+
+    def __init__(self, base_url: str):
+        self.host = _ollama_host(base_url)
+        # Client assíncrono: a geração não bloqueia o event loop e pode ser
+        # cancelada (deadline estourado ou cliente desconectado)
+        self.client = ollama.AsyncClient(
+            host=self.host, timeout=settings.CHAT_REQUEST_TIMEOUT_SECONDS
+        )
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        # Fila local: sem ela a espera acontece dentro do Ollama e aparece
+        # como tempo de geração
+        limit = settings.OLLAMA_MAX_CONCURRENT_PER_HOST
+        self.slots = asyncio.Semaphore(limit) if limit > 0 else None
+
+    @property
+    def healthy(self) -> bool:
+        # Após o período de ejeção o host volta a receber tráfego (half-open);
+        # uma nova falha o ejeta de novo
+        return time.monotonic() >= self.ejected_until
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= settings.LLM_EJECT_AFTER_FAILURES:
+            self.ejected_until = time.monotonic() + settings.LLM_EJECT_SECONDS
+            logger.warning(
+                "🚫 Host %s ejetado por %ss (%s falhas seguidas)",
+                self.host,
+                settings.LLM_EJECT_SECONDS,
+                self.consecutive_failures,
+            )
+
+    async def chat(self, model: str, messages: List[Dict[str, str]], **kwargs) -> str:
+        # outstanding conta também quem está na fila: o roteamento evita o host
+        self.outstanding += 1
+        try:
+            if self.slots is None:
+                return await self._generate(model, messages, **kwargs)
+
+            queued = time.perf_counter()
+            with span("llm.queue", host=self.host):
+                await self.slots.acquire()
+            try:
+                LLM_QUEUE_WAIT.observe(time.perf_counter() - queued, host=self.host)
+                return await self._generate(model, messages, **kwargs)
+            finally:
+                self.slots.release()
+        finally:
+            self.outstanding -= 1
+
+    async def _generate(self, model: str, messages: List[Dict[str, str]], **kwargs) -> str:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with span("llm.generate", host=self.host, model=model):
+                response = await self.client.chat(model=model, messages=messages, **kwargs)
+            outcome = "ok"
+        except asyncio.CancelledError:
+            # Cancelamento (hedge perdedor, deadline, desconexão) não é falha do host
+            outcome = "cancelled"
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        finally:
+            LLM_GENERATION.observe(
+                time.perf_counter() - started, host=self.host, model=model, outcome=outcome
+            )
+
+        self.record_success()
+        return response["message"]["content"]
+
+
+class LLMRouter:
+    """
+    Escolhe modelo e host Ollama por intenção.
+
+    Cada intenção pode ter seu próprio modelo (OLLAMA_INTENT_MODELS) e seu
+    próprio conjunto de hosts (OLLAMA_INTENT_HOSTS). Dentro do conjunto, o host
+    saudável com menos requisições em andamento é escolhido.
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        default_model: str,
+        intent_models: Dict[str, str],
+        intent_hosts: Dict[str, List[str]],
+    ):
+        self.default_model = default_model
+        self.intent_models = intent_models
+        self.backends: Dict[str, OllamaBackend] = {}
+
+        for url in hosts:
+            self._backend(url)
+
+        self.pools: Dict[str, List[OllamaBackend]] = {
+            intent: [self._backend(url) for url in intent_hosts.get(intent, hosts)]
+            for intent in INTENTS
+        }
+
+    def _backend(self, url: str) -> OllamaBackend:
+        host = _ollama_host(url)
+        if host not in self.backends:
+            self.backends[host] = OllamaBackend(url)
+        return self.backends[host]
+
+    def model_for(self, intent: str) -> str:
+        return self.intent_models.get(intent, self.default_model)
+
+    def pick(
+        self, intent: str, exclude: Optional[OllamaBackend] = None
+    ) -> OllamaBackend:
+        """Least-outstanding-requests entre os hosts saudáveis da intenção"""
+        pool = self.pools.get(intent) or self.pools[INTENT_CHAT]
+        candidates = [b for b in pool if b is not exclude] or pool
+
+        healthy = [b for b in candidates if b.healthy]
+        if healthy:
+            return min(healthy, key=lambda b: b.outstanding)
+
+        # Todos ejetados: tenta o que volta primeiro em vez de falhar direto
+        return min(candidates, key=lambda b: b.ejected_until)
+
+
+def _build_router() -> LLMRouter:
+    hosts = settings.OLLAMA_HOSTS or [settings.OLLAMA_BASE_URL]
+    return LLMRouter(
+        hosts=hosts,
+        default_model=settings.OLLAMA_MODEL,
+        intent_models=settings.OLLAMA_INTENT_MODELS,
+        intent_hosts=settings.OLLAMA_INTENT_HOSTS,
+    )
 
 
 class LlamaChat:
@@ -8,11 +173,18 @@ class LlamaChat:
 
     def __init__(self):
         self.model = settings.OLLAMA_MODEL
+        self.router = _build_router()
 
-        # No Windows, 'localhost' pode resolver para ::1 (IPv6) causando WinError 10049.
-        # Forçamos 127.0.0.1 (IPv4) para garantir compatibilidade.
-        ollama_host = settings.OLLAMA_BASE_URL.replace("localhost", "127.0.0.1")
-        self.client = ollama.Client(host=ollama_host)
+        # Hedging: após LLM_HEDGE_AFTER_SECONDS dispara a mesma pergunta em
+        # outro host e/ou modelo menor; a primeira resposta vence
+        self.hedge_backend = None
+        if settings.OLLAMA_HEDGE_BASE_URL:
+            self.hedge_backend = OllamaBackend(settings.OLLAMA_HEDGE_BASE_URL)
+        self.hedge_enabled = settings.LLM_HEDGE_AFTER_SECONDS is not None and (
+            self.hedge_backend is not None
+            or settings.OLLAMA_HEDGE_MODEL is not None
+            or len(self.router.backends) > 1
+        )
 
         self.system_prompt = """Você é um assistente especializado em Pokémon chamado PokédexAI.
 Você ajuda treinadores com informações sobre Pokémon de forma clara e objetiva.
@@ -31,69 +203,139 @@ Exemplo de boa resposta para comparação:
 "Charizard tem mais ataque (84 vs 83) e velocidade superior (100 vs 78). 🔥 Blastoise é mais defensivo com 100 de defesa. ✅ Recomendo Charizard se você busca agressividade e velocidade, ideal para atacantes rápidos!"
 """
 
-    async def generate_response(
-        self, user_message: str, context: Optional[str] = None
+        # O system prompt nunca muda entre requisições: o Ollama reaproveita
+        # o prefixo já processado (prompt cache) e só faz prefill do restante
+        self.prompt_builder = PromptBuilder(
+            system_prompt=self.system_prompt,
+            num_ctx=settings.OLLAMA_NUM_CTX,
+            num_predict=settings.OLLAMA_NUM_PREDICT,
+            history_budget=settings.LLM_HISTORY_TOKEN_BUDGET,
+            facts_budget=settings.LLM_FACTS_TOKEN_BUDGET,
+            history_message_max_tokens=settings.LLM_HISTORY_MESSAGE_MAX_TOKENS,
+        )
+        self.options = {
+            "num_ctx": settings.OLLAMA_NUM_CTX,
+            "num_predict": settings.OLLAMA_NUM_PREDICT,
+        }
+
+    async def _chat(
+        self, backend: OllamaBackend, model: str, messages: List[Dict[str, str]]
     ) -> str:
-        """Gera uma resposta usando o modelo Llama"""
+        return await backend.chat(
+            model,
+            messages,
+            options=self.options,
+            keep_alive=settings.OLLAMA_KEEP_ALIVE,
+        )
+
+    async def _hedged_chat(self, messages: List[Dict[str, str]], intent: str) -> str:
+        """Chama o host/modelo da intenção e, se demorar, também o do hedge"""
+        backend = self.router.pick(intent)
+        model = self.router.model_for(intent)
+        logger.debug("🤖 Intenção '%s': modelo %s em %s", intent, model, backend.host)
+
+        primary = asyncio.create_task(self._chat(backend, model, messages))
+        pending = {primary}
 
         try:
-            print(f"🤖 [LLM] Usando modelo: {self.model}")
+            if self.hedge_enabled:
+                done, _ = await asyncio.wait(
+                    pending, timeout=settings.LLM_HEDGE_AFTER_SECONDS
+                )
+                # Só dispara o hedge se o principal ainda não respondeu com sucesso
+                if not done or primary.exception() is not None:
+                    hedge_backend = self.hedge_backend or self.router.pick(
+                        intent, exclude=backend
+                    )
+                    hedge_model = settings.OLLAMA_HEDGE_MODEL or model
+                    LLM_HEDGES.inc()
+                    logger.warning(
+                        "⏱️ Sem resposta em %ss, disparando hedge (%s em %s)",
+                        settings.LLM_HEDGE_AFTER_SECONDS,
+                        hedge_model,
+                        hedge_backend.host,
+                    )
+                    pending.add(
+                        asyncio.create_task(
+                            self._chat(hedge_backend, hedge_model, messages)
+                        )
+                    )
 
-            is_comparison = context and (
-                "comparação" in context.lower() or "vs" in context.lower()
-            )
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
 
-            messages = [{"role": "system", "content": self.system_prompt}]
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
 
-            if context:
-                if is_comparison:
-                    messages.append(
-                        {
-                            "role": "user",
-                            "content": f"""Contexto:
-{context}
+    async def generate_response(
+        self,
+        user_message: str,
+        context: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        deadline: Optional[Deadline] = None,
+        intent: str = INTENT_CHAT,
+    ) -> str:
+        """
+        Gera uma resposta usando o modelo Llama
 
-Pergunta: {user_message}
+        Raises:
+            asyncio.TimeoutError: Se o deadline da requisição estourar
+        """
 
-Faça uma comparação completa:
-1. Destaque as principais diferenças nas stats (2 frases)
-2. RECOMENDE qual é melhor e JUSTIFIQUE baseado nas stats (2-3 frases)
-3. Use emojis e seja objetivo""",
-                        }
-                    )
-                else:
-                    messages.append(
-                        {
-                            "role": "user",
-                            "content": f"Contexto:\n{context}\n\nPergunta: {user_message}",
-                        }
-                    )
-            else:
-                messages.append({"role": "user", "content": user_message})
+        try:
+            is_comparison = bool(context) and (
+                "comparação" in context.lower() or "vs" in context.lower()
+            )
 
-            print(f"📤 [LLM] Enviando mensagem para Ollama...")
+            messages = self.prompt_builder.build(
+                user_message,
+                facts=context,
+                history=history,
+                is_comparison=is_comparison,
+            )
 
-            # Usa o client com host fixo em 127.0.0.1
-            response = self.client.chat(model=self.model, messages=messages)
+            logger.debug("📤 Enviando mensagem para Ollama...")
 
-            bot_response = response["message"]["content"]
-            print(f"📥 [LLM] Resposta recebida: {bot_response[:100]}...")
+            bot_response = await wait_with_deadline(
+                self._hedged_chat(messages, intent),
+                deadline,
+                reserve=settings.CHAT_PERSISTENCE_RESERVE_SECONDS,
+            )
+            logger.debug("📥 Resposta recebida: %s...", bot_response[:100])
 
             return bot_response
 
+        except asyncio.TimeoutError:
+            logger.warning("⏱️ Deadline estourado aguardando o Ollama")
+            raise
         except Exception as e:
-            print(f"❌ [LLM] Erro ao gerar resposta: {e}")
+            logger.error("❌ Erro ao gerar resposta: %s", e)
             raise
 
     def check_ollama_connection(self) -> bool:
-        """Verifica se o Ollama está disponível"""
-        try:
-            self.client.list()
-            print("✅ [LLM] Ollama está disponível")
-            return True
-        except Exception as e:
-            print(f"❌ [LLM] Ollama não está disponível: {e}")
-            return False
+        """Verifica se ao menos um host Ollama está disponível"""
+        available = False
+        for backend in self.router.backends.values():
+            try:
+                ollama.Client(host=backend.host, timeout=5.0).list()
+                logger.info("✅ Ollama está disponível em %s", backend.host)
+                available = True
+            except Exception as e:
+                logger.warning(
+                    "❌ Ollama não está disponível em %s: %s",
+                    backend.host,
+                    e,
+                )
+        return available
 
 
 # Instância global
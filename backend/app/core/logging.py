@@ -0,0 +1,146 @@
+"""
+Logging estruturado e assíncrono
+
+Os módulos usam loggers padrão (logging.getLogger(__name__)). setup_logging
+liga o logger "app" a uma fila: quem loga só enfileira o LogRecord, e uma
+thread (QueueListener) formata e escreve no stdout. Assim a escrita no
+terminal não bloqueia o event loop nem disputa o stdout entre requisições.
+
+- Níveis: LOG_LEVEL (DEBUG, INFO, ...); eventos por candidato/por chamada
+  externa ficam em DEBUG
+- Amostragem: eventos de alto volume passam extra=SAMPLED e só uma fração
+  LOG_SAMPLE_RATE deles é registrada (o campo sample_rate vai junto no log)
+- Formato: LOG_FORMAT="json" (uma linha JSON por evento) ou "text"
+
+Mensagens usam argumentos no estilo %, e não f-strings: com o nível
+desligado ou o evento descartado pela amostragem, nada é formatado.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, json da stdlib
+    orjson = None
+
+APP_LOGGER = "app"
+
+# extra= dos eventos de alto volume (um por requisição ou mais)
+SAMPLED = {"sample_rate": settings.LOG_SAMPLE_RATE}
+
+# Atributos de todo LogRecord; o resto veio de extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """Descarta eventos com sample_rate, mantendo a fração pedida"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        return rate is None or rate >= 1 or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """Uma linha JSON por evento: ts, level, logger, msg, extras e exceção"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+
+        if orjson is not None:
+            return orjson.dumps(entry, default=str).decode("utf-8")
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _EnqueueHandler(QueueHandler):
+    """
+    QueueHandler que não formata na thread de quem loga.
+
+    O QueueHandler padrão monta a mensagem antes de enfileirar (pensado para
+    filas entre processos). Aqui a fila é do próprio processo: o registro vai
+    inteiro e a thread do listener formata. Os argumentos da mensagem devem
+    ser valores que não mudam depois da chamada (str, int etc.).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging():
+    """Configura o logger "app" com fila e escritor em background (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    # O formato não usa arquivo/linha, thread nem processo: sem coletá-los, o
+    # LogRecord custa metade na thread de quem loga (findCaller percorre a pilha)
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    stream = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream.setFormatter(JSONFormatter())
+    else:
+        stream.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+        )
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _EnqueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(settings.LOG_LEVEL.upper())
+    logger.handlers = [handler]
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Escreve o que ainda está na fila e para a thread do listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """
+    Workers criados por fork (gunicorn com preload_app) herdam a fila mas não
+    a thread do listener: recria os dois no processo filho
+    """
+    global _listener
+    if _listener is not None:
+        _listener = None
+        setup_logging()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,139 @@
+"""
+Monitor de atraso do event loop com detecção de chamadas bloqueantes
+
+Duas partes:
+- Um ticker no próprio loop dorme LOOP_MONITOR_INTERVAL_SECONDS e mede
+  quanto acordou atrasado: esse atraso é o tempo que qualquer callback
+  esperou para rodar (event_loop_lag_seconds)
+- Uma thread watchdog confere o último tick do ticker. Se o loop ficou
+  parado mais que LOOP_BLOCK_THRESHOLD_SECONDS, o código que o bloqueia
+  ainda está rodando: a thread lê a pilha da thread do loop nesse momento
+  (sys._current_frames) e loga junto com a task atual
+  (event_loop_blocked_total)
+
+Bloqueios curtos aparecem só na métrica; os longos são logados com a pilha
+de quem bloqueou, uma vez por episódio.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds",
+    "Atraso do event loop em acordar um timer (tempo de espera dos callbacks)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKED = registry.counter(
+    "event_loop_blocked_total",
+    "Episódios em que o event loop ficou bloqueado além de LOOP_BLOCK_THRESHOLD_SECONDS",
+)
+
+# Quadros do topo da pilha incluídos no log
+STACK_LIMIT = 25
+
+
+def _describe_task(task: Optional[asyncio.Task]) -> Optional[str]:
+    if task is None:
+        return None
+    coro = task.get_coro()
+    return f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self._heartbeat = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Inicia ticker e watchdog; chamar de dentro do event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick(), name="loop-monitor")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            "🩺 Monitor do event loop ativo (intervalo %ss, bloqueio > %ss)",
+            self.interval,
+            self.threshold,
+        )
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await asyncio.to_thread(self._watchdog.join)
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            LOOP_LAG.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def _watch(self):
+        reported_heartbeat = None
+        # Confere com mais frequência que o tick para pegar o bloqueio em curso
+        while not self._stop.wait(min(self.interval, self.threshold) / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled <= self.threshold or heartbeat == reported_heartbeat:
+                continue
+
+            reported_heartbeat = heartbeat
+            # As métricas só são atualizadas no event loop (sem lock): o
+            # incremento roda lá assim que o loop voltar a andar
+            self._loop.call_soon_threadsafe(LOOP_BLOCKED.inc)
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = (
+                "".join(traceback.format_stack(frame)[-STACK_LIMIT:]) if frame else None
+            )
+            logger.warning(
+                "🐢 Event loop bloqueado há %.0f ms, task %s\n%s",
+                stalled * 1000,
+                _describe_task(asyncio.current_task(self._loop)),
+                stack,
+                extra={"blocked_ms": round(stalled * 1000, 1)},
+            )
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL_SECONDS,
+    threshold=settings.LOOP_BLOCK_THRESHOLD_SECONDS,
+)
@@ -0,0 +1,290 @@
+"""
+Métricas no formato texto do Prometheus (GET /metrics)
+
+Implementação mínima, sem dependências: contadores e histogramas com labels
+registrados em memória, mais coletores que leem valores já mantidos por
+outros módulos (hits/misses dos LRUCache, totais da compressão) só na hora
+do scrape.
+
+Tudo roda no event loop: as atualizações não usam lock.
+
+- Histogramas cumulativos (_bucket, _sum, _count), em segundos
+- chat_stage_duration_seconds{stage}: onde um turno do chat passa o tempo
+- Contadores de fallbacks e erros por etapa
+
+Uso:
+    with CHAT_STAGE.time(stage="history"):
+        history = await ...
+"""
+
+import abc
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# De consultas de 1 ms a gerações do LLM perto do deadline (60 s)
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        """Linhas de amostra no formato texto, sem HELP/TYPE"""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        if not self.labelnames:
+            # Sem labels a série existe desde o início (0), como no prometheus_client
+            self._values[()] = 0
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # [contagem por bucket (não cumulativa)..., +Inf], soma
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        if not self.labelnames:
+            self._values[()] = ([0] * (len(self.buckets) + 1), [0.0])
+
+    def observe(self, seconds: float, **labels: str):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += seconds
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observa a duração do bloco, mesmo que ele termine com exceção"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        bucket_names = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(bucket_names, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Valores lidos na hora do scrape: callback() → [(label values, valor)]"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in self.callback()
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    ) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, kind, labelnames, callback))
+
+    def render(self) -> bytes:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+registry = Registry()
+
+# Etapas de POST /api/chat/message
+CHAT_STAGE = registry.histogram(
+    "chat_stage_duration_seconds",
+    "Duração de cada etapa de um turno do chat",
+    ["stage"],
+)
+CHAT_FALLBACKS = registry.counter(
+    "chat_fallbacks_total",
+    "Turnos do chat que seguiram por um caminho degradado",
+    ["reason"],
+)
+CHAT_ERRORS = registry.counter(
+    "chat_errors_total",
+    "Erros por etapa do chat e tipo de exceção",
+    ["stage", "error"],
+)
+
+# Chamadas externas
+POKEAPI_REQUEST = registry.histogram(
+    "pokeapi_request_duration_seconds",
+    "Tempo até a resposta da PokéAPI, por recurso e status",
+    ["resource", "status"],
+)
+LLM_QUEUE_WAIT = registry.histogram(
+    "llm_queue_wait_seconds",
+    "Espera por uma vaga no host Ollama (OLLAMA_MAX_CONCURRENT_PER_HOST)",
+    ["host"],
+)
+LLM_GENERATION = registry.histogram(
+    "llm_generation_seconds",
+    "Duração de uma chamada de geração ao Ollama",
+    ["host", "model", "outcome"],
+)
+LLM_HEDGES = registry.counter(
+    "llm_hedges_total",
+    "Requisições ao LLM que dispararam hedge",
+)
+
+# Caches em memória (LRUCache): hits/misses lidos no scrape
+_caches: Dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """Expõe hits, misses e tamanho de um LRUCache com o label cache=name"""
+    _caches[name] = cache
+
+
+registry.callback(
+    "cache_lookups_total",
+    "Consultas aos caches em memória por resultado",
+    "counter",
+    ["cache", "result"],
+    lambda: [
+        ((name, result), getattr(cache, result))
+        for name, cache in sorted(_caches.items())
+        for result in ("hits", "misses")
+    ],
+)
+registry.callback(
+    "cache_entries",
+    "Entradas atualmente nos caches em memória",
+    "gauge",
+    ["cache"],
+    lambda: [((name,), len(cache)) for name, cache in sorted(_caches.items())],
+)
@@ -0,0 +1,296 @@
+"""
+Profiler por amostragem para o worker em produção
+
+Uma thread em background lê a pilha das outras threads a cada intervalo
+(sys._current_frames) e conta as pilhas no formato "collapsed" (uma linha
+"f1;f2;f3 N" por pilha), aceito por flamegraph.pl, speedscope e inferno.
+O código profilado não é instrumentado: o custo fica na thread do sampler e
+só existe enquanto ele roda.
+
+Dois modos:
+- StackSampler(thread_ids=...): pilhas de threads inteiras (por padrão a do
+  event loop) durante N segundos, em GET /api/admin/profile
+- StackSampler(task=...): apenas as tasks asyncio de uma requisição, pedida
+  com o header X-Profile (ProfileMiddleware). As tasks criadas durante a
+  requisição (deadline, gather, single-flight) entram junto, via task
+  factory do loop. Quando nenhuma delas está rodando, a amostra é a cadeia
+  de awaits da task viva mais recente com o sufixo "(aguardando)", então o
+  resultado é tempo de parede: CPU próprio + espera por I/O
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import is_admin_token
+from app.core.tracing import current_trace_id
+
+WAITING = "(aguardando)"
+
+# Caminhos encurtados nos rótulos: app/services/chat_service.py em vez do absoluto
+_PATH_PREFIXES = sorted(
+    {os.path.dirname(os.path.dirname(os.path.dirname(__file__))) + os.sep}
+    | {p + os.sep for p in sys.path if p and os.path.isdir(p)},
+    key=len,
+    reverse=True,
+)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame) -> str:
+    """Pilha de uma thread, da base ao topo"""
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _await_chain(task: asyncio.Task) -> str:
+    """Cadeia de awaits de uma task suspensa: coroutine externa → mais interna"""
+    labels = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None)
+            or getattr(awaitable, "gi_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+        )
+        if frame is None:
+            break
+        labels.append(_label(frame.f_code))
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+    labels.append(WAITING)
+    return ";".join(labels)
+
+
+class StackSampler:
+    """
+    Amostra pilhas numa thread própria até stop().
+
+    Args:
+        interval: segundos entre amostras
+        thread_ids: threads amostradas (None = todas, menos o próprio sampler)
+        task: amostra só esta task, que roda em loop; ignora thread_ids.
+            Precisa ser criado na thread do event loop
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        thread_ids: Optional[Iterable[int]] = None,
+        task: Optional[asyncio.Task] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.interval = interval
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        # Lista (não set): a thread do sampler itera uma cópia enquanto o
+        # loop acrescenta tasks
+        self.tasks: Optional[List[asyncio.Task]] = [task] if task is not None else None
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident() if task is not None else None
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self.counts
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            self.samples += 1
+
+            if self.tasks is not None:
+                tasks = list(self.tasks)
+                if asyncio.current_task(self.loop) in tasks:
+                    frame = frames.get(self.loop_thread_id)
+                    if frame is not None:
+                        self.counts[_thread_stack(frame)] += 1
+                    continue
+                live = [task for task in tasks if not task.done()]
+                if not live:
+                    return
+                self.counts[_await_chain(live[-1])] += 1
+                continue
+
+            for thread_id, frame in frames.items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                if self.thread_ids is None:
+                    # Com várias threads, a pilha começa pelo nome da thread
+                    if thread_id not in names:
+                        names.update((t.ident, t.name) for t in threading.enumerate())
+                    stack = f"{names.get(thread_id, thread_id)};{_thread_stack(frame)}"
+                else:
+                    stack = _thread_stack(frame)
+                self.counts[stack] += 1
+
+
+def format_collapsed(counts: Counter) -> str:
+    """Uma linha "pilha contagem" por pilha, da mais frequente à menos"""
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+class Profile:
+    def __init__(self, profile_id: str, name: str, sampler: StackSampler):
+        self.profile_id = profile_id
+        self.name = name
+        self.created_at = time.time()
+        self.duration_ms = round(sampler.duration * 1000, 3)
+        self.samples = sampler.samples
+        self.counts = sampler.counts
+
+    def summary(self) -> dict:
+        return {
+            "profile_id": self.profile_id,
+            "name": self.name,
+            "created_at": self.created_at,
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+            "stacks": len(self.counts),
+        }
+
+
+# Sampler da requisição sendo profilada; as tasks filhas herdam o contexto
+_active_sampler: contextvars.ContextVar[Optional[StackSampler]] = contextvars.ContextVar(
+    "active_sampler", default=None
+)
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop):
+    """
+    Registra no sampler ativo as tasks criadas por uma requisição profilada.
+
+    A factory fica instalada só enquanto houver requisição profilada; cada
+    chamada precisa de um _uninstall_task_factory correspondente.
+    """
+    current = loop.get_task_factory()
+    if getattr(current, "_profiler", False):
+        current._active += 1
+        return
+    previous = current
+
+    def task_factory(loop, coro, context=None):
+        if previous is not None:
+            task = previous(loop, coro, context=context) if context else previous(loop, coro)
+        else:
+            task = asyncio.Task(coro, loop=loop, context=context)
+        sampler = (context.get(_active_sampler) if context else None) or _active_sampler.get()
+        if sampler is not None:
+            sampler.tasks.append(task)
+        return task
+
+    task_factory._profiler = True
+    task_factory._previous = previous
+    task_factory._active = 1
+    loop.set_task_factory(task_factory)
+
+
+def _uninstall_task_factory(loop: asyncio.AbstractEventLoop):
+    """Devolve a factory anterior quando a última requisição profilada termina"""
+    current = loop.get_task_factory()
+    if not getattr(current, "_profiler", False):
+        return
+    current._active -= 1
+    if current._active == 0:
+        loop.set_task_factory(current._previous)
+
+
+# Perfis por requisição (X-Profile) mais recentes
+profile_store: Deque[Profile] = deque(maxlen=settings.PROFILE_KEEP)
+
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    for profile in profile_store:
+        if profile.profile_id == profile_id:
+            return profile
+    return None
+
+
+class ProfileMiddleware:
+    """
+    Profila a requisição que mandar X-Profile: 1 junto com X-Admin-Token.
+
+    O resultado fica em profile_store; o id (o mesmo do trace, quando há)
+    volta no header X-Profile-Id e o perfil sai em
+    GET /api/admin/profiles/{id}.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if headers.get("x-profile") not in ("1", "true") or not is_admin_token(
+            headers.get("x-admin-token")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = current_trace_id() or f"{time.time_ns():x}"
+
+        async def send_with_profile_id(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode("ascii")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        loop = asyncio.get_running_loop()
+        _install_task_factory(loop)
+        sampler = StackSampler(
+            settings.PROFILE_INTERVAL_MS / 1000, task=asyncio.current_task(), loop=loop
+        ).start()
+        token = _active_sampler.set(sampler)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _active_sampler.reset(token)
+            _uninstall_task_factory(loop)
+            # join fora do event loop: o sampler pode estar no meio de um intervalo
+            await asyncio.to_thread(sampler.stop)
+            profile_store.append(
+                Profile(profile_id, f"{scope['method']} {scope['path']}", sampler)
+            )
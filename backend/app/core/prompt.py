@@ -0,0 +1,180 @@
+"""
+Construção de prompts com orçamento de tokens
+
+O system prompt é sempre enviado como a primeira mensagem, sem nenhuma
+interpolação, para que o Ollama reaproveite o KV cache desse prefixo entre
+requisições. Histórico e dados de Pokémon são encaixados no espaço restante
+da janela de contexto (num_ctx - num_predict).
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Palavras e sinais de pontuação/emoji contam separadamente
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Tokens extras que o template de chat adiciona por mensagem (role, separadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Folga para diferenças entre a estimativa e o tokenizer real do modelo
+SAFETY_MARGIN_TOKENS = 64
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Estima o número de tokens de um texto sem depender do tokenizer do modelo.
+
+    Tokenizers BPE (Llama 3) geram ~1 token a cada 4 caracteres de uma palavra;
+    caracteres fora do ASCII (acentos, emojis) costumam custar mais.
+    """
+    if not text:
+        return 0
+
+    total = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece[0].isalnum() or piece[0] == "_":
+            total += 1 + (len(piece) - 1) // 4
+        else:
+            total += max(1, len(piece.encode("utf-8")) // 2)
+    return total
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Corta o texto para caber em max_tokens, preservando palavras inteiras"""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    used = 0
+    end = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        piece_tokens = estimate_tokens(match.group())
+        if used + piece_tokens > max_tokens - 1:  # reserva 1 token para "…"
+            break
+        used += piece_tokens
+        end = match.end()
+
+    return text[:end].rstrip() + "…"
+
+
+def _fit_lines(text: str, max_tokens: int) -> str:
+    """Mantém as primeiras linhas completas que couberem no orçamento"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        line_tokens = estimate_tokens(line) + 1
+        if used + line_tokens > max_tokens:
+            break
+        kept.append(line)
+        used += line_tokens
+    return "\n".join(kept)
+
+
+class PromptBuilder:
+    """Monta a lista de mensagens do Ollama respeitando a janela de contexto"""
+
+    def __init__(
+        self,
+        system_prompt: str,
+        num_ctx: int,
+        num_predict: int,
+        history_budget: int,
+        facts_budget: int,
+        history_message_max_tokens: int,
+    ):
+        self.system_prompt = system_prompt
+        self.num_ctx = num_ctx
+        self.num_predict = num_predict
+        self.history_budget = history_budget
+        self.facts_budget = facts_budget
+        self.history_message_max_tokens = history_message_max_tokens
+
+        # O prefixo é fixo: calculado uma única vez
+        self._system_message = {"role": "system", "content": system_prompt}
+        self._system_tokens = estimate_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+
+    @property
+    def prompt_budget(self) -> int:
+        """Tokens disponíveis para tudo que vem depois do system prompt"""
+        return max(
+            0,
+            self.num_ctx
+            - self.num_predict
+            - self._system_tokens
+            - SAFETY_MARGIN_TOKENS,
+        )
+
+    def _render_user_turn(
+        self, user_message: str, facts: Optional[str], is_comparison: bool
+    ) -> str:
+        if not facts:
+            return user_message
+
+        if is_comparison:
+            return f"""Contexto:
+{facts}
+
+Pergunta: {user_message}
+
+Faça uma comparação completa:
+1. Destaque as principais diferenças nas stats (2 frases)
+2. RECOMENDE qual é melhor e JUSTIFIQUE baseado nas stats (2-3 frases)
+3. Use emojis e seja objetivo"""
+
+        return f"Contexto:\n{facts}\n\nPergunta: {user_message}"
+
+    def build(
+        self,
+        user_message: str,
+        facts: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+        is_comparison: bool = False,
+    ) -> List[Dict[str, str]]:
+        """
+        Monta as mensagens: system (prefixo estável) + histórico + pergunta atual.
+
+        Args:
+            user_message: Mensagem atual do usuário
+            facts: Dados de Pokémon já formatados (uma informação por linha)
+            history: Mensagens anteriores em ordem cronológica ({role, content})
+            is_comparison: Usa as instruções de comparação no turno do usuário
+
+        Returns:
+            Lista de mensagens no formato do Ollama
+        """
+        remaining = self.prompt_budget
+
+        # 1. Turno atual: os fatos disputam espaço apenas com a própria pergunta
+        question = truncate_to_tokens(user_message, max(remaining // 4, 32))
+        if facts:
+            facts_budget = min(
+                self.facts_budget,
+                remaining - estimate_tokens(question) - MESSAGE_OVERHEAD_TOKENS - 64,
+            )
+            facts = _fit_lines(facts, max(facts_budget, 0)) or None
+
+        user_turn = {
+            "role": "user",
+            "content": self._render_user_turn(question, facts, is_comparison),
+        }
+        remaining -= estimate_tokens(user_turn["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+        # 2. Histórico: das mensagens mais recentes para as mais antigas
+        history_turns: List[Dict[str, str]] = []
+        history_remaining = min(self.history_budget, remaining)
+        for msg in reversed(history or []):
+            content = truncate_to_tokens(
+                msg["content"], self.history_message_max_tokens
+            )
+            cost = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+            if cost > history_remaining:
+                break
+            history_turns.append({"role": msg["role"], "content": content})
+            history_remaining -= cost
+        history_turns.reverse()
+
+        return [self._system_message, *history_turns, user_turn]
@@ -0,0 +1,40 @@
+"""
+Resposta JSON serializada com orjson
+
+É a default_response_class do app. Os endpoints de histórico, que carregam
+centenas de mensagens com pokemon_data aninhado, devolvem FastJSONResponse
+diretamente: assim o FastAPI pula o jsonable_encoder (que percorre o dict
+inteiro antes de serializar) e o orjson serializa os dicts de uma vez.
+Por isso eles não usam response_model (que o FastAPI não aplicaria a uma
+Response pronta): o schema vai para a documentação via responses=.
+
+dumps é o mesmo encoder para quem precisa dos bytes antes da resposta
+(ETag em app.core.http_cache).
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, volta ao json da stdlib
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto em UTF-8 (orjson quando disponível)"""
+    if orjson is not None:
+        # Chaves int (ex: {id: payload}) viram string, como no json da stdlib
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
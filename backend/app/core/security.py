@@ -1,40 +1,133 @@
+import logging
+import asyncio
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.metrics import register_cache
 from app.db.database import get_db
 from app.db.models import User
 
+logger = logging.getLogger(__name__)
+
 # Configurações
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Contexto de senha
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Contexto de senha: hashes com custo diferente de BCRYPT_ROUNDS são
+# considerados desatualizados e refeitos no login
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt leva ~100-300ms de CPU (e libera o GIL): roda num pool próprio e
+# limitado para não travar o event loop nem ocupar o executor padrão
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica se a senha corresponde ao hash"""
-    # Truncar senha para 72 bytes (limite do bcrypt)
-    if len(plain_password.encode("utf-8")) > 72:
-        plain_password = plain_password[:72]
-    return pwd_context.verify(plain_password, hashed_password)
+@dataclass(frozen=True)
+class Principal:
+    """
+    Usuário autenticado, sem vínculo com a sessão do banco
 
+    É o que get_current_user devolve: pode ficar em cache entre requisições
+    sem carregar uma instância ORM (e sem disparar lazy loads).
+    """
 
-def get_password_hash(password: str) -> str:
-    """Gera o hash da senha"""
+    id: int
+    username: str
+    email: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, username=user.username, email=user.email)
+
+
+# Cache dos usuários autenticados por 'sub' do token: evita um SELECT em
+# users a cada requisição. O TTL limita por quanto tempo uma alteração feita
+# por outro processo pode demorar a aparecer
+principal_cache: LRUCache[Principal] = LRUCache(
+    settings.AUTH_PRINCIPAL_CACHE_SIZE, ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
+register_cache("auth_principal", principal_cache)
+
+
+def invalidate_principal(username: str):
+    """Remove o usuário do cache (chamar ao alterar ou remover o usuário)"""
+    principal_cache.pop(username)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target):
+    invalidate_principal(target.username)
+    # Renomear muda a chave do cache: remove também o nome antigo
+    for old_username in inspect(target).attrs.username.history.deleted or ():
+        invalidate_principal(old_username)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Confere o X-Admin-Token dos endpoints de diagnóstico (False sem ADMIN_TOKEN)"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+def _truncate_password(password: str) -> str:
     # Truncar senha para 72 bytes (limite do bcrypt)
     if len(password.encode("utf-8")) > 72:
         password = password[:72]
-    return pwd_context.hash(password)
+    return password
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica se a senha corresponde ao hash (bloqueante)"""
+    return pwd_context.verify(_truncate_password(plain_password), hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    """Gera o hash da senha (bloqueante)"""
+    return pwd_context.hash(_truncate_password(password))
+
+
+async def hash_password(password: str) -> str:
+    """get_password_hash executado no pool do bcrypt"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a senha no pool do bcrypt.
+
+    Returns:
+        (senha correta, novo hash) — o novo hash só vem quando o hash salvo
+        usa um custo diferente de BCRYPT_ROUNDS e deve substituir o antigo
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor,
+        pwd_context.verify_and_update,
+        _truncate_password(plain_password),
+        hashed_password,
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -42,7 +135,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Cria um token JWT
     
     Args:
-        data: Dicionário com dados a codificar (deve ter 'sub' com username)
+        data: Dicionário com dados a codificar (deve ter 'sub' com username e
+            'uid' com o ID do usuário)
         expires_delta: Tempo de expiração customizado
         
     Returns:
@@ -61,17 +155,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
     """
     Obtém o usuário atual a partir do token JWT
     
+    O usuário é buscado no banco só na primeira requisição (ou após o TTL);
+    depois disso vem do principal_cache.
+    
     Args:
         token: Token JWT do header Authorization
         db: Sessão do banco de dados
         
     Returns:
-        User object do usuário autenticado
+        Principal do usuário autenticado
         
     Raises:
         HTTPException: Se token inválido ou usuário não encontrado
@@ -86,6 +183,7 @@ async def get_current_user(
         # Decodificar token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("uid")  # ausente em tokens antigos
         
         if username is None:
             raise credentials_exception
@@ -93,12 +191,22 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Buscar usuário por username (não por ID)
-    user = db.query(User).filter(User.username == username).first()
+    principal = principal_cache.get(username)
     
-    if user is None:
-        raise credentials_exception
+    if principal is None:
+        # Buscar usuário por username (não por ID)
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalar_one_or_none()
+        
+        if user is None:
+            raise credentials_exception
+        
+        principal = Principal.from_user(user)
+        principal_cache.set(username, principal)
+        logger.debug("✅ Usuário autenticado: %s (ID: %s)", user.username, user.id)
     
-    print(f"✅ [AUTH] Usuário autenticado: {user.username} (ID: {user.id})")
+    # Token emitido para outro usuário que tinha o mesmo username
+    if user_id is not None and user_id != principal.id:
+        raise credentials_exception
     
-    return user
\ No newline at end of file
+    return principal
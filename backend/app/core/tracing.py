@@ -0,0 +1,444 @@
+"""
+Tracing por requisição (árvore de spans) com captura das requisições lentas
+
+Cada requisição HTTP vira um trace: o TracingMiddleware abre o span raiz e,
+dentro dele, span() abre spans filhos. O span atual fica numa ContextVar,
+então tasks criadas durante a requisição (gather, single-flight do
+pokemon_store) penduram seus spans no span de quem as criou.
+
+Fora de uma requisição rastreada span() não faz nada: scripts e benchmarks
+não pagam o custo.
+
+Spans registrados automaticamente:
+- db: cada statement do SQLAlchemy (instrument_engine)
+- pokeapi: cada chamada HTTP à PokéAPI (transport do httpx em pokeapi.py)
+- llm.queue / llm.generate: espera por vaga e geração no Ollama
+- chat.*: etapas de POST /api/chat/message
+
+Traces terminados ficam em trace_store: um ring buffer com os mais recentes
+e, à parte, os TRACE_SLOW_KEEP mais lentos desde o início do processo. Com
+TRACE_EXPORT_PATH e/ou TRACE_OTLP_ENDPOINT eles também são exportados em
+OTLP/JSON por uma thread em background.
+"""
+
+import heapq
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, json da stdlib
+    import json
+
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "pokedex-ai-backend"
+
+# Rotas que não viram trace (scrape de métricas, health check, o próprio admin)
+UNTRACED_PREFIXES = ("/metrics", "/health", "/api/admin")
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_id",
+        "name",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def finish(self, error: Optional[BaseException] = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.perf_counter_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class Trace:
+    def __init__(self, name: str, attributes: dict):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.started_at_ns = time.time_ns()
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.root = self.start_span(name, None, attributes)
+
+    def start_span(self, name: str, parent_id: Optional[str], attributes: dict) -> Optional[Span]:
+        if len(self.spans) >= settings.TRACE_MAX_SPANS:
+            self.dropped_spans += 1
+            return None
+        span = Span(self, name, parent_id, attributes)
+        self.spans.append(span)
+        return span
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+    def _unix_ns(self, perf_ns: int) -> int:
+        return self.started_at_ns + (perf_ns - self.root.start_ns)
+
+    def summary(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "started_at": self.started_at_ns / 1e9,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.root.attributes.get("http.status_code"),
+            "error": self.root.error,
+            "spans": len(self.spans),
+            "dropped_spans": self.dropped_spans,
+        }
+
+    def breakdown(self) -> List[dict]:
+        """Spans agrupados por nome: quantos e quanto tempo somado, do maior ao menor"""
+        groups: Dict[str, List[float]] = {}
+        for span in self.spans[1:]:
+            groups.setdefault(span.name, []).append(span.duration_ms)
+        rows = [
+            {
+                "name": name,
+                "count": len(durations),
+                "total_ms": round(sum(durations), 3),
+                "max_ms": round(max(durations), 3),
+            }
+            for name, durations in groups.items()
+        ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def tree(self) -> dict:
+        """Árvore de spans com início relativo ao começo da requisição"""
+        nodes = {
+            span.span_id: {
+                "name": span.name,
+                "start_ms": round((span.start_ns - self.root.start_ns) / 1e6, 3),
+                "duration_ms": round(span.duration_ms, 3),
+                "attributes": span.attributes,
+                "error": span.error,
+                "children": [],
+            }
+            for span in self.spans
+        }
+        for span in self.spans[1:]:
+            parent = nodes.get(span.parent_id) or nodes[self.root.span_id]
+            parent["children"].append(nodes[span.span_id])
+        return nodes[self.root.span_id]
+
+    def to_dict(self) -> dict:
+        return {**self.summary(), "breakdown": self.breakdown(), "root": self.tree()}
+
+    def to_otlp(self) -> dict:
+        """Trace no formato OTLP/JSON (ExportTraceServiceRequest)"""
+        spans = []
+        for span in self.spans:
+            end_ns = span.end_ns if span.end_ns is not None else span.start_ns
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 2 if span is self.root else 1,  # SERVER / INTERNAL
+                "startTimeUnixNano": str(self._unix_ns(span.start_ns)),
+                "endTimeUnixNano": str(self._unix_ns(end_ns)),
+                "attributes": [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _dumps(data: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=str)
+    return json.dumps(data, default=str).encode("utf-8")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace.trace_id if span is not None else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """
+    Span filho do span atual; None (e nenhum custo) fora de um trace.
+
+    O span termina com o bloco; uma exceção fica registrada no span e segue.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = parent.trace.start_span(name, parent.span_id, attributes)
+    if child is None:
+        yield None
+        return
+
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.finish(e)
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+
+def start_detached_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Span filho do atual que não vira o span corrente.
+
+    Para callbacks que abrem e fecham em pontos diferentes (eventos do
+    SQLAlchemy); quem chama precisa chamar finish().
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return parent.trace.start_span(name, parent.span_id, attributes)
+
+
+class TraceStore:
+    """Traces recentes (ring buffer) e os mais lentos (mantidos completos)"""
+
+    def __init__(self, buffer_size: int, slow_keep: int):
+        self.recent: Deque[Trace] = deque(maxlen=buffer_size)
+        self.slow_keep = slow_keep
+        # min-heap por duração: o topo é o mais rápido entre os lentos
+        self._slow: List[Tuple[float, int, Trace]] = []
+        self._sequence = 0
+
+    def add(self, trace: Trace):
+        self.recent.append(trace)
+        self._sequence += 1
+        entry = (trace.duration_ms, self._sequence, trace)
+        if len(self._slow) < self.slow_keep:
+            heapq.heappush(self._slow, entry)
+        elif entry[0] > self._slow[0][0]:
+            heapq.heapreplace(self._slow, entry)
+
+    def slowest(self) -> List[Trace]:
+        return [trace for _, _, trace in sorted(self._slow, reverse=True)]
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        for trace in reversed(self.recent):
+            if trace.trace_id == trace_id:
+                return trace
+        for _, _, trace in self._slow:
+            if trace.trace_id == trace_id:
+                return trace
+        return None
+
+    def clear(self):
+        self.recent.clear()
+        self._slow.clear()
+
+
+class OTLPExporter:
+    """
+    Exporta traces em OTLP/JSON numa thread própria.
+
+    - path: uma linha JSON (ExportTraceServiceRequest) por trace, o formato
+      do file exporter do OpenTelemetry Collector
+    - endpoint: POST em <endpoint>/v1/traces (OTLP/HTTP com JSON)
+
+    A fila é limitada: se o destino não acompanhar, traces são descartados
+    em vez de acumular memória.
+    """
+
+    def __init__(self, path: Optional[str], endpoint: Optional[str], max_queue: int = 1000):
+        self.path = path
+        self.endpoint = endpoint.rstrip("/") + "/v1/traces" if endpoint else None
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Trace]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, trace: Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        client = httpx.Client(timeout=5.0) if self.endpoint else None
+        try:
+            while True:
+                trace = self._queue.get()
+                if trace is None:
+                    return
+                body = _dumps(trace.to_otlp())
+                try:
+                    if self.path:
+                        with open(self.path, "ab") as f:
+                            f.write(body + b"\n")
+                    if client is not None:
+                        client.post(
+                            self.endpoint,
+                            content=body,
+                            headers={"content-type": "application/json"},
+                        ).raise_for_status()
+                except Exception as e:
+                    self.dropped += 1
+                    logger.warning("❌ Falha ao exportar trace %s: %s", trace.trace_id, e)
+        finally:
+            if client is not None:
+                client.close()
+
+
+trace_store = TraceStore(settings.TRACE_BUFFER_SIZE, settings.TRACE_SLOW_KEEP)
+
+_exporter: Optional[OTLPExporter] = None
+
+
+def start_exporter():
+    """Inicia a exportação OTLP se TRACE_EXPORT_PATH ou TRACE_OTLP_ENDPOINT estiverem definidos"""
+    global _exporter
+    if _exporter is None and (settings.TRACE_EXPORT_PATH or settings.TRACE_OTLP_ENDPOINT):
+        _exporter = OTLPExporter(settings.TRACE_EXPORT_PATH, settings.TRACE_OTLP_ENDPOINT)
+        logger.info(
+            "📤 Exportando traces em OTLP/JSON para %s",
+            settings.TRACE_EXPORT_PATH or _exporter.endpoint,
+        )
+
+
+def stop_exporter():
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
+
+
+def finish_trace(trace: Trace):
+    trace_store.add(trace)
+    if _exporter is not None:
+        _exporter.submit(trace)
+
+
+class TracingMiddleware:
+    """Abre o span raiz de cada requisição e devolve o trace id em X-Trace-Id"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(UNTRACED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(
+            f"{scope['method']} {scope['path']}",
+            {"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        root = trace.root
+
+        async def send_with_trace_id(message: Message):
+            if message["type"] == "http.response.start":
+                root.set(**{"http.status_code": message["status"]})
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", trace.trace_id.encode("ascii")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        except BaseException as e:
+            root.finish(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            # Com a rota resolvida, o nome agrupa requisições do mesmo endpoint
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                root.name = f"{scope['method']} {route.path}"
+            root.finish()
+            finish_trace(trace)
+
+
+def instrument_engine(engine):
+    """Um span "db <VERBO>" por statement executado na engine (síncrona ou async)"""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        if context is not None:
+            context._trace_span = start_detached_span(
+                f"db {verb}", **{"db.statement": statement[:300]}
+            )
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.finish()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.finish(exception_context.original_exception)
@@ -1,30 +1,70 @@
 # backend/app/db/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.tracing import instrument_engine
 
-# Cria engine do banco de dados
+# Drivers assíncronos usados pela aplicação para cada banco
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_url(url: str):
+    """Troca o driver síncrono da DATABASE_URL pelo equivalente assíncrono"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    return parsed.set(drivername=driver) if driver else parsed
+
+
+def _pool_options(url) -> dict:
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Engine síncrona: criação de tabelas, Alembic e scripts
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
 
-# Cria sessão local
+# Cria sessão local (síncrona, para scripts)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrona usada pelos endpoints: as esperas do banco não bloqueiam
+# o event loop e se sobrepõem às chamadas ao LLM e à PokéAPI
+async_database_url = _async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    async_database_url, **_pool_options(async_database_url)
+)
+instrument_engine(async_engine)
+
+# expire_on_commit=False: objetos continuam legíveis depois do commit sem
+# disparar um SELECT implícito (que não é permitido fora do greenlet)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Base para os modelos
 Base = declarative_base()
 
 
 # Dependency para obter sessão do banco
-def get_db():
+async def get_db():
     """
-    Dependency que fornece uma sessão do banco de dados.
+    Dependency que fornece uma sessão assíncrona do banco de dados.
     A sessão é fechada automaticamente após o uso.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
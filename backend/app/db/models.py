@@ -9,14 +9,49 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Text,
     JSON,
+    LargeBinary,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime
 from app.db.database import Base
 
 
+class utcnow(FunctionElement):
+    """
+    Timestamp UTC (sem timezone) gerado pelo próprio banco
+
+    Usado como server_default para que o INSERT devolva o valor via RETURNING
+    em vez de cada linha precisar de um SELECT depois do commit.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP do SQLite só tem resolução de segundos. O texto tem
+    # que seguir o formato em que o SQLAlchemy grava DateTime (6 casas de
+    # microssegundos): o SQLite compara datas como strings, e com 3 casas o
+    # cursor da paginação ficaria "menor que ele mesmo"
+    return "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
 class User(Base):
     """
     Modelo de Usuário
@@ -43,6 +78,10 @@ class Conversation(Base):
     """
 
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Sidebar: WHERE user_id = ? ORDER BY updated_at DESC
+        Index("ix_conversations_user_updated", "user_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -53,6 +92,9 @@ class Conversation(Base):
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
+    # Mantidos na mesma transação que insere/remove mensagens
+    message_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_message_preview = Column(String(255), nullable=True)
 
     # Relacionamentos
     user = relationship("User", back_populates="conversations")
@@ -60,11 +102,6 @@ class Conversation(Base):
         "ChatMessage", back_populates="conversation", cascade="all, delete-orphan"
     )
 
-    @property
-    def message_count(self):
-        """Retorna o número de mensagens na conversa"""
-        return len(self.messages)
-
 
 class ChatMessage(Base):
     """
@@ -72,6 +109,20 @@ class ChatMessage(Base):
     """
 
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Histórico de uma conversa em ordem cronológica estável
+        Index(
+            "ix_chat_messages_conversation_created_id",
+            "conversation_id",
+            "created_at",
+            "id",
+        ),
+        # Mensagens recentes do usuário (contexto do LLM); o id desempata as
+        # mensagens gravadas na mesma transação, que têm o mesmo created_at
+        Index("ix_chat_messages_user_created_id", "user_id", "created_at", "id"),
+    )
+    # INSERT ... RETURNING id, created_at: o flush já traz os valores do banco
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(
@@ -80,9 +131,28 @@ class ChatMessage(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
     is_bot = Column(Boolean, default=False, nullable=False)
+    # Legado: mensagens novas guardam apenas a chave em pokemon_payload_hash
     pokemon_data = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    pokemon_payload_hash = Column(
+        String(64), ForeignKey("pokemon_payloads.hash"), nullable=True
+    )
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
 
     # Relacionamentos
     user = relationship("User", back_populates="messages")
     conversation = relationship("Conversation", back_populates="messages")
+
+
+class PokemonPayload(Base):
+    """
+    Dados de Pokémon endereçados por conteúdo (sha256 do JSON canônico)
+
+    Cada card de Pokémon é gravado uma única vez, comprimido; o payload de uma
+    mensagem (single, comparação ou equipe) referencia os cards pelo hash.
+    """
+
+    __tablename__ = "pokemon_payloads"
+
+    hash = Column(String(64), primary_key=True)
+    data = Column(LargeBinary, nullable=False)  # JSON comprimido com zlib
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
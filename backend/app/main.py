@@ -1,20 +1,44 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.api.endpoints import auth, chat, conversations
+from app.api.endpoints import admin, auth, chat, conversations, pokemon
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.loop_monitor import loop_monitor
+from app.core.profiler import ProfileMiddleware
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry
+from app.core.responses import FastJSONResponse
+from app.core.security import password_executor
+from app.core.tracing import TracingMiddleware, start_exporter, stop_exporter
+from app.db.database import async_engine
 from app.services.chat_service import load_pokemon_names_cache
 
+logger = logging.getLogger(__name__)
+
+# Antes de qualquer log: fila + escritor em background
+setup_logging()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("🚀 [STARTUP] Iniciando aplicação...")
-    print("🔄 [STARTUP] Carregando cache de Pokémon...")
+    logger.info("🚀 Iniciando aplicação...")
+    start_exporter()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    logger.info("🔄 Carregando cache de Pokémon...")
     await load_pokemon_names_cache()
-    print("✅ [STARTUP] Cache carregado com sucesso!")
+    logger.info("✅ Cache carregado com sucesso!")
     yield
     # Shutdown
-    print("👋 [SHUTDOWN] Encerrando aplicação...")
+    logger.info("👋 Encerrando aplicação...")
+    await loop_monitor.stop()
+    await async_engine.dispose()
+    password_executor.shutdown(wait=False)
+    stop_exporter()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -22,8 +46,25 @@ app = FastAPI(
     description="API para o assistente de Pokémon com IA",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+# Compressão gzip/brotli negociada (respostas pré-comprimidas passam direto)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
 )
 
+# X-Profile: 1 (com X-Admin-Token) profila a requisição; dentro do tracing
+# para usar o trace id como id do profile
+app.add_middleware(ProfileMiddleware)
+
+# Trace por requisição (X-Trace-Id); mais externo que a compressão para
+# incluir o tempo dela
+app.add_middleware(TracingMiddleware)
+
 # CORS - IMPORTANTE: Deve estar ANTES das rotas
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +78,8 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 app.include_router(conversations.router, prefix="/api/conversations", tags=["conversations"])  
+app.include_router(pokemon.router, prefix="/api")
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
 async def root():
@@ -55,3 +98,9 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas no formato texto do Prometheus"""
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
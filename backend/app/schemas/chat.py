@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 
 
 class ChatRequest(BaseModel):
@@ -12,4 +12,76 @@ class ChatResponse(BaseModel):
     user_message: str
     bot_response: str
     pokemon_data: Optional[Dict[str, Any]] = None
-    timestamp: str
\ No newline at end of file
+    timestamp: str
+
+# Modelos das respostas do chat. Os endpoints de histórico devolvem
+# FastJSONResponse diretamente; aqui eles servem à documentação (OpenAPI).
+
+class PokemonCard(BaseModel):
+    """Card de Pokémon exibido nas mensagens do bot"""
+    id: int
+    name: str
+    sprites: Dict[str, Optional[str]]
+    types: List[str]
+    stats: Dict[str, int]
+
+
+class PokemonComparison(BaseModel):
+    """pokemon_data de uma comparação"""
+    is_comparison: bool = True
+    pokemon_list: List[PokemonCard]
+
+
+class PokemonTeam(BaseModel):
+    """pokemon_data de uma equipe gerada"""
+    is_team: bool = True
+    team_list: List[PokemonCard]
+    strategy: Dict[str, Any]
+
+
+PokemonData = Union[PokemonCard, PokemonComparison, PokemonTeam]
+
+
+class SentMessage(BaseModel):
+    """Mensagem do usuário recém-gravada"""
+    id: int
+    content: str
+    timestamp: str
+
+
+class BotMessage(SentMessage):
+    """Resposta do bot recém-gravada"""
+    pokemon_data: Optional[PokemonData] = None
+
+
+class HistoryMessage(BaseModel):
+    """Mensagem de GET /api/chat/history"""
+    id: int
+    content: str
+    is_bot: bool
+    timestamp: str
+    pokemon_data: Optional[PokemonData] = None
+
+
+class HistoryResponse(BaseModel):
+    """Página do histórico (mensagens em ordem cronológica)"""
+    conversation_id: int
+    next_cursor: Optional[int] = None
+    messages: List[HistoryMessage]
+
+
+class ConversationMessage(BaseModel):
+    """Mensagem de GET /api/conversations/{id}/messages"""
+    id: int
+    content: str
+    is_bot: bool
+    pokemon_data: Optional[PokemonData] = None
+    created_at: str
+
+
+class ConversationMessagesResponse(BaseModel):
+    """Página de mensagens de uma conversa"""
+    conversation_id: int
+    next_cursor: Optional[int] = None
+    messages: List[ConversationMessage]
+    total: int
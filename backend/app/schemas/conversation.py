@@ -31,6 +31,7 @@ class ConversationResponse(ConversationBase):
     created_at: datetime
     updated_at: datetime
     message_count: Optional[int] = 0
+    last_message_preview: Optional[str] = None
 
     class Config:
         from_attributes = True  # Permite criar a partir de modelos SQLAlchemy
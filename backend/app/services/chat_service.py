@@ -1,14 +1,29 @@
+import logging
 from typing import Optional
 from datetime import datetime
-from sqlalchemy.orm import Session
-from app.core.llm import llama_chat
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.llm import (
+    llama_chat,
+    INTENT_CHAT,
+    INTENT_COMPARISON,
+    INTENT_LOOKUP,
+    INTENT_TEAM,
+)
+from app.core.config import settings
+from app.core.http_cache import PrecompressedJSON
+from app.core.logging import SAMPLED
 from app.db.models import ChatMessage, User
 from app.services.pokeapi import pokeapi_service
+from app.services.pokemon_index import pokemon_id_for_position, pokemon_index, sprite_url
+from app.services.pokemon_store import pokemon_store
 import re
 import random
 from difflib import get_close_matches
 import asyncio
 
+logger = logging.getLogger(__name__)
+
 # Armazenar última equipe gerada para evitar repetição
 LAST_TEAM_IDS = []
 
@@ -17,64 +32,111 @@ POKEMON_NAMES_CACHE = []
 CACHE_LOADED = False
 CACHE_LOCK = asyncio.Lock()
 
+# Resposta de /api/chat/pokemon-list, montada junto com o cache de nomes
+POKEMON_LIST_PAYLOAD: Optional[PrecompressedJSON] = None
+
+
+def build_pokemon_list_payload(names: list) -> PrecompressedJSON:
+    """Lista de Pokémon com sprites para o autocomplete"""
+    pokemon_with_sprites = []
+    for idx, name in enumerate(names, start=1):
+        pokemon_with_sprites.append(
+            {"name": name, "sprite": sprite_url(pokemon_id_for_position(idx))}
+        )
+
+    mega_count = sum(1 for p in pokemon_with_sprites if "-mega" in p["name"])
+    payload = PrecompressedJSON(
+        {"pokemon": pokemon_with_sprites, "count": len(pokemon_with_sprites)},
+        cache_control=f"public, max-age={settings.POKEMON_LIST_MAX_AGE_SECONDS}",
+    )
+    logger.info(
+        "✅ Lista de Pokémon pré-computada: %s (%s Megas), %s bytes, %s",
+        len(pokemon_with_sprites),
+        mega_count,
+        len(payload.body),
+        ", ".join(f"{enc} {len(body)} bytes" for enc, body in payload.encoded.items()),
+    )
+    return payload
+
 
 async def load_pokemon_names_cache():
     """Carrega cache de nomes de Pokémon (executado uma vez)"""
-    global POKEMON_NAMES_CACHE, CACHE_LOADED
+    global POKEMON_NAMES_CACHE, CACHE_LOADED, POKEMON_LIST_PAYLOAD
 
     async with CACHE_LOCK:
         if CACHE_LOADED:
             return
 
-        print("🔄 [CACHE] Carregando nomes de todos os Pokémon...")
+        logger.info("🔄 Carregando nomes de todos os Pokémon...")
         POKEMON_NAMES_CACHE = await pokeapi_service.get_all_pokemon_names()
+        POKEMON_LIST_PAYLOAD = build_pokemon_list_payload(POKEMON_NAMES_CACHE)
+        pokemon_index.rebuild(POKEMON_NAMES_CACHE)
         CACHE_LOADED = True
-        print(f"✅ [CACHE] {len(POKEMON_NAMES_CACHE)} nomes em cache")
+        logger.info("✅ %s nomes em cache", len(POKEMON_NAMES_CACHE))
+
+
+def record_pokemon_lookups(pokemon_data: Optional[dict]):
+    """Alimenta o ranking de popularidade do autocomplete"""
+    # Equipes são sorteadas: só contam Pokémon pedidos pelo usuário
+    if not pokemon_data or pokemon_data.get("is_team"):
+        return
+    for pokemon in pokemon_data.get("pokemon_list") or [pokemon_data]:
+        if pokemon.get("name"):
+            pokemon_index.record_lookup(pokemon["name"])
 
 
 class ChatService:
     def __init__(self):
         self.llama = llama_chat
 
-    async def process_message(self, message: str, user_id: int, db: Session) -> dict:
+    async def process_message(
+        self, message: str, user_id: int, db: AsyncSession
+    ) -> dict:
         """Processa uma mensagem do usuário e retorna a resposta da IA"""
-        print(f"📝 [CHAT_SERVICE] Processando mensagem: {message}")
+        logger.debug("📝 Processando mensagem: %s", message)
 
         user_message = ChatMessage(
             user_id=user_id, content=message, is_bot=False, created_at=datetime.utcnow()
         )
         db.add(user_message)
-        db.commit()
+        await db.commit()
 
-        print(f"💾 [CHAT_SERVICE] Mensagem do usuário salva no banco")
+        logger.debug("💾 Mensagem do usuário salva no banco")
 
         pokemon_data = await self._detect_and_fetch_pokemon(message)
 
         if pokemon_data:
             if pokemon_data.get("is_team"):
-                print(
-                    f"🎯 [CHAT_SERVICE] Equipe detectada: {len(pokemon_data['team_list'])} Pokémon"
+                logger.info(
+                    "🎯 Equipe detectada: %s Pokémon",
+                    len(pokemon_data['team_list']),
+                    extra=SAMPLED,
                 )
             elif pokemon_data.get("is_comparison"):
-                print(
-                    f"🔍🔍 [CHAT_SERVICE] Comparação detectada: {len(pokemon_data['pokemon_list'])} Pokémon"
+                logger.info(
+                    "🔍🔍 Comparação detectada: %s Pokémon",
+                    len(pokemon_data['pokemon_list']),
+                    extra=SAMPLED,
                 )
             else:
-                print(f"🔍 [CHAT_SERVICE] Pokémon detectado: {pokemon_data['name']}")
+                logger.info("🔍 Pokémon detectado: %s", pokemon_data['name'], extra=SAMPLED)
 
-        history = self._get_chat_history(user_id, db)
-        context = self._build_context(history, pokemon_data)
+        history = await self._get_chat_history(user_id, db)
+        context = self._build_context(pokemon_data)
 
-        print(f"🤖 [CHAT_SERVICE] Gerando resposta com Ollama...")
+        logger.debug("🤖 Gerando resposta com Ollama...")
 
         try:
             bot_response = await self.llama.generate_response(
-                user_message=message, context=context
+                user_message=message,
+                context=context,
+                history=history,
+                intent=self.detect_intent(pokemon_data),
             )
-            print(f"✅ [CHAT_SERVICE] Resposta gerada: {bot_response[:100]}...")
+            logger.debug("✅ Resposta gerada: %s...", bot_response[:100])
         except Exception as e:
-            print(f"❌ [CHAT_SERVICE] Erro ao gerar resposta com Ollama: {e}")
-            print(f"❌ [CHAT_SERVICE] Usando fallback...")
+            logger.error("❌ Erro ao gerar resposta com Ollama: %s", e)
+            logger.warning("❌ Usando fallback...")
             bot_response = self._generate_fallback_response(pokemon_data)
 
         bot_message = ChatMessage(
@@ -84,9 +146,9 @@ class ChatService:
             created_at=datetime.utcnow(),
         )
         db.add(bot_message)
-        db.commit()
+        await db.commit()
 
-        print(f"💾 [CHAT_SERVICE] Resposta do bot salva no banco")
+        logger.debug("💾 Resposta do bot salva no banco")
 
         return {
             "user_message": message,
@@ -145,15 +207,15 @@ class ChatService:
 
         return f"Encontrei {pokemon_data['name']}! É do tipo {', '.join(pokemon_data['types'])} com {pokemon_data['stats']['hp']} HP. Veja mais no card! 🔴"
 
-    def _get_chat_history(self, user_id: int, db: Session, limit: int = 5):
+    async def _get_chat_history(self, user_id: int, db: AsyncSession, limit: int = 5):
         """Busca histórico recente de mensagens"""
-        messages = (
-            db.query(ChatMessage)
-            .filter(ChatMessage.user_id == user_id)
-            .order_by(ChatMessage.created_at.desc())
+        result = await db.execute(
+            select(ChatMessage.is_bot, ChatMessage.content)
+            .where(ChatMessage.user_id == user_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
             .limit(limit)
-            .all()
         )
+        messages = result.all()
         return [
             {"role": "assistant" if msg.is_bot else "user", "content": msg.content}
             for msg in reversed(messages)
@@ -197,7 +259,7 @@ class ChatService:
 
         if word_lower in common_typos:
             corrected = common_typos[word_lower]
-            print(f"🔧 [TYPO] Correção manual: '{word}' -> '{corrected}'")
+            logger.debug("🔧 Correção manual: '%s' -> '%s'", word, corrected)
             return corrected
 
         if POKEMON_NAMES_CACHE:
@@ -207,7 +269,7 @@ class ChatService:
 
             if matches:
                 corrected = matches[0]
-                print(f"🔧 [TYPO] Fuzzy match (75%): '{word}' -> '{corrected}'")
+                logger.debug("🔧 Fuzzy match (75%%): '%s' -> '%s'", word, corrected)
                 return corrected
 
             matches = get_close_matches(
@@ -216,16 +278,16 @@ class ChatService:
 
             if matches:
                 corrected = matches[0]
-                print(f"🔧 [TYPO] Fuzzy match (60%): '{word}' -> '{corrected}'")
+                logger.debug("🔧 Fuzzy match (60%%): '%s' -> '%s'", word, corrected)
                 return corrected
 
         if len(word_lower) >= 4 and POKEMON_NAMES_CACHE:
             for pokemon in POKEMON_NAMES_CACHE:
                 if len(pokemon) >= 4 and word_lower[:4] == pokemon[:4]:
-                    print(f"🔧 [TYPO] Prefixo match: '{word}' -> '{pokemon}'")
+                    logger.debug("🔧 Prefixo match: '%s' -> '%s'", word, pokemon)
                     return pokemon
 
-        print(f"⚠️ [TYPO] Nenhuma correção encontrada para: '{word}'")
+        logger.debug("⚠️ Nenhuma correção encontrada para: '%s'", word)
         return None
 
     async def _detect_and_fetch_pokemon(self, message: str) -> Optional[dict]:
@@ -286,25 +348,24 @@ class ChatService:
             if len(clean_word) <= 2 or clean_word in words_to_remove:
                 continue
 
-            print(f"🔍 [CHAT_SERVICE] Tentando buscar direto: {clean_word}")
+            logger.debug("🔍 Tentando buscar direto: %s", clean_word)
             try:
-                pokemon_data = await pokeapi_service.get_pokemon(clean_word)
+                pokemon_data = await pokemon_store.get_pokemon(clean_word)
                 if pokemon_data:
-                    print(
-                        f"✅ [CHAT_SERVICE] Pokémon encontrado direto: {pokemon_data['name']}"
-                    )
+                    logger.debug("✅ Pokémon encontrado direto: %s", pokemon_data['name'])
                     return pokemon_data
             except:
                 pass
 
             corrected_word = await self._try_fuzzy_pokemon_name(clean_word)
             if corrected_word and corrected_word != clean_word:
-                print(f"🔍 [CHAT_SERVICE] Tentando com correção: {corrected_word}")
+                logger.debug("🔍 Tentando com correção: %s", corrected_word)
                 try:
-                    pokemon_data = await pokeapi_service.get_pokemon(corrected_word)
+                    pokemon_data = await pokemon_store.get_pokemon(corrected_word)
                     if pokemon_data:
-                        print(
-                            f"✅ [CHAT_SERVICE] Pokémon encontrado com correção: {pokemon_data['name']}"
+                        logger.debug(
+                            "✅ Pokémon encontrado com correção: %s",
+                            pokemon_data['name'],
                         )
                         return pokemon_data
                 except:
@@ -321,9 +382,9 @@ class ChatService:
         )
 
         if longest_word and len(longest_word) >= 3:
-            print(f"🔍 [CHAT_SERVICE] Tentando palavra mais longa: {longest_word}")
+            logger.debug("🔍 Tentando palavra mais longa: %s", longest_word)
             try:
-                pokemon_data = await pokeapi_service.get_pokemon(longest_word)
+                pokemon_data = await pokemon_store.get_pokemon(longest_word)
                 if pokemon_data:
                     return pokemon_data
             except:
@@ -331,22 +392,20 @@ class ChatService:
 
             corrected = await self._try_fuzzy_pokemon_name(longest_word)
             if corrected and corrected != longest_word:
-                print(
-                    f"🔍 [CHAT_SERVICE] Tentando correção da palavra longa: {corrected}"
-                )
+                logger.debug("🔍 Tentando correção da palavra longa: %s", corrected)
                 try:
-                    pokemon_data = await pokeapi_service.get_pokemon(corrected)
+                    pokemon_data = await pokemon_store.get_pokemon(corrected)
                     if pokemon_data:
                         return pokemon_data
                 except:
                     pass
 
-        print(f"❌ [CHAT_SERVICE] Nenhum Pokémon identificado: {message}")
+        logger.debug("❌ Nenhum Pokémon identificado: %s", message)
         return None
 
     async def _detect_multiple_pokemon(self, message: str) -> Optional[dict]:
         """Detecta múltiplos Pokémon para comparação"""
-        print(f"🔍🔍 [CHAT_SERVICE] Detectando comparação")
+        logger.debug("🔍🔍 Detectando comparação")
 
         words_to_remove = [
             "me",
@@ -375,14 +434,14 @@ class ChatService:
         pokemon_list = []
         for name in pokemon_names[:2]:
             try:
-                pokemon_data = await pokeapi_service.get_pokemon(name)
+                pokemon_data = await pokemon_store.get_pokemon(name)
                 if pokemon_data:
                     pokemon_list.append(pokemon_data)
             except:
                 corrected = await self._try_fuzzy_pokemon_name(name)
                 if corrected:
                     try:
-                        pokemon_data = await pokeapi_service.get_pokemon(corrected)
+                        pokemon_data = await pokemon_store.get_pokemon(corrected)
                         if pokemon_data:
                             pokemon_list.append(pokemon_data)
                     except:
@@ -457,18 +516,20 @@ class ChatService:
             max_attempts = 50
             mega_count = 0  # Contador de Mega Evolutions
 
-            print(
-                f"🎯 [TEAM] Gerando equipe (tipo: {type_filter}, estratégia: {strategy_filter})"
+            logger.debug(
+                "🎯 Gerando equipe (tipo: %s, estratégia: %s)",
+                type_filter,
+                strategy_filter,
             )
 
             # Buscar apenas Pokémon totalmente evoluídos
             if type_filter:
-                print(f"🔍 [TEAM] Buscando Pokémon evoluídos do tipo {type_filter}...")
+                logger.debug("🔍 Buscando Pokémon evoluídos do tipo %s...", type_filter)
                 evolved_ids = await pokeapi_service.get_fully_evolved_pokemon(
                     type_filter, limit=30
                 )
             else:
-                print(f"🔍 [TEAM] Buscando Pokémon evoluídos de tipos variados...")
+                logger.debug("🔍 Buscando Pokémon evoluídos de tipos variados...")
                 main_types = ["fire", "water", "grass", "electric", "psychic", "dragon"]
                 evolved_ids = []
 
@@ -479,7 +540,7 @@ class ChatService:
                     evolved_ids.extend(type_evolved[:5])
 
             if not evolved_ids:
-                print(f"⚠️ [TEAM] Nenhum Pokémon evoluído encontrado")
+                logger.warning("⚠️ Nenhum Pokémon evoluído encontrado")
                 return None
 
             available_ids = [pid for pid in evolved_ids if pid not in LAST_TEAM_IDS]
@@ -498,7 +559,7 @@ class ChatService:
                     break
 
                 try:
-                    pokemon_data = await pokeapi_service.get_pokemon(pokemon_id)
+                    pokemon_data = await pokemon_store.get_pokemon(pokemon_id)
 
                     if pokemon_data:
                         # Verificar se é Mega Evolution
@@ -508,8 +569,9 @@ class ChatService:
 
                         # Se já tem 1 Mega, pular outros Megas
                         if is_mega and mega_count >= 1:
-                            print(
-                                f"⏭️ [TEAM] {pokemon_data['name']} é Mega, mas já tem 1 na equipe"
+                            logger.debug(
+                                "⏭️ %s é Mega, mas já tem 1 na equipe",
+                                pokemon_data['name'],
                             )
                             attempts += 1
                             continue
@@ -526,14 +588,15 @@ class ChatService:
 
                         if is_mega:
                             mega_count += 1
-                            print(
-                                f"✅ [TEAM] Adicionado MEGA: {pokemon_data['name']} (1/1)"
+                            logger.debug(
+                                "✅ Adicionado MEGA: %s (1/1)",
+                                pokemon_data['name'],
                             )
                         else:
-                            print(f"✅ [TEAM] Adicionado: {pokemon_data['name']}")
+                            logger.debug("✅ Adicionado: %s", pokemon_data['name'])
 
                 except Exception as e:
-                    print(f"❌ [TEAM] Erro ao buscar ID {pokemon_id}: {e}")
+                    logger.error("❌ Erro ao buscar ID %s: %s", pokemon_id, e)
                     attempts += 1
 
             # Completar equipe
@@ -542,7 +605,7 @@ class ChatService:
                     random_id = random.choice(available_ids)
 
                     if random_id not in [p["id"] for p in team_list]:
-                        pokemon_data = await pokeapi_service.get_pokemon(random_id)
+                        pokemon_data = await pokemon_store.get_pokemon(random_id)
                         if pokemon_data:
                             is_mega = pokeapi_service.is_mega_evolution(
                                 pokemon_data["name"]
@@ -556,11 +619,12 @@ class ChatService:
 
                             if is_mega:
                                 mega_count += 1
-                                print(
-                                    f"✅ [TEAM] Completando com MEGA: {pokemon_data['name']}"
+                                logger.debug(
+                                    "✅ Completando com MEGA: %s",
+                                    pokemon_data['name'],
                                 )
                             else:
-                                print(f"✅ [TEAM] Completando: {pokemon_data['name']}")
+                                logger.debug("✅ Completando: %s", pokemon_data['name'])
                 except:
                     pass
 
@@ -569,8 +633,10 @@ class ChatService:
             if len(team_list) >= 6:
                 LAST_TEAM_IDS = [p["id"] for p in team_list]
 
-                print(
-                    f"✅ [TEAM] Equipe completa: {', '.join([p['name'] for p in team_list])}"
+                logger.info(
+                    "✅ Equipe completa: %s",
+                    ', '.join([p['name'] for p in team_list]),
+                    extra=SAMPLED,
                 )
 
                 return {
@@ -581,14 +647,11 @@ class ChatService:
                     ),
                 }
             else:
-                print(f"⚠️ [TEAM] Equipe incompleta: {len(team_list)} Pokémon")
+                logger.warning("⚠️ Equipe incompleta: %s Pokémon", len(team_list))
                 return None
 
         except Exception as e:
-            print(f"❌ [TEAM] Erro ao gerar equipe: {e}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("❌ Erro ao gerar equipe: %s", e)
             return None
 
     def _matches_strategy(self, pokemon_data: dict, strategy: str) -> bool:
@@ -693,8 +756,31 @@ class ChatService:
             "avg_stats": avg_stats,
         }
 
-    def _build_context(self, history: list, pokemon_data: Optional[dict]) -> str:
-        """Constrói contexto para LLM"""
+    def detect_intent(self, pokemon_data: Optional[dict]) -> str:
+        """Classifica a mensagem para o roteador de modelos do LLM"""
+        if not pokemon_data:
+            return INTENT_CHAT
+        if pokemon_data.get("is_team"):
+            return INTENT_TEAM
+        if pokemon_data.get("is_comparison"):
+            return INTENT_COMPARISON
+        return INTENT_LOOKUP
+
+    def _format_stats(self, stats: dict) -> str:
+        """Formata stats base em uma linha curta"""
+        return (
+            f"HP {stats['hp']}, Ataque {stats['attack']}, Defesa {stats['defense']}, "
+            f"Atq. Esp. {stats['special-attack']}, Def. Esp. {stats['special-defense']}, "
+            f"Velocidade {stats['speed']}, Total {sum(stats.values())}"
+        )
+
+    def _build_context(self, pokemon_data: Optional[dict]) -> str:
+        """
+        Constrói os fatos de Pokémon para o LLM (uma informação por linha).
+
+        O histórico não entra aqui: ele é enviado como turnos de chat e
+        encaixado no orçamento de tokens pelo PromptBuilder.
+        """
         context_parts = []
 
         if pokemon_data:
@@ -707,31 +793,31 @@ class ChatService:
                     context_parts.append(
                         f"{i}. {p['name'].upper()} ({', '.join(p['types'])})"
                     )
+                for role in strategy.get("roles", []):
+                    context_parts.append(f"Papel - {role}")
             elif pokemon_data.get("is_comparison"):
+                context_parts.append("Comparação de Pokémon:")
                 for i, p in enumerate(pokemon_data["pokemon_list"], 1):
                     context_parts.append(
-                        f"{i}. {p['name'].upper()}: Total {sum(p['stats'].values())}"
+                        f"{i}. {p['name'].upper()} ({', '.join(p['types'])}): "
+                        f"{self._format_stats(p['stats'])}"
                     )
             else:
                 context_parts.append(
                     f"{pokemon_data['name'].upper()}: {', '.join(pokemon_data['types'])}"
                 )
-
-        if history:
-            context_parts.append("\nHistórico:")
-            for msg in history[-3:]:
-                context_parts.append(f"{msg['role']}: {msg['content'][:50]}")
+                context_parts.append(self._format_stats(pokemon_data["stats"]))
 
         return "\n".join(context_parts)
 
-    async def get_chat_history_for_user(self, user_id: int, db: Session):
+    async def get_chat_history_for_user(self, user_id: int, db: AsyncSession):
         """Retorna histórico completo"""
-        messages = (
-            db.query(ChatMessage)
-            .filter(ChatMessage.user_id == user_id)
-            .order_by(ChatMessage.created_at.asc())
-            .all()
+        result = await db.execute(
+            select(ChatMessage)
+            .where(ChatMessage.user_id == user_id)
+            .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
         )
+        messages = result.scalars().all()
         return [
             {
                 "id": msg.id,
@@ -742,14 +828,14 @@ class ChatService:
             for msg in messages
         ]
 
-    async def clear_chat_history(self, user_id: int, db: Session) -> bool:
+    async def clear_chat_history(self, user_id: int, db: AsyncSession) -> bool:
         """Limpa histórico"""
         try:
-            db.query(ChatMessage).filter(ChatMessage.user_id == user_id).delete()
-            db.commit()
+            await db.execute(delete(ChatMessage).where(ChatMessage.user_id == user_id))
+            await db.commit()
             return True
         except:
-            db.rollback()
+            await db.rollback()
             return False
 
 
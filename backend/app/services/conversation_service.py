@@ -2,62 +2,82 @@
 Service Layer para Conversas
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.models import Conversation, ChatMessage
+import logging
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Conversation, ChatMessage, utcnow
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationUpdate,
-    ConversationResponse,
 )
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Caracteres de last_message_preview exibidos na sidebar
+PREVIEW_LENGTH = 120
+
+
+def make_preview(content: str) -> str:
+    clean = " ".join(content.split())
+    if len(clean) <= PREVIEW_LENGTH:
+        return clean
+    return clean[: PREVIEW_LENGTH - 3].rstrip() + "..."
+
 
 class ConversationService:
 
     @staticmethod
-    def get_user_conversations(db: Session, user_id: int) -> list:
-        """Obtém todas as conversas de um usuário com message_count real via query"""
-        rows = (
-            db.query(Conversation, func.count(ChatMessage.id).label("message_count"))
-            .outerjoin(ChatMessage, Conversation.id == ChatMessage.conversation_id)
-            .filter(Conversation.user_id == user_id)
-            .group_by(Conversation.id)
+    async def get_user_conversations(
+        db: AsyncSession, user_id: int
+    ) -> List[Conversation]:
+        """
+        Obtém todas as conversas de um usuário, mais recentes primeiro.
+
+        message_count e last_message_preview são colunas mantidas junto com as
+        mensagens, então a consulta é um range scan em (user_id, updated_at).
+        """
+        result = await db.execute(
+            select(Conversation)
+            .where(Conversation.user_id == user_id)
             .order_by(Conversation.updated_at.desc())
-            .all()
         )
+        return list(result.scalars())
 
-        # Retorna dicts compatíveis com ConversationResponse em vez de tentar
-        # atribuir a uma @property do modelo SQLAlchemy (causava AttributeError → 500)
-        result = []
-        for conversation, message_count in rows:
-            result.append(
-                ConversationResponse(
-                    id=conversation.id,
-                    user_id=conversation.user_id,
-                    title=conversation.title,
-                    created_at=conversation.created_at,
-                    updated_at=conversation.updated_at,
-                    message_count=message_count,
-                )
+    @staticmethod
+    async def get_conversation_by_id(
+        db: AsyncSession, conversation_id: int, user_id: int
+    ) -> Optional[Conversation]:
+        result = await db.execute(
+            select(Conversation).where(
+                Conversation.id == conversation_id, Conversation.user_id == user_id
             )
+        )
+        return result.scalar_one_or_none()
 
-        return result
+    @staticmethod
+    def record_new_messages(conversation: Conversation, count: int, last_content: str):
+        """
+        Atualiza os contadores da conversa para mensagens recém-adicionadas.
+
+        O incremento é uma expressão SQL (message_count = message_count + n),
+        então requisições concorrentes na mesma conversa não perdem contagem.
+        Deve ser chamado antes do commit que insere as mensagens.
+        """
+        conversation.message_count = Conversation.message_count + count
+        conversation.last_message_preview = make_preview(last_content)
+        conversation.updated_at = utcnow()
 
     @staticmethod
-    def get_conversation_by_id(
-        db: Session, conversation_id: int, user_id: int
-    ) -> Optional[Conversation]:
-        return (
-            db.query(Conversation)
-            .filter(Conversation.id == conversation_id, Conversation.user_id == user_id)
-            .first()
-        )
+    def reset_counters(conversation: Conversation):
+        """Zera os contadores depois de remover todas as mensagens"""
+        conversation.message_count = 0
+        conversation.last_message_preview = None
 
     @staticmethod
-    def create_conversation(
-        db: Session, user_id: int, conversation: ConversationCreate
+    async def create_conversation(
+        db: AsyncSession, user_id: int, conversation: ConversationCreate
     ) -> Conversation:
         db_conversation = Conversation(
             user_id=user_id,
@@ -66,20 +86,24 @@ class ConversationService:
             updated_at=datetime.utcnow(),
         )
         db.add(db_conversation)
-        db.commit()
-        db.refresh(db_conversation)
+        await db.commit()
 
-        print(
-            f"✅ [CONVERSATION] Criada: '{db_conversation.title}' (ID: {db_conversation.id})"
+        logger.info(
+            "✅ Criada: '%s' (ID: %s)",
+            db_conversation.title,
+            db_conversation.id,
         )
 
         return db_conversation
 
     @staticmethod
-    def update_conversation(
-        db: Session, conversation_id: int, user_id: int, update_data: ConversationUpdate
+    async def update_conversation(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int,
+        update_data: ConversationUpdate,
     ) -> Optional[Conversation]:
-        conversation = ConversationService.get_conversation_by_id(
+        conversation = await ConversationService.get_conversation_by_id(
             db, conversation_id, user_id
         )
 
@@ -89,40 +113,96 @@ class ConversationService:
         conversation.title = update_data.title
         conversation.updated_at = datetime.utcnow()
 
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
 
-        print(
-            f"✅ [CONVERSATION] Renomeada ID {conversation_id}: '{conversation.title}'"
-        )
+        logger.info("✅ Renomeada ID %s: '%s'", conversation_id, conversation.title)
 
         return conversation
 
     @staticmethod
-    def delete_conversation(db: Session, conversation_id: int, user_id: int) -> bool:
-        conversation = ConversationService.get_conversation_by_id(
+    async def delete_conversation(
+        db: AsyncSession, conversation_id: int, user_id: int
+    ) -> bool:
+        conversation = await ConversationService.get_conversation_by_id(
             db, conversation_id, user_id
         )
 
         if not conversation:
             return False
 
-        db.delete(conversation)
-        db.commit()
+        # AsyncSession.delete carrega as mensagens para o cascade
+        await db.delete(conversation)
+        await db.commit()
 
-        print(f"✅ [CONVERSATION] Deletada ID {conversation_id}")
+        logger.info("✅ Deletada ID %s", conversation_id)
 
         return True
 
     @staticmethod
-    def get_or_create_default_conversation(db: Session, user_id: int) -> Conversation:
+    async def get_messages_page(
+        db: AsyncSession, conversation_id: int, before_id: Optional[int], limit: int
+    ) -> Tuple[List[ChatMessage], Optional[int]]:
+        """
+        Página de mensagens por keyset em (created_at, id).
+
+        A página mais recente vem primeiro; dentro dela as mensagens ficam em
+        ordem cronológica. Para carregar mensagens mais antigas, passe o
+        next_cursor retornado como before_id.
+
+        Returns:
+            (mensagens, next_cursor) — next_cursor é None na última página
+        """
+        query = select(ChatMessage).where(
+            ChatMessage.conversation_id == conversation_id
+        )
+
+        if before_id is not None:
+            result = await db.execute(
+                select(ChatMessage.created_at, ChatMessage.id).where(
+                    ChatMessage.id == before_id,
+                    ChatMessage.conversation_id == conversation_id,
+                )
+            )
+            cursor = result.first()
+            if cursor is None:
+                return [], None
+
+            query = query.where(
+                or_(
+                    ChatMessage.created_at < cursor.created_at,
+                    and_(
+                        ChatMessage.created_at == cursor.created_at,
+                        ChatMessage.id < cursor.id,
+                    ),
+                )
+            )
+
+        # Busca um item a mais só para saber se existe próxima página
+        result = await db.execute(
+            query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(
+                limit + 1
+            )
+        )
+        rows = list(result.scalars())
+
+        next_cursor = rows[limit - 1].id if len(rows) > limit else None
+        page = rows[:limit]
+        page.reverse()
+
+        return page, next_cursor
+
+    @staticmethod
+    async def get_or_create_default_conversation(
+        db: AsyncSession, user_id: int
+    ) -> Conversation:
         """Retorna a conversa mais recente ou cria uma nova"""
-        conversation = (
-            db.query(Conversation)
-            .filter(Conversation.user_id == user_id)
+        result = await db.execute(
+            select(Conversation)
+            .where(Conversation.user_id == user_id)
             .order_by(Conversation.updated_at.desc())
-            .first()
+            .limit(1)
         )
+        conversation = result.scalar_one_or_none()
 
         if not conversation:
             conversation = Conversation(
@@ -132,9 +212,8 @@ class ConversationService:
                 updated_at=datetime.utcnow(),
             )
             db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
-            print(f"✅ [CONVERSATION] Conversa padrão criada (ID: {conversation.id})")
+            await db.commit()
+            logger.info("✅ Conversa padrão criada (ID: %s)", conversation.id)
 
         return conversation
 
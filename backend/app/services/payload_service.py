@@ -0,0 +1,204 @@
+"""
+Armazenamento deduplicado dos dados de Pokémon das mensagens
+
+Cada card de Pokémon é gravado uma única vez em pokemon_payloads, endereçado
+pelo sha256 do seu JSON canônico e comprimido com zlib. A mensagem guarda só a
+chave:
+
+- Pokémon único: a chave aponta direto para o card
+- Comparação/equipe: a chave aponta para um esqueleto em que cada item de
+  pokemon_list/team_list foi trocado por {"$ref": hash_do_card}
+
+Na leitura do histórico os payloads de uma página inteira são hidratados em
+lote (no máximo duas consultas), com um LRU em memória na frente do banco —
+como o conteúdo é imutável, o cache nunca precisa ser invalidado.
+"""
+
+import hashlib
+import json
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.db.models import ChatMessage, PokemonPayload
+
+REF_KEY = "$ref"
+# Listas de cards dentro de um payload de comparação/equipe
+CARD_LISTS = ("pokemon_list", "team_list")
+
+
+def _canonical(value) -> bytes:
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def _digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def pack(pokemon_data: dict) -> Tuple[str, Dict[str, bytes]]:
+    """
+    Separa pokemon_data em cards e esqueleto.
+
+    Returns:
+        (chave da mensagem, {hash: JSON canônico} de tudo que precisa existir)
+    """
+    blobs: Dict[str, bytes] = {}
+    skeleton = dict(pokemon_data)
+    has_cards = False
+
+    for list_key in CARD_LISTS:
+        cards = pokemon_data.get(list_key)
+        if not isinstance(cards, list):
+            continue
+        refs = []
+        for card in cards:
+            raw = _canonical(card)
+            card_hash = _digest(raw)
+            blobs[card_hash] = raw
+            refs.append({REF_KEY: card_hash})
+        skeleton[list_key] = refs
+        has_cards = True
+
+    raw = _canonical(skeleton if has_cards else pokemon_data)
+    key = _digest(raw)
+    blobs[key] = raw
+    return key, blobs
+
+
+def _resolve(value: dict, cards: Dict[str, dict]) -> dict:
+    resolved = dict(value)
+    for list_key in CARD_LISTS:
+        items = value.get(list_key)
+        if isinstance(items, list):
+            resolved[list_key] = [
+                cards.get(item[REF_KEY]) if _is_ref(item) else item for item in items
+            ]
+    return resolved
+
+
+def _is_ref(item) -> bool:
+    return isinstance(item, dict) and len(item) == 1 and REF_KEY in item
+
+
+class PayloadService:
+    def __init__(self, cache_size: int):
+        self.cache: LRUCache[dict] = LRUCache(cache_size)
+        register_cache("pokemon_payload", self.cache)
+
+    async def store(
+        self, db: AsyncSession, pokemon_data: Optional[dict]
+    ) -> Optional[str]:
+        """
+        Grava (se ainda não existirem) os payloads de pokemon_data na sessão.
+
+        Não faz commit: o insert entra na mesma transação da mensagem.
+
+        Returns:
+            Chave para ChatMessage.pokemon_payload_hash (None sem dados)
+        """
+        if not pokemon_data:
+            return None
+
+        key, blobs = pack(pokemon_data)
+        # Sempre tenta inserir: o cache não prova que o payload foi commitado
+        # (a transação que o gravou pode ter sofrido rollback)
+        await self._insert_missing(
+            db, [{"hash": h, "data": zlib.compress(raw)} for h, raw in blobs.items()]
+        )
+        return key
+
+    async def _insert_missing(self, db: AsyncSession, rows: list):
+        dialect = db.get_bind().dialect.name
+        table = PokemonPayload.__table__
+
+        # Requisições concorrentes podem gravar o mesmo card; o conflito na PK
+        # é esperado e simplesmente ignorado
+        if dialect == "postgresql":
+            await db.execute(postgresql.insert(table).on_conflict_do_nothing(), rows)
+        elif dialect == "sqlite":
+            await db.execute(sqlite.insert(table).on_conflict_do_nothing(), rows)
+        else:
+            result = await db.execute(
+                select(PokemonPayload.hash).where(
+                    PokemonPayload.hash.in_([row["hash"] for row in rows])
+                )
+            )
+            existing = set(result.scalars())
+            rows = [row for row in rows if row["hash"] not in existing]
+            if rows:
+                await db.execute(table.insert(), rows)
+
+    async def _load(self, db: AsyncSession, hashes: Iterable[str]) -> Dict[str, dict]:
+        """Decodifica os payloads pedidos, consultando o banco só para os fora do cache"""
+        found: Dict[str, dict] = {}
+        missing = []
+        for h in set(hashes):
+            value = self.cache.get(h)
+            if value is None:
+                missing.append(h)
+            else:
+                found[h] = value
+
+        if missing:
+            result = await db.execute(
+                select(PokemonPayload.hash, PokemonPayload.data).where(
+                    PokemonPayload.hash.in_(missing)
+                )
+            )
+            for h, data in result:
+                value = json.loads(zlib.decompress(data))
+                self.cache.set(h, value)
+                found[h] = value
+
+        return found
+
+    async def hydrate(
+        self, db: AsyncSession, messages: Iterable[ChatMessage]
+    ) -> Dict[int, dict]:
+        """
+        pokemon_data de cada mensagem, em lote.
+
+        Mensagens antigas que ainda têm o JSON inline em pokemon_data são
+        devolvidas como estão.
+
+        Returns:
+            {message.id: pokemon_data} apenas para mensagens com dados
+        """
+        result: Dict[int, dict] = {}
+        keyed = []
+        for message in messages:
+            if message.pokemon_payload_hash:
+                keyed.append(message)
+            elif message.pokemon_data:
+                result[message.id] = message.pokemon_data
+
+        if not keyed:
+            return result
+
+        roots = await self._load(db, (m.pokemon_payload_hash for m in keyed))
+        card_hashes = [
+            item[REF_KEY]
+            for value in roots.values()
+            for list_key in CARD_LISTS
+            for item in value.get(list_key) or []
+            if _is_ref(item)
+        ]
+        cards = await self._load(db, card_hashes) if card_hashes else {}
+
+        for message in keyed:
+            value = roots.get(message.pokemon_payload_hash)
+            if value is not None:
+                result[message.id] = _resolve(value, cards)
+
+        return result
+
+
+payload_service = PayloadService(settings.POKEMON_PAYLOAD_CACHE_SIZE)
@@ -1,7 +1,38 @@
+import logging
 import httpx
 from typing import Optional, List, Dict
 import random
+import time
 from app.core.config import settings
+from app.core.metrics import POKEAPI_REQUEST
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    Mede cada chamada à PokéAPI por recurso (pokemon, type, ...): tempo até
+    os headers em pokeapi_request_duration_seconds e um span "pokeapi <recurso>"
+    no trace da requisição
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/api/v2/", 1)[-1]
+        resource = path.strip("/").split("/", 1)[0] or "root"
+        started = time.perf_counter()
+        status = "error"
+        with span(f"pokeapi {resource}", **{"http.url": str(request.url)}) as current:
+            try:
+                response = await super().handle_async_request(request)
+                status = str(response.status_code)
+                if current is not None:
+                    current.set(**{"http.status_code": response.status_code})
+                return response
+            finally:
+                POKEAPI_REQUEST.observe(
+                    time.perf_counter() - started, resource=resource, status=status
+                )
 
 
 class PokeAPIService:
@@ -11,6 +42,12 @@ class PokeAPIService:
         self.base_url = settings.POKEAPI_BASE_URL
         self.timeout = 10.0
 
+    def _client(self, timeout: Optional[float] = None) -> httpx.AsyncClient:
+        """Client HTTP com as chamadas medidas (métricas e tracing)"""
+        return httpx.AsyncClient(
+            timeout=timeout or self.timeout, transport=_InstrumentedTransport()
+        )
+
     async def get_pokemon(self, identifier: str | int) -> Optional[Dict]:
         """
         Busca dados de um Pokémon por nome ou ID.
@@ -22,9 +59,9 @@ class PokeAPIService:
             Dicionário com dados FORMATADOS do Pokémon ou None se não encontrado
         """
         try:
-            print(f"🔍 [POKEAPI] Buscando Pokémon: {identifier}")
+            logger.debug("🔍 Buscando Pokémon: %s", identifier)
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.base_url}/pokemon/{str(identifier).lower()}"
                 )
@@ -47,20 +84,74 @@ class PokeAPIService:
                     },
                 }
 
-                print(f"✅ [POKEAPI] Pokémon encontrado: {pokemon_data['name']}")
+                logger.debug("✅ Pokémon encontrado: %s", pokemon_data['name'])
                 return pokemon_data
 
         except httpx.HTTPStatusError as e:
-            print(
-                f"❌ [POKEAPI] Pokémon não encontrado (HTTP {e.response.status_code}): {identifier}"
+            logger.debug(
+                "❌ Pokémon não encontrado (HTTP %s): %s",
+                e.response.status_code,
+                identifier,
             )
             return None
         except Exception as e:
-            print(
-                f"❌ [POKEAPI] Erro ao buscar Pokémon {identifier}: {type(e).__name__} - {e}"
+            logger.error(
+                "❌ Erro ao buscar Pokémon %s: %s - %s",
+                identifier,
+                type(e).__name__,
+                e,
             )
             return None
 
+    async def get_detailed_pokemon_info(self, identifier: str | int) -> Optional[Dict]:
+        """
+        Busca dados completos de um Pokémon por nome ou ID.
+
+        Args:
+            identifier: Nome ou ID do Pokémon
+
+        Returns:
+            Dicionário no formato do schema Pokemon ou None se não existir
+
+        Raises:
+            httpx.HTTPError: Falha de rede ou erro da PokéAPI diferente de 404
+                (quem chama decide se um "não encontrado" pode ir para cache)
+        """
+        logger.debug("🔍 Buscando detalhes do Pokémon: %s", identifier)
+
+        async with self._client() as client:
+            response = await client.get(
+                f"{self.base_url}/pokemon/{str(identifier).lower()}"
+            )
+            if response.status_code == 404:
+                logger.debug("❌ Pokémon não encontrado: %s", identifier)
+                return None
+            response.raise_for_status()
+            data = response.json()
+
+        sprites = data.get("sprites") or {}
+        artwork = ((sprites.get("other") or {}).get("official-artwork") or {}).get(
+            "front_default"
+        )
+        return {
+            "id": data["id"],
+            "name": data["name"],
+            "height": data.get("height") or 0,
+            "weight": data.get("weight") or 0,
+            "base_experience": data.get("base_experience") or 0,
+            "types": [t["type"]["name"] for t in data["types"]],
+            "abilities": [a["ability"]["name"] for a in data.get("abilities", [])],
+            "stats": {s["stat"]["name"]: s["base_stat"] for s in data["stats"]},
+            "sprites": {
+                "front_default": sprites.get("front_default"),
+                "front_shiny": sprites.get("front_shiny"),
+                "back_default": sprites.get("back_default"),
+                "back_shiny": sprites.get("back_shiny"),
+                "official_artwork": artwork,
+            },
+            "species_url": (data.get("species") or {}).get("url"),
+        }
+
     async def get_all_pokemon_names(self) -> list:
         """
         Busca TODOS os nomes de Pokémon da API (cache)
@@ -69,16 +160,16 @@ class PokeAPIService:
             Lista com todos os nomes de Pokémon
         """
         try:
-            print(f"🔍 [POKEAPI] Buscando lista completa de Pokémon...")
+            logger.info("🔍 Buscando lista completa de Pokémon...")
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self._client(timeout=30.0) as client:
                 # Buscar contagem total primeiro
                 response = await client.get(f"{self.base_url}/pokemon?limit=1")
                 response.raise_for_status()
                 data = response.json()
                 total_count = data["count"]
 
-                print(f"📊 [POKEAPI] Total de Pokémon disponíveis: {total_count}")
+                logger.info("📊 Total de Pokémon disponíveis: %s", total_count)
 
                 # Buscar todos de uma vez
                 response = await client.get(
@@ -90,11 +181,11 @@ class PokeAPIService:
                 # Extrair apenas os nomes
                 pokemon_names = [p["name"] for p in data["results"]]
 
-                print(f"✅ [POKEAPI] {len(pokemon_names)} nomes de Pokémon carregados")
+                logger.info("✅ %s nomes de Pokémon carregados", len(pokemon_names))
                 return pokemon_names
 
         except Exception as e:
-            print(f"❌ [POKEAPI] Erro ao buscar lista completa: {e}")
+            logger.error("❌ Erro ao buscar lista completa: %s", e)
             return []
 
     async def get_random_pokemon_ids(self, count: int = 6, max_id: int = 1025) -> list:
@@ -122,7 +213,7 @@ class PokeAPIService:
             Lista de IDs de Pokémon desse tipo
         """
         try:
-            print(f"🔍 [POKEAPI] Buscando Pokémon do tipo: {type_name}")
+            logger.debug("🔍 Buscando Pokémon do tipo: %s", type_name)
             type_data = await self.get_type(type_name)
             if type_data and "pokemon" in type_data:
                 # Extrair apenas os IDs
@@ -132,13 +223,15 @@ class PokeAPIService:
                     url = p["pokemon"]["url"]
                     pokemon_id = int(url.rstrip("/").split("/")[-1])
                     pokemon_ids.append(pokemon_id)
-                print(
-                    f"✅ [POKEAPI] Encontrados {len(pokemon_ids)} Pokémon do tipo {type_name}"
+                logger.debug(
+                    "✅ Encontrados %s Pokémon do tipo %s",
+                    len(pokemon_ids),
+                    type_name,
                 )
                 return pokemon_ids
             return []
         except Exception as e:
-            print(f"❌ [POKEAPI] Erro ao buscar tipo {type_name}: {e}")
+            logger.error("❌ Erro ao buscar tipo %s: %s", type_name, e)
             return []
 
     async def is_fully_evolved(self, pokemon_id: int) -> bool:
@@ -162,7 +255,7 @@ class PokeAPIService:
             if not evolution_chain_url:
                 return True  # Sem cadeia de evolução = está evoluído
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._client() as client:
                 response = await client.get(evolution_chain_url)
                 response.raise_for_status()
                 evolution_data = response.json()
@@ -196,8 +289,10 @@ class PokeAPIService:
             return is_final if is_final is not None else True
 
         except Exception as e:
-            print(
-                f"⚠️ [POKEAPI] Erro ao verificar evolução do Pokémon {pokemon_id}: {e}"
+            logger.warning(
+                "⚠️ Erro ao verificar evolução do Pokémon %s: %s",
+                pokemon_id,
+                e,
             )
             return True  # Em caso de erro, não filtrar
 
@@ -226,9 +321,7 @@ class PokeAPIService:
 
             fully_evolved = []
 
-            print(
-                f"🔍 [POKEAPI] Verificando evoluções de {len(pokemon_ids)} Pokémon..."
-            )
+            logger.debug("🔍 Verificando evoluções de %s Pokémon...", len(pokemon_ids))
 
             for pokemon_id in pokemon_ids:
                 if len(fully_evolved) >= limit:
@@ -238,13 +331,14 @@ class PokeAPIService:
                 if is_evolved:
                     fully_evolved.append(pokemon_id)
 
-            print(
-                f"✅ [POKEAPI] Encontrados {len(fully_evolved)} Pokémon totalmente evoluídos"
+            logger.debug(
+                "✅ Encontrados %s Pokémon totalmente evoluídos",
+                len(fully_evolved),
             )
             return fully_evolved
 
         except Exception as e:
-            print(f"❌ [POKEAPI] Erro ao buscar Pokémon evoluídos: {e}")
+            logger.error("❌ Erro ao buscar Pokémon evoluídos: %s", e)
             return []
 
     def is_mega_evolution(self, pokemon_name: str) -> bool:
@@ -275,14 +369,14 @@ class PokeAPIService:
             Dicionário com dados da espécie ou None se não encontrado
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.base_url}/pokemon-species/{identifier}"
                 )
                 response.raise_for_status()
                 return response.json()
         except httpx.HTTPError as e:
-            print(f"❌ [POKEAPI] Erro ao buscar espécie do Pokémon {identifier}: {e}")
+            logger.error("❌ Erro ao buscar espécie do Pokémon %s: %s", identifier, e)
             return None
 
     async def has_valid_sprite(self, pokemon_id: int) -> bool:
@@ -298,7 +392,7 @@ class PokeAPIService:
         try:
             sprite_url = f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pokemon_id}.png"
 
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with self._client(timeout=5.0) as client:
                 response = await client.head(sprite_url)
                 return response.status_code == 200
         except:
@@ -318,7 +412,7 @@ class PokeAPIService:
             Dicionário com lista de Pokémon
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._client() as client:
                 response = await client.get(
                     f"{self.base_url}/pokemon",
                     params={"limit": limit, "offset": offset},
@@ -326,7 +420,7 @@ class PokeAPIService:
                 response.raise_for_status()
                 return response.json()
         except httpx.HTTPError as e:
-            print(f"❌ [POKEAPI] Erro ao listar Pokémon: {e}")
+            logger.error("❌ Erro ao listar Pokémon: %s", e)
             return None
 
     async def get_type(self, type_name: str) -> Optional[Dict]:
@@ -340,12 +434,12 @@ class PokeAPIService:
             Dicionário com informações do tipo
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._client() as client:
                 response = await client.get(f"{self.base_url}/type/{type_name}")
                 response.raise_for_status()
                 return response.json()
         except httpx.HTTPError as e:
-            print(f"❌ [POKEAPI] Erro ao buscar tipo {type_name}: {e}")
+            logger.error("❌ Erro ao buscar tipo %s: %s", type_name, e)
             return None
 
     async def get_evolution_chain(self, pokemon_id: int) -> Optional[Dict]:
@@ -366,12 +460,12 @@ class PokeAPIService:
         evolution_url = species["evolution_chain"]["url"]
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._client() as client:
                 response = await client.get(evolution_url)
                 response.raise_for_status()
                 return response.json()
         except httpx.HTTPError as e:
-            print(f"❌ [POKEAPI] Erro ao buscar cadeia de evolução: {e}")
+            logger.error("❌ Erro ao buscar cadeia de evolução: %s", e)
             return None
 
 
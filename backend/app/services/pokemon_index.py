@@ -0,0 +1,127 @@
+"""
+Índice em memória para autocomplete de nomes de Pokémon
+
+Os nomes ficam num array ordenado: todos os nomes que começam com o prefixo
+digitado formam um intervalo contíguo, encontrado com duas buscas binárias.
+Os candidatos são ordenados por popularidade (quantas vezes o Pokémon foi
+consultado no chat) e, sem nenhum prefixo correspondente, o fuzzy matching
+sugere nomes parecidos para erros de digitação.
+"""
+
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from difflib import get_close_matches
+from typing import Dict, List
+
+SPRITE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{}.png"
+
+# Maior caractere possível: limite superior do intervalo de um prefixo
+_PREFIX_END = "\U0010ffff"
+
+
+def pokemon_id_for_position(position: int) -> int:
+    """
+    ID do Pokémon a partir da posição (1-based) na lista da PokéAPI.
+
+    Até 1025 a posição é o próprio ID; depois vêm as formas alternativas
+    (Megas etc.), numeradas a partir de 10001.
+    """
+    return position if position <= 1025 else 10000 + (position - 1025)
+
+
+def sprite_url(pokemon_id: int) -> str:
+    return SPRITE_URL.format(pokemon_id)
+
+
+def normalize_query(query: str) -> str:
+    """'Charizard Mega X' → 'charizard-mega-x'"""
+    return "-".join(query.lower().split())
+
+
+class PokemonIndex:
+    def __init__(self):
+        self.names: List[str] = []  # ordem da PokéAPI (por ID)
+        self.sorted_names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        # Sobrevive a rebuilds: é contagem de uso, não dado da PokéAPI
+        self.popularity: Counter = Counter()
+
+    def rebuild(self, names: List[str]):
+        """Reconstrói o índice a partir da lista de nomes da PokéAPI"""
+        self.names = list(names)
+        self.ids = {
+            name: pokemon_id_for_position(position)
+            for position, name in enumerate(names, start=1)
+        }
+        self.sorted_names = sorted(self.ids)
+
+    def record_lookup(self, name: str):
+        """Conta uma consulta ao Pokémon para o ranking das sugestões"""
+        if name in self.ids:
+            self.popularity[name] += 1
+
+    def prefix_matches(self, prefix: str) -> List[str]:
+        lo = bisect_left(self.sorted_names, prefix)
+        hi = bisect_left(self.sorted_names, prefix + _PREFIX_END, lo)
+        return self.sorted_names[lo:hi]
+
+    def card(self, name: str) -> dict:
+        """Entrada resumida: nome, ID e sprite"""
+        pokemon_id = self.ids[name]
+        return {"id": pokemon_id, "name": name, "sprite": sprite_url(pokemon_id)}
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """
+        Busca parcial: nomes que começam com o texto primeiro, depois os que o
+        contêm em qualquer posição (ex: "mega" → todas as Megas).
+        """
+        term = normalize_query(query)
+        if not term:
+            return []
+
+        names = self.prefix_matches(term)[:limit]
+        if len(names) < limit:
+            seen = set(names)
+            for name in self.names:
+                if term in name and name not in seen:
+                    names.append(name)
+                    if len(names) >= limit:
+                        break
+        return [self.card(name) for name in names]
+
+    def suggest(self, query: str, limit: int = 8) -> dict:
+        """
+        Sugestões para o texto digitado.
+
+        Returns:
+            {"query", "fuzzy", "suggestions": [{"name", "sprite"}]} — fuzzy é
+            True quando não houve prefixo e as sugestões vêm do fuzzy matching
+        """
+        prefix = normalize_query(query)
+        fuzzy = False
+        names: List[str] = []
+
+        if prefix:
+            matches = self.prefix_matches(prefix)
+            # Mais consultados primeiro; depois nomes mais curtos (a forma base
+            # antes das variantes) e ordem alfabética
+            names = heapq.nsmallest(
+                limit,
+                matches,
+                key=lambda name: (-self.popularity[name], len(name), name),
+            )
+            if not names and len(prefix) >= 3:
+                fuzzy = True
+                names = get_close_matches(prefix, self.sorted_names, n=limit, cutoff=0.6)
+
+        return {
+            "query": prefix,
+            "fuzzy": fuzzy,
+            "suggestions": [
+                {"name": name, "sprite": sprite_url(self.ids[name])} for name in names
+            ],
+        }
+
+
+pokemon_index = PokemonIndex()
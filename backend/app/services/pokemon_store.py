@@ -0,0 +1,204 @@
+"""
+Store local de Pokémon na frente da PokéAPI
+
+Os dados da PokéAPI são praticamente imutáveis, então cada Pokémon, tipo e
+cadeia de evolução é buscado uma vez e servido da memória depois disso:
+
+- Pokémon detalhados ficam num LRU indexado pelo ID; nomes apontam para o
+  ID num dicionário à parte, então cada Pokémon ocupa uma única entrada
+- Nomes inexistentes ficam num cache negativo com TTL curto (a detecção do
+  chat testa cada palavra da mensagem como possível nome)
+- Requisições simultâneas pela mesma chave compartilham uma única chamada à
+  PokéAPI (single-flight), em vez de cada uma disparar a sua
+- Lista e busca por nome vêm do índice em memória (pokemon_index)
+
+O chat usa get_pokemon, que devolve o card resumido no mesmo formato de
+pokeapi_service.get_pokemon.
+"""
+
+import logging
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+import httpx
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.services.pokeapi import pokeapi_service
+from app.services.pokemon_index import pokemon_index, sprite_url
+
+logger = logging.getLogger(__name__)
+
+
+def _key(identifier: str | int) -> str:
+    """'Pikachu' → 'pikachu', '025' → '25'"""
+    key = str(identifier).strip().lower()
+    return str(int(key)) if key.isdigit() else key
+
+
+def to_card(pokemon: dict) -> dict:
+    """Card usado nas mensagens do chat (subconjunto do detalhado, sempre uma cópia)"""
+    return {
+        "id": pokemon["id"],
+        "name": pokemon["name"],
+        "sprites": {"front_default": pokemon["sprites"].get("front_default")},
+        "types": list(pokemon["types"]),
+        "stats": dict(pokemon["stats"]),
+    }
+
+
+class PokemonStore:
+    def __init__(self, cache_size: int, negative_ttl: float):
+        self._pokemon: LRUCache[dict] = LRUCache(cache_size)
+        # nome → ID. Limitado pelo número de Pokémon existentes (só recebe
+        # nomes que a PokéAPI confirmou); aponta para IDs que podem já ter
+        # saído do LRU, o que só custa uma nova busca
+        self._ids: Dict[str, int] = {}
+        self._missing: LRUCache[bool] = LRUCache(cache_size, ttl=negative_ttl)
+        self._types: LRUCache[list] = LRUCache(64)
+        self._evolutions: LRUCache[dict] = LRUCache(cache_size)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        register_cache("pokemon", self._pokemon)
+        register_cache("pokemon_missing", self._missing)
+        register_cache("pokemon_type", self._types)
+        register_cache("pokemon_evolution", self._evolutions)
+
+    async def _single_flight(self, key: Hashable, fetch: Callable[[], Awaitable]):
+        """
+        Executa fetch uma única vez por chave enquanto houver chamada em curso.
+
+        O resultado (ou a exceção) é entregue a todos que esperam. shield evita
+        que o cancelamento de um deles (deadline, cliente desconectado) cancele
+        a busca dos demais.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+
+            def _done(finished: asyncio.Future):
+                self._inflight.pop(key, None)
+                # Marca a exceção como lida mesmo se todos desistiram de esperar
+                if not finished.cancelled():
+                    finished.exception()
+
+            task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    async def get_detailed(self, identifier: str | int) -> Optional[dict]:
+        """
+        Pokémon detalhado (formato do schema Pokemon) por nome ou ID.
+
+        Returns:
+            Dados do Pokémon ou None se não existir
+
+        Raises:
+            httpx.HTTPError: PokéAPI indisponível (não vai para o cache negativo)
+        """
+        key = _key(identifier)
+        pokemon_id = int(key) if key.isdigit() else self._ids.get(key)
+        # Nome desconhecido (pokemon_id None) também conta como miss do LRU
+        pokemon = self._pokemon.get(pokemon_id)
+        if pokemon is not None:
+            return pokemon
+        if key in self._missing:
+            return None
+
+        async def fetch():
+            pokemon = await pokeapi_service.get_detailed_pokemon_info(key)
+            if pokemon is None:
+                self._missing.set(key, True)
+                return None
+            self._pokemon.set(pokemon["id"], pokemon)
+            self._ids[pokemon["name"]] = pokemon["id"]
+            if not key.isdigit():
+                self._ids[key] = pokemon["id"]
+            return pokemon
+
+        return await self._single_flight(("pokemon", key), fetch)
+
+    async def get_pokemon(self, identifier: str | int) -> Optional[dict]:
+        """Card do Pokémon para o chat; None se não existir ou em caso de erro"""
+        try:
+            pokemon = await self.get_detailed(identifier)
+        except httpx.HTTPError as e:
+            logger.warning("❌ Erro ao buscar Pokémon %s: %s", identifier, e)
+            return None
+        return to_card(pokemon) if pokemon else None
+
+    async def get_many(self, identifiers: Iterable[str | int]) -> Dict[str, Optional[dict]]:
+        """Vários Pokémon em paralelo: {chave normalizada: dados ou None}"""
+        keys = list(dict.fromkeys(_key(identifier) for identifier in identifiers))
+        results = await asyncio.gather(*(self.get_detailed(key) for key in keys))
+        return dict(zip(keys, results))
+
+    async def get_type(self, type_name: str) -> Optional[List[dict]]:
+        """Pokémon de um tipo (id, nome, sprite) ou None se o tipo não existir"""
+        key = type_name.strip().lower()
+        members = self._types.get(key)
+        if members is not None:
+            return members
+
+        async def fetch():
+            type_data = await pokeapi_service.get_type(key)
+            if not type_data or "pokemon" not in type_data:
+                return None
+            members = []
+            for entry in type_data["pokemon"]:
+                pokemon = entry["pokemon"]
+                pokemon_id = int(pokemon["url"].rstrip("/").split("/")[-1])
+                members.append(
+                    {"id": pokemon_id, "name": pokemon["name"], "sprite": sprite_url(pokemon_id)}
+                )
+            self._types.set(key, members)
+            return members
+
+        return await self._single_flight(("type", key), fetch)
+
+    async def get_evolution_chain(self, pokemon_id: int) -> Optional[dict]:
+        """Cadeia de evolução da PokéAPI ou None se não encontrada"""
+        chain = self._evolutions.get(pokemon_id)
+        if chain is not None:
+            return chain
+
+        async def fetch():
+            chain = await pokeapi_service.get_evolution_chain(pokemon_id)
+            if chain:
+                self._evolutions.set(pokemon_id, chain)
+            return chain
+
+        return await self._single_flight(("evolution", pokemon_id), fetch)
+
+    async def ensure_index(self):
+        """Carrega o índice de nomes na primeira requisição que precisar dele"""
+        if not pokemon_index.sorted_names:
+            from app.services.chat_service import load_pokemon_names_cache
+
+            await load_pokemon_names_cache()
+
+    def list_page(self, limit: int, offset: int) -> dict:
+        """Página da lista de Pokémon na ordem da PokéAPI, sem acessar a rede"""
+        names = pokemon_index.names
+        total = len(names)
+        page = [pokemon_index.card(name) for name in names[offset : offset + limit]]
+        return {
+            "count": total,
+            "results": page,
+            "next": (
+                f"/api/pokemon?limit={limit}&offset={offset + limit}"
+                if offset + limit < total
+                else None
+            ),
+            "previous": (
+                f"/api/pokemon?limit={limit}&offset={max(0, offset - limit)}"
+                if offset
+                else None
+            ),
+        }
+
+
+pokemon_store = PokemonStore(
+    cache_size=settings.POKEMON_CACHE_SIZE,
+    negative_ttl=settings.POKEMON_NEGATIVE_CACHE_TTL_SECONDS,
+)
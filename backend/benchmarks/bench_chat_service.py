@@ -0,0 +1,302 @@
+"""
+Micro-benchmarks dos caminhos quentes do chat_service
+
+Mede detecção de Pokémon, fuzzy matching, detecção/geração de equipes,
+construção de contexto, geração de títulos e sugestões do autocomplete com a
+rede substituída por dados locais (loadtest/fixtures/pokedex.json). Cada
+execução é anexada a um arquivo de histórico; se a mediana de um benchmark
+ficar acima de THRESHOLD vezes a mediana das últimas execuções, o script
+termina com código 1.
+
+Uso:
+    python -m benchmarks.bench_chat_service
+    python -m benchmarks.bench_chat_service --filter fuzzy --no-save
+    python -m benchmarks.bench_chat_service --threshold fuzzy_miss=2.0
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIXTURE_PATH = BACKEND_DIR / "loadtest" / "fixtures" / "pokedex.json"
+DEFAULT_HISTORY = BACKEND_DIR / "benchmarks" / ".history" / "chat_service.jsonl"
+
+# Tamanho aproximado da lista real de nomes da PokéAPI (com formas e Megas)
+NAMES_CACHE_SIZE = 1302
+DEFAULT_THRESHOLD = 1.3
+BASELINE_RUNS = 5
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from app.api.endpoints.chat import generate_title
+    from app.services import chat_service as chat_module
+    from app.services.chat_service import chat_service
+    from app.services.pokeapi import pokeapi_service
+    from app.services.pokemon_index import pokemon_index
+
+
+class FixturePokeAPI:
+    """Substitui as chamadas de rede do pokeapi_service por dados do fixture"""
+
+    def __init__(self, path: Path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        stat_names = data["stat_names"]
+        self.by_key: Dict[str, dict] = {}
+        self.by_type: Dict[str, List[int]] = {}
+        for p in data["pokemon"]:
+            formatted = {
+                "id": p["id"],
+                "name": p["name"],
+                "sprites": {
+                    "front_default": "https://raw.githubusercontent.com/PokeAPI/"
+                    f"sprites/master/sprites/pokemon/{p['id']}.png"
+                },
+                "types": p["types"],
+                "stats": dict(zip(stat_names, p["stats"])),
+            }
+            self.by_key[str(p["id"])] = formatted
+            self.by_key[p["name"]] = formatted
+            for type_name in p["types"]:
+                self.by_type.setdefault(type_name, []).append(p["id"])
+
+        # Último estágio de cada cadeia = totalmente evoluído
+        self.fully_evolved = {
+            species_id for chain in data["evolution_chains"] for species_id in chain[-1]
+        } | {p["id"] for p in data["pokemon"] if "species_id" in p}
+        self.names = [p["name"] for p in data["pokemon"]]
+
+    async def get_detailed_pokemon_info(self, identifier) -> Optional[dict]:
+        pokemon = self.by_key.get(str(identifier).lower())
+        return dict(pokemon) if pokemon else None
+
+    async def get_fully_evolved_pokemon(self, type_name=None, limit=50) -> list:
+        ids = self.by_type.get(type_name, []) if type_name else list(self.by_key)
+        return [pid for pid in ids if pid in self.fully_evolved][:limit]
+
+    def names_cache(self, size: int) -> List[str]:
+        """Nomes do fixture completados com nomes sintéticos até `size`"""
+        rng = random.Random(0)
+        syllables = ["ka", "ro", "zu", "mi", "ta", "ne", "do", "ri", "sa", "lo", "vy", "qu"]
+        names = list(self.names)
+        while len(names) < size:
+            name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+            if name not in names:
+                names.append(name)
+        return names
+
+
+def install_fixture() -> FixturePokeAPI:
+    fixture = FixturePokeAPI(FIXTURE_PATH)
+    # O pokemon_store (com cache) fica na frente: a detecção mede o caminho real
+    pokeapi_service.get_detailed_pokemon_info = fixture.get_detailed_pokemon_info
+    pokeapi_service.get_fully_evolved_pokemon = fixture.get_fully_evolved_pokemon
+    chat_module.POKEMON_NAMES_CACHE = fixture.names_cache(NAMES_CACHE_SIZE)
+    chat_module.CACHE_LOADED = True
+    pokemon_index.rebuild(chat_module.POKEMON_NAMES_CACHE)
+    return fixture
+
+
+def build_benchmarks(fixture: FixturePokeAPI) -> Dict[str, Callable]:
+    """Cada benchmark é uma corrotina ou função sem argumentos"""
+    team = [fixture.by_key[str(pid)] for pid in (6, 9, 3, 25, 94, 149)]
+    team_data = {
+        "is_team": True,
+        "team_list": team,
+        "strategy": chat_service._generate_team_strategy(team, "fire", None),
+    }
+    compare_data = {
+        "is_comparison": True,
+        "pokemon_list": [fixture.by_key["charizard"], fixture.by_key["blastoise"]],
+    }
+
+    return {
+        "detect_single": lambda: chat_service._detect_and_fetch_pokemon(
+            "me fale sobre pikachu"
+        ),
+        "detect_typo": lambda: chat_service._detect_and_fetch_pokemon(
+            "quais são as stats do charizrd?"
+        ),
+        "detect_compare": lambda: chat_service._detect_and_fetch_pokemon(
+            "compare charizard vs blastoise"
+        ),
+        "detect_none": lambda: chat_service._detect_and_fetch_pokemon(
+            "qual é a melhor estratégia para batalhas?"
+        ),
+        "fuzzy_hit": lambda: chat_service._try_fuzzy_pokemon_name("dragonitte"),
+        "fuzzy_miss": lambda: chat_service._try_fuzzy_pokemon_name("estratégia"),
+        "detect_team_request": lambda: chat_service._detect_team_request(
+            "monte uma equipe rápida de fogo"
+        ),
+        "generate_balanced_team": lambda: chat_service._generate_balanced_team(
+            {"type_filter": "water", "strategy_filter": None}
+        ),
+        "generate_team_strategy": lambda: chat_service._generate_team_strategy(
+            team, "fire", "offensive"
+        ),
+        "build_context_team": lambda: chat_service._build_context(team_data),
+        "build_context_compare": lambda: chat_service._build_context(compare_data),
+        "generate_title_team": lambda: generate_title(
+            "monte uma equipe de fogo ofensiva", team_data
+        ),
+        "generate_title_fallback": lambda: generate_title(
+            "qual é a melhor estratégia para batalhas?", None
+        ),
+        "suggest_prefix": lambda: pokemon_index.suggest("char", 8),
+        "suggest_short_prefix": lambda: pokemon_index.suggest("c", 8),
+        "suggest_fuzzy": lambda: pokemon_index.suggest("pikaxu", 8),
+    }
+
+
+async def _measure(func: Callable, min_time: float, repeats: int) -> dict:
+    """Calibra o número de iterações e mede `repeats` amostras"""
+
+    async def run(iterations: int) -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            result = func()
+            if asyncio.iscoroutine(result):
+                await result
+        return time.perf_counter() - started
+
+    iterations = 1
+    while True:
+        elapsed = await run(iterations)
+        if elapsed >= min_time / repeats or iterations >= 1_000_000:
+            break
+        iterations *= 2
+
+    samples = [(await run(iterations)) / iterations * 1e6 for _ in range(repeats)]
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "min_us": round(min(samples), 3),
+        "iterations": iterations,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(
+    results: Dict[str, dict], history: List[dict], thresholds: Dict[str, float]
+) -> List[str]:
+    """Compara com a mediana das últimas BASELINE_RUNS execuções"""
+    regressions = []
+    for name, result in results.items():
+        previous = [
+            run["results"][name]["median_us"]
+            for run in history[-BASELINE_RUNS:]
+            if name in run["results"]
+        ]
+        if not previous:
+            continue
+        baseline = statistics.median(previous)
+        limit = thresholds.get(name, DEFAULT_THRESHOLD)
+        ratio = result["median_us"] / baseline if baseline else 1.0
+        result["baseline_us"] = round(baseline, 3)
+        result["ratio"] = round(ratio, 3)
+        if ratio > limit:
+            regressions.append(
+                f"{name}: {result['median_us']:.1f}µs vs {baseline:.1f}µs "
+                f"({ratio:.2f}x > {limit:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filter", help="roda apenas benchmarks contendo o texto")
+    parser.add_argument("--min-time", type=float, default=0.5, help="segundos por benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--no-save", action="store_true", help="não grava no histórico")
+    parser.add_argument(
+        "--threshold",
+        nargs="*",
+        default=[],
+        metavar="NOME=RAZAO",
+        help=f"limite de regressão por benchmark (default {DEFAULT_THRESHOLD}x)",
+    )
+    args = parser.parse_args(argv)
+
+    thresholds = {}
+    for item in args.threshold:
+        name, ratio = item.split("=")
+        thresholds[name] = float(ratio)
+
+    fixture = install_fixture()
+    benchmarks = build_benchmarks(fixture)
+    if args.filter:
+        benchmarks = {k: v for k, v in benchmarks.items() if args.filter in k}
+
+    results = {}
+    for name, func in benchmarks.items():
+        random.seed(1234)  # geração de equipes usa random
+        chat_module.LAST_TEAM_IDS = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = asyncio.run(_measure(func, args.min_time, args.repeats))
+        print(
+            f"{name:<26}{results[name]['median_us']:>12.1f} µs"
+            f"  (min {results[name]['min_us']:.1f}, n={results[name]['iterations']})"
+        )
+
+    history = load_history(args.history)
+    regressions = find_regressions(results, history, thresholds)
+
+    if not args.no_save:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "git_revision": _git_revision(),
+                        "python": platform.python_version(),
+                        "results": results,
+                    }
+                )
+                + "\n"
+            )
+
+    if regressions:
+        print("\n❌ Regressões detectadas:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("\n✅ Nenhuma regressão acima do limite")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
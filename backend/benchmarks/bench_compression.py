@@ -0,0 +1,109 @@
+"""
+Benchmark da compressão das respostas: bytes economizados vs custo de CPU
+
+Comprime payloads representativos da API (resposta de chat com um card,
+resposta de equipe, páginas do histórico) com gzip e brotli em vários níveis
+e mostra tamanho final, razão de compressão e tempo por resposta. Serve para
+escolher COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY e
+COMPRESSION_MINIMUM_SIZE.
+
+Uso:
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --gzip-levels 1 6 9 --brotli-qualities 1 4 11
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import statistics
+import time
+import zlib
+from typing import Callable, Dict, List
+
+from app.core.responses import FastJSONResponse
+from benchmarks.bench_serialization import FIXTURE_PATH, build_history, load_cards
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def build_payloads() -> Dict[str, bytes]:
+    cards = load_cards(FIXTURE_PATH)
+    render = FastJSONResponse(content=None).render
+    team_page = build_history(cards, 200, seed=3)
+    team = next(
+        m for m in team_page["messages"] if (m["pokemon_data"] or {}).get("is_team")
+    )
+    single = next(
+        m for m in team_page["messages"] if (m["pokemon_data"] or {}).get("stats")
+    )
+
+    def message_response(bot_message: dict) -> dict:
+        return {
+            "user_message": {"id": 1, "content": "me fale sobre", "timestamp": "x"},
+            "bot_response": bot_message,
+            "conversation_id": 1,
+            "conversation_title": None,
+        }
+
+    return {
+        "chat (1 card)": render(message_response(single)),
+        "chat (equipe)": render(message_response(team)),
+        "histórico 50": render(build_history(cards, 50)),
+        "histórico 500": render(build_history(cards, 500)),
+    }
+
+
+def measure(fn: Callable[[], bytes], min_time: float) -> float:
+    """Mediana (ms) de execuções repetidas até somar min_time segundos"""
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(samples) < 5:
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--gzip-levels", type=int, nargs="*", default=[1, 6, 9])
+    parser.add_argument("--brotli-qualities", type=int, nargs="*", default=[1, 4, 6, 11])
+    parser.add_argument("--min-time", type=float, default=0.2, help="segundos por caso")
+    args = parser.parse_args(argv)
+
+    codecs: Dict[str, Callable[[bytes], bytes]] = {}
+    for level in args.gzip_levels:
+        codecs[f"gzip-{level}"] = lambda data, level=level: zlib.compress(data, level, wbits=31)
+    if brotli is not None:
+        for quality in args.brotli_qualities:
+            codecs[f"br-{quality}"] = lambda data, quality=quality: brotli.compress(
+                data, quality=quality
+            )
+
+    header = f"{'payload':<16}{'codec':<10}{'bytes':>10}{'razão':>8}{'tempo':>12}{'MB/s':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for name, body in build_payloads().items():
+        print(f"{name:<16}{'identity':<10}{len(body):>10}{1.0:>8.2f}{'-':>12}{'-':>8}")
+        for codec, compress in codecs.items():
+            size = len(compress(body))
+            ms = measure(lambda: compress(body), args.min_time)
+            throughput = len(body) / (ms / 1000) / 1e6
+            print(
+                f"{'':<16}{codec:<10}{size:>10}{len(body) / size:>8.2f}"
+                f"{ms:>10.3f}ms{throughput:>8.0f}"
+            )
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
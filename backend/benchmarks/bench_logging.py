@@ -0,0 +1,106 @@
+"""
+Benchmark do custo de logar na thread da requisição
+
+Compara quanto tempo a chamada de log segura quem loga (o event loop, nos
+endpoints): print direto, logging com StreamHandler síncrono, o logger com
+fila de app.core.logging, um evento amostrado e um evento em nível
+desligado. A saída vai para /dev/null, então o número medido é o melhor caso
+do print; com um terminal ou pipe lento do outro lado ele só piora, enquanto
+o logger com fila continua só enfileirando.
+
+Uso:
+    python -m benchmarks.bench_logging
+    python -m benchmarks.bench_logging --events 50000
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("LOG_FORMAT", "json")
+os.environ.setdefault("LOG_LEVEL", "INFO")
+
+import logging
+import time
+from typing import Callable
+
+from app.core import logging as app_logging
+
+
+def measure(emit: Callable[[int], None], events: int) -> float:
+    """Microssegundos por evento na thread de quem loga"""
+    started = time.perf_counter()
+    for i in range(events):
+        emit(i)
+    return (time.perf_counter() - started) / events * 1e6
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    devnull = open(os.devnull, "w", encoding="utf-8")
+    real_stdout = sys.stdout
+    results = {}
+
+    # print, como os serviços faziam
+    sys.stdout = devnull
+    try:
+        results["print"] = measure(
+            lambda i: print(f"🔍 Buscando Pokémon: pikachu-{i}"), args.events
+        )
+    finally:
+        sys.stdout = real_stdout
+
+    # logging padrão, formatando e escrevendo na própria thread
+    sync_logger = logging.getLogger("bench.sync")
+    sync_handler = logging.StreamHandler(devnull)
+    sync_handler.setFormatter(app_logging.JSONFormatter())
+    sync_logger.addHandler(sync_handler)
+    sync_logger.setLevel(logging.INFO)
+    sync_logger.propagate = False
+    results["logging síncrono (json)"] = measure(
+        lambda i: sync_logger.info("🔍 Buscando Pokémon: %s-%d", "pikachu", i), args.events
+    )
+
+    # logger da aplicação: fila + listener escrevendo em /dev/null. A fila é
+    # esvaziada entre os casos para um não pagar a escrita do anterior.
+    app_logger = logging.getLogger("app.bench")
+    queued_cases = {
+        "fila (app.core.logging)": lambda i: app_logger.info(
+            "🔍 Buscando Pokémon: %s-%d", "pikachu", i
+        ),
+        f"fila + amostragem ({app_logging.SAMPLED['sample_rate']:.0%})": lambda i: app_logger.info(
+            "💬 Mensagem de %s: %s", "ash", i, extra=app_logging.SAMPLED
+        ),
+        "nível desligado (debug)": lambda i: app_logger.debug(
+            "🔍 Buscando Pokémon: %s-%d", "pikachu", i
+        ),
+    }
+    drain_ms = 0.0
+    for name, emit in queued_cases.items():
+        sys.stdout = devnull
+        try:
+            app_logging.setup_logging()
+            results[name] = measure(emit, args.events)
+            drain_started = time.perf_counter()
+            app_logging.shutdown_logging()
+            drain_ms += (time.perf_counter() - drain_started) * 1000
+        finally:
+            sys.stdout = real_stdout
+    devnull.close()
+
+    print(f"{args.events} eventos por caso, saída em /dev/null\n")
+    print(f"{'caso':<32}{'µs/evento':>12}")
+    print("-" * 44)
+    for name, us in results.items():
+        print(f"{name:<32}{us:>12.2f}")
+    print(f"\nlistener terminou de escrever as filas em {drain_ms:.0f}ms (fora do loop)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
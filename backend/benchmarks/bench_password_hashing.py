@@ -0,0 +1,133 @@
+"""
+Benchmark do bcrypt no login: throughput e atraso do event loop
+
+Simula uma rajada de logins concorrentes e compara a verificação de senha
+feita direto no event loop (como era antes) com a verificação no pool
+dedicado do bcrypt (app.core.security.verify_and_update_password). Enquanto
+os logins rodam, uma tarefa mede o atraso do event loop: quanto um
+asyncio.sleep(intervalo) demora além do pedido. Esse atraso é a latência
+extra que todas as outras requisições do processo sofrem durante a rajada.
+
+Uso:
+    python -m benchmarks.bench_password_hashing
+    python -m benchmarks.bench_password_hashing --rounds 12 --logins 64 --concurrency 32
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import asyncio
+import contextlib
+import io
+import math
+import statistics
+import time
+from typing import Callable, List
+
+PASSWORD = "pikachu-eu-escolho-voce"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def _monitor_lag(stop: asyncio.Event, interval: float, samples: List[float]):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - started - interval) * 1000)
+
+
+async def run_scenario(
+    verify: Callable, hashed: str, logins: int, concurrency: int, interval: float
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    lag_samples: List[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_lag(stop, interval, lag_samples))
+    await asyncio.sleep(interval * 2)  # deixa o monitor começar
+
+    async def login():
+        async with semaphore:
+            valid = await verify(PASSWORD, hashed)
+            assert valid
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+
+    lag = sorted(lag_samples)
+    return {
+        "logins_per_s": logins / elapsed,
+        "elapsed_s": elapsed,
+        "lag_p50_ms": percentile(lag, 50),
+        "lag_p99_ms": percentile(lag, 99),
+        "lag_max_ms": lag[-1] if lag else 0.0,
+        "lag_mean_ms": statistics.fmean(lag) if lag else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=12, help="custo do bcrypt")
+    parser.add_argument("--workers", type=int, default=4, help="threads do pool")
+    parser.add_argument("--logins", type=int, default=48)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--interval", type=float, default=0.005, help="tick do monitor (s)")
+    args = parser.parse_args(argv)
+
+    # As settings são lidas no import de app.core.security
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        from app.core import security
+
+        hashed = security.get_password_hash(PASSWORD)
+
+    async def inline(password, hashed_password):
+        # Comportamento anterior: bcrypt direto dentro da corrotina
+        return security.verify_password(password, hashed_password)
+
+    async def offloaded(password, hashed_password):
+        valid, _ = await security.verify_and_update_password(password, hashed_password)
+        return valid
+
+    print(
+        f"bcrypt rounds={args.rounds}  logins={args.logins}  "
+        f"concorrência={args.concurrency}  workers={args.workers}\n"
+    )
+    header = f"{'modo':<12}{'logins/s':>10}{'lag p50':>10}{'lag p99':>10}{'lag máx':>10}"
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+    for name, verify in (("inline", inline), ("offload", offloaded)):
+        result = asyncio.run(
+            run_scenario(verify, hashed, args.logins, args.concurrency, args.interval)
+        )
+        results[name] = result
+        print(
+            f"{name:<12}{result['logins_per_s']:>10.1f}{result['lag_p50_ms']:>9.1f}ms"
+            f"{result['lag_p99_ms']:>8.1f}ms{result['lag_max_ms']:>8.1f}ms"
+        )
+
+    security.password_executor.shutdown()
+
+    speedup = results["offload"]["logins_per_s"] / results["inline"]["logins_per_s"]
+    print(f"\nthroughput offload/inline: {speedup:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
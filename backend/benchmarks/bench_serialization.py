@@ -0,0 +1,156 @@
+"""
+Benchmark da serialização de uma página grande do histórico
+
+Monta uma conversa de N mensagens (metade do bot, com cards, comparações e
+equipes do fixture em loadtest/fixtures/pokedex.json) e mede quanto custa
+transformar a resposta de GET /api/chat/history em bytes:
+
+- jsonable_encoder + json: o caminho padrão do FastAPI para um dict
+- json: só o json da stdlib, sem o jsonable_encoder
+- pydantic: validação + dump_json do HistoryResponse (Pydantic v2)
+- orjson: FastJSONResponse.render, o caminho atual do endpoint
+
+Uso:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --messages 500 --min-time 1
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse
+from app.schemas.chat import HistoryResponse
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIXTURE_PATH = BACKEND_DIR / "loadtest" / "fixtures" / "pokedex.json"
+
+
+def load_cards(path: Path) -> List[dict]:
+    """Cards no formato de pokemon_store.to_card"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [
+        {
+            "id": p["id"],
+            "name": p["name"],
+            "sprites": {
+                "front_default": "https://raw.githubusercontent.com/PokeAPI/"
+                f"sprites/master/sprites/pokemon/{p['id']}.png"
+            },
+            "types": p["types"],
+            "stats": dict(zip(data["stat_names"], p["stats"])),
+        }
+        for p in data["pokemon"]
+    ]
+
+
+def build_history(cards: List[dict], count: int, seed: int = 0) -> dict:
+    """Página do histórico com a mesma forma da resposta do endpoint"""
+    rng = random.Random(seed)
+    started = datetime(2026, 1, 1, 12, 0, 0)
+    messages = []
+
+    for i in range(count):
+        is_bot = i % 2 == 1
+        pokemon_data = None
+        if is_bot:
+            kind = rng.random()
+            if kind < 0.5:
+                pokemon_data = rng.choice(cards)
+            elif kind < 0.8:
+                pokemon_data = {"is_comparison": True, "pokemon_list": rng.sample(cards, 2)}
+            else:
+                team = rng.sample(cards, 6)
+                pokemon_data = {
+                    "is_team": True,
+                    "team_list": team,
+                    "strategy": {
+                        "title": "Equipe Balanceada",
+                        "description": "Equipe versátil com Pokémon totalmente evoluídos",
+                        "roles": [f"{p['name'].capitalize()}: Atacante" for p in team],
+                        "strengths": ["Excelente cobertura de tipos", "HP médio: 80"],
+                    },
+                }
+
+        content = (
+            "Aqui estão os dados que você pediu! " * rng.randint(2, 8)
+            if is_bot
+            else "me fale sobre o " + rng.choice(cards)["name"]
+        )
+        messages.append(
+            {
+                "id": i + 1,
+                "content": content,
+                "is_bot": is_bot,
+                "timestamp": (started + timedelta(seconds=30 * i)).isoformat() + "Z",
+                "pokemon_data": pokemon_data,
+            }
+        )
+
+    return {"conversation_id": 1, "next_cursor": None, "messages": messages}
+
+
+def measure(fn: Callable[[], bytes], min_time: float) -> List[float]:
+    """Tempos (ms) de execuções repetidas até somar min_time segundos"""
+    fn()  # aquecimento
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(samples) < 5:
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--min-time", type=float, default=0.5, help="segundos por modo")
+    args = parser.parse_args(argv)
+
+    page = build_history(load_cards(FIXTURE_PATH), args.messages)
+    stdlib = JSONResponse(content=None)
+    fast = FastJSONResponse(content=None)
+
+    modes: Dict[str, Callable[[], bytes]] = {
+        "jsonable_encoder + json": lambda: stdlib.render(jsonable_encoder(page)),
+        "json": lambda: stdlib.render(page),
+        "pydantic": lambda: HistoryResponse.model_validate(page).model_dump_json().encode(),
+        "orjson": lambda: fast.render(page),
+    }
+
+    print(f"histórico com {args.messages} mensagens\n")
+    header = f"{'modo':<26}{'mediana':>10}{'mín':>10}{'bytes':>10}"
+    print(header)
+    print("-" * len(header))
+
+    medians = {}
+    for name, fn in modes.items():
+        samples = measure(fn, args.min_time)
+        medians[name] = statistics.median(samples)
+        print(
+            f"{name:<26}{medians[name]:>8.2f}ms{min(samples):>8.2f}ms{len(fn()):>10}"
+        )
+
+    baseline = medians["jsonable_encoder + json"]
+    print(f"\norjson vs padrão do FastAPI: {baseline / medians['orjson']:.1f}x mais rápido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Verifica via EXPLAIN que as consultas de histórico usam os índices compostos
+
+Roda as mesmas consultas usadas por /api/chat/history,
+/api/conversations/{id}/messages, pela sidebar (/api/conversations) e pelo
+contexto do LLM e confere no plano que o índice esperado é usado sem
+ordenação extra. O schema é o das migrações: no SQLite em memória o script
+roda alembic upgrade head; no PostgreSQL usa o banco já migrado. Termina com
+código 1 se algum plano não usar o índice (o mesmo teste roda no pytest, em
+tests/test_history_indexes.py).
+
+Uso:
+    python -m benchmarks.explain_history_queries                 # SQLite em memória
+    DATABASE_URL=postgresql://... python -m benchmarks.explain_history_queries
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import sys
+
+from datetime import datetime
+
+from sqlalchemy import and_, create_engine, or_, select, text
+
+from app.db.models import ChatMessage, Conversation
+
+HISTORY_INDEX = "ix_chat_messages_conversation_created_id"
+USER_INDEX = "ix_chat_messages_user_created_id"
+SIDEBAR_INDEX = "ix_conversations_user_updated"
+
+
+def history_queries():
+    """(descrição, statement, índice esperado)"""
+    return [
+        (
+            "página mais recente do histórico",
+            select(ChatMessage)
+            .where(ChatMessage.conversation_id == 1)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(51),
+            HISTORY_INDEX,
+        ),
+        (
+            "página anterior ao cursor (keyset)",
+            select(ChatMessage)
+            .where(
+                ChatMessage.conversation_id == 1,
+                or_(
+                    ChatMessage.created_at < datetime(2026, 1, 1),
+                    and_(
+                        ChatMessage.created_at == datetime(2026, 1, 1),
+                        ChatMessage.id < 1000,
+                    ),
+                ),
+            )
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(51),
+            HISTORY_INDEX,
+        ),
+        (
+            "mensagens recentes do usuário",
+            select(ChatMessage)
+            .where(ChatMessage.user_id == 1)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(5),
+            USER_INDEX,
+        ),
+        (
+            "lista de conversas (sidebar)",
+            select(Conversation)
+            .where(Conversation.user_id == 1)
+            .order_by(Conversation.updated_at.desc()),
+            SIDEBAR_INDEX,
+        ),
+    ]
+
+
+# Tabelas que a revisão baseline (0eecc261f479) assume já existentes
+PRE_BASELINE_SCHEMA = (
+    """
+    CREATE TABLE users (
+        id INTEGER NOT NULL PRIMARY KEY,
+        username VARCHAR(50) NOT NULL,
+        email VARCHAR(255),
+        hashed_password VARCHAR(255) NOT NULL,
+        is_active BOOLEAN,
+        created_at DATETIME NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX ix_users_username ON users (username)",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    """
+    CREATE TABLE chat_messages (
+        id INTEGER NOT NULL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        content TEXT NOT NULL,
+        is_bot BOOLEAN NOT NULL,
+        created_at DATETIME NOT NULL
+    )
+    """,
+    "CREATE INDEX ix_chat_messages_id ON chat_messages (id)",
+)
+
+
+def migrate_sqlite(connection):
+    """Monta o schema com as migrações (alembic upgrade head) na conexão SQLite"""
+    from alembic import command
+    from alembic.config import Config
+
+    for statement in PRE_BASELINE_SCHEMA:
+        connection.execute(text(statement))
+    connection.commit()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "alembic"))
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+    connection.commit()
+
+
+def explain(connection, statement) -> str:
+    sql = str(
+        statement.compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+    if connection.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        return "\n".join(str(row[-1]) for row in rows)
+
+    rows = connection.execute(text(f"EXPLAIN {sql}")).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+def check_plan(dialect: str, plan: str, index_name: str) -> list:
+    problems = []
+    if index_name not in plan:
+        problems.append(f"índice {index_name} não utilizado")
+    if dialect == "sqlite" and "TEMP B-TREE" in plan:
+        problems.append("ordenação extra (USE TEMP B-TREE FOR ORDER BY)")
+    if dialect == "postgresql" and any(
+        line.strip().startswith("Sort") or "->  Sort" in line
+        for line in plan.splitlines()
+    ):
+        problems.append("ordenação extra (nó Sort)")
+    return problems
+
+
+def main() -> int:
+    url = os.getenv("DATABASE_URL", "sqlite://")
+    engine = create_engine(url)
+
+    failures = 0
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            migrate_sqlite(connection)
+        else:
+            # Tabelas pequenas de desenvolvimento favorecem seq scan; aqui só
+            # interessa saber se o índice atende a consulta
+            connection.execute(text("SET enable_seqscan = off"))
+
+        for description, statement, index_name in history_queries():
+            plan = explain(connection, statement)
+            problems = check_plan(engine.dialect.name, plan, index_name)
+            status = "✅" if not problems else "❌"
+            print(f"{status} {description} [{engine.dialect.name}]")
+            print("   " + plan.replace("\n", "\n   "))
+            for problem in problems:
+                print(f"   -> {problem}")
+            failures += bool(problems)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Memória por worker de um servidor multi-processo (gunicorn, uvicorn --workers)
+
+Lê /proc/<pid>/smaps_rollup do master e de cada processo filho e mostra
+RSS, PSS (a parte proporcional das páginas compartilhadas), compartilhada e
+privada. Com preload_app + gc.freeze (gunicorn.conf.py) a memória privada de
+cada worker deve ficar estável ao aumentar WEB_CONCURRENCY: os dados da
+Pokédex ficam nas páginas compartilhadas com o master.
+
+Uso (Linux):
+    python -m benchmarks.worker_memory <pid do master>
+    python -m benchmarks.worker_memory $(pgrep -f "gunicorn: master" | head -1)
+"""
+
+import argparse
+import sys
+from typing import Dict, List
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_rollup(pid: int) -> Dict[str, int]:
+    """Campos de smaps_rollup em kB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].rstrip(":") in FIELDS:
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values
+
+
+def children(pid: int) -> List[int]:
+    pids = []
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids = [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pid", type=int, help="PID do processo master")
+    args = parser.parse_args(argv)
+
+    header = f"{'processo':<14}{'RSS':>10}{'PSS':>10}{'compart.':>10}{'privada':>10}"
+    print(header + "   (MB)")
+    print("-" * len(header))
+
+    workers = children(args.pid)
+    total_pss = 0
+    worker_private = 0
+    for label, pid in [("master", args.pid)] + [(f"worker {p}", p) for p in workers]:
+        try:
+            mem = read_rollup(pid)
+        except OSError as e:
+            print(f"{label:<14} indisponível: {e}")
+            continue
+        shared = mem["Shared_Clean"] + mem["Shared_Dirty"]
+        private = mem["Private_Clean"] + mem["Private_Dirty"]
+        total_pss += mem["Pss"]
+        if pid != args.pid:
+            worker_private += private
+        print(
+            f"{label:<14}{mem['Rss'] / 1024:>10.1f}{mem['Pss'] / 1024:>10.1f}"
+            f"{shared / 1024:>10.1f}{private / 1024:>10.1f}"
+        )
+
+    print("-" * len(header))
+    print(f"{'total (PSS)':<14}{'':>10}{total_pss / 1024:>10.1f}")
+    if workers:
+        average = worker_private / len(workers) / 1024
+        print(f"{'média privada/worker':<24}{'':>20}{average:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Gunicorn com workers Uvicorn e dados da Pokédex carregados uma vez no master
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Com preload_app o master importa a aplicação e, em on_starting, baixa a
+lista de nomes da PokéAPI e monta o índice de autocomplete e a resposta
+pré-comprimida de /api/chat/pokemon-list. Os workers nascem por fork já com
+esses dados: as páginas são compartilhadas (copy-on-write) e o lifespan de
+cada worker encontra o cache carregado, sem novas chamadas à PokéAPI.
+
+gc.freeze() move esses objetos para uma geração que o coletor não visita;
+sem isso a primeira coleta em cada worker escreveria nos headers dos
+objetos e copiaria as páginas, e a memória cresceria com o número de
+workers.
+
+O que é por worker continua por worker: conexões do banco, clients HTTP,
+caches LRU preenchidos sob demanda, métricas e traces.
+
+Variáveis de ambiente:
+    WEB_CONCURRENCY  número de workers (default: núcleos da máquina)
+    BIND             endereço (default: 0.0.0.0:8000)
+"""
+
+import asyncio
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Gerações do LLM podem chegar perto de CHAT_REQUEST_TIMEOUT_SECONDS (60s)
+timeout = 90
+graceful_timeout = 30
+keepalive = 5
+
+# Os logs da aplicação já saem em JSON pelo logger "app"
+accesslog = None
+
+
+def on_starting(server):
+    """No master, antes do fork: dados compartilhados por todos os workers"""
+    from app.services.chat_service import load_pokemon_names_cache
+
+    # Sem conexões de banco aqui: sockets abertos no master seriam
+    # compartilhados pelos workers
+    asyncio.run(load_pokemon_names_cache())
+
+    gc.collect()
+    gc.freeze()
+    server.log.info(
+        "Dados da Pokédex carregados no master; %s objetos congelados",
+        gc.get_freeze_count(),
+    )
+
+
+def post_fork(server, worker):
+    """No worker recém-criado"""
+    from app.db.database import async_engine, engine
+
+    # Recomendação do SQLAlchemy para engines criadas antes do fork: o pool
+    # do worker começa vazio, sem tocar nas conexões (se houver) do master
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
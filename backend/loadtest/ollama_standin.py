@@ -0,0 +1,142 @@
+"""
+Stand-in local do Ollama para testes de carga determinísticos
+
+Implementa /api/chat (com e sem streaming), /api/tags e /api/version. As
+respostas são textos prontos, "gerados" a uma taxa configurável de tokens por
+segundo depois de um prefill proporcional ao tamanho do prompt.
+
+Uso:
+    uvicorn loadtest.ollama_standin:app --port 11435
+    OLLAMA_BASE_URL=http://127.0.0.1:11435 uvicorn app.main:app
+
+Variáveis de ambiente:
+    OLLAMA_STANDIN_TOKENS_PER_SECOND   Velocidade de geração (default 40)
+    OLLAMA_STANDIN_PREFILL_PER_SECOND  Velocidade de prefill do prompt (default 800)
+    OLLAMA_STANDIN_LATENCY_MS          Latência fixa antes do prefill (default 0)
+    OLLAMA_STANDIN_ERROR_RATE          Fração de respostas 500 entre 0 e 1 (default 0)
+    OLLAMA_STANDIN_SEED                Semente do gerador aleatório (default 42)
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+TOKENS_PER_SECOND = float(os.getenv("OLLAMA_STANDIN_TOKENS_PER_SECOND", "40"))
+PREFILL_PER_SECOND = float(os.getenv("OLLAMA_STANDIN_PREFILL_PER_SECOND", "800"))
+LATENCY_MS = float(os.getenv("OLLAMA_STANDIN_LATENCY_MS", "0"))
+ERROR_RATE = float(os.getenv("OLLAMA_STANDIN_ERROR_RATE", "0"))
+
+_random = random.Random(int(os.getenv("OLLAMA_STANDIN_SEED", "42")))
+
+# Uma resposta pronta por tipo de pergunta: single, comparação, equipe, livre
+CANNED_RESPONSES = [
+    "Ótima escolha! ⚡ Esse Pokémon tem stats equilibrados e se sai bem em "
+    "batalhas que exigem velocidade. Vale a pena treinar com ele!",
+    "Comparando os dois, o primeiro tem mais ataque e o segundo é mais "
+    "defensivo. 🛡️ ✅ Recomendo o primeiro se você busca agressividade!",
+    "🎯 Essa equipe cobre bem vários tipos: use os atacantes rápidos para "
+    "abrir a partida e os tanks para segurar os golpes mais fortes. 🔥",
+    "Olá, treinador! 🔴 Pergunte sobre qualquer Pokémon e eu trago stats, "
+    "tipos e dicas de batalha.",
+]
+
+app = FastAPI(title="Ollama stand-in")
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _tokens_for(messages: list, num_predict: int) -> list:
+    prompt = messages[-1]["content"] if messages else ""
+    if "Comparação" in prompt:
+        text = CANNED_RESPONSES[1]
+    elif "Equipe:" in prompt:
+        text = CANNED_RESPONSES[2]
+    elif "Contexto:" in prompt:
+        text = CANNED_RESPONSES[0]
+    else:
+        text = CANNED_RESPONSES[3]
+    pieces = text.split(" ")
+    tokens = [p + " " for p in pieces[:-1]] + pieces[-1:]
+    return tokens[:num_predict] if num_predict > 0 else tokens
+
+
+@app.get("/api/version")
+async def version():
+    return {"version": "0.0.0-standin"}
+
+
+@app.get("/api/tags")
+async def tags():
+    return {
+        "models": [
+            {"name": "llama3:latest", "model": "llama3:latest", "size": 0},
+            {"name": "llama3.2:latest", "model": "llama3.2:latest", "size": 0},
+        ]
+    }
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    started = time.perf_counter()
+    body = await request.json()
+    model = body.get("model", "")
+    messages = body.get("messages") or []
+    options = body.get("options") or {}
+    stream = body.get("stream", True)  # mesmo default da API real
+
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+
+    if ERROR_RATE and _random.random() < ERROR_RATE:
+        return JSONResponse({"error": "injected error"}, status_code=500)
+
+    prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+    await asyncio.sleep(prompt_tokens / PREFILL_PER_SECOND)
+    prefill_done = time.perf_counter()
+
+    tokens = _tokens_for(messages, int(options.get("num_predict", -1)))
+    interval = 1.0 / TOKENS_PER_SECOND
+
+    def final_chunk(content: str) -> dict:
+        now = time.perf_counter()
+        return {
+            "model": model,
+            "created_at": _timestamp(),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "total_duration": int((now - started) * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int((prefill_done - started) * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int((now - prefill_done) * 1e9),
+        }
+
+    if not stream:
+        await asyncio.sleep(len(tokens) * interval)
+        return final_chunk("".join(tokens))
+
+    async def generate():
+        for token in tokens:
+            await asyncio.sleep(interval)
+            chunk = {
+                "model": model,
+                "created_at": _timestamp(),
+                "message": {"role": "assistant", "content": token},
+                "done": False,
+            }
+            yield json.dumps(chunk, ensure_ascii=False) + "\n"
+        yield json.dumps(final_chunk(""), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
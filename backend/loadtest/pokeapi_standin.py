@@ -0,0 +1,233 @@
+"""
+Stand-in local da PokéAPI para testes de carga determinísticos
+
+Serve respostas no formato da PokéAPI (/pokemon, /type, /pokemon-species e
+/evolution-chain) a partir de loadtest/fixtures/pokedex.json, com latência e
+taxa de erro configuráveis.
+
+Uso:
+    uvicorn loadtest.pokeapi_standin:app --port 8081
+    POKEAPI_BASE_URL=http://127.0.0.1:8081/api/v2 uvicorn app.main:app
+
+Variáveis de ambiente:
+    POKEAPI_STANDIN_LATENCY_MS    Latência média por requisição (default 0)
+    POKEAPI_STANDIN_JITTER_MS     Variação uniforme (+/-) da latência (default 0)
+    POKEAPI_STANDIN_ERROR_RATE    Fração de respostas 503 entre 0 e 1 (default 0)
+    POKEAPI_STANDIN_SEED          Semente do gerador aleatório (default 42)
+    POKEAPI_STANDIN_FIXTURE       Caminho alternativo para o snapshot
+"""
+
+import asyncio
+import json
+import os
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+FIXTURE_PATH = Path(
+    os.getenv(
+        "POKEAPI_STANDIN_FIXTURE",
+        Path(__file__).parent / "fixtures" / "pokedex.json",
+    )
+)
+LATENCY_MS = float(os.getenv("POKEAPI_STANDIN_LATENCY_MS", "0"))
+JITTER_MS = float(os.getenv("POKEAPI_STANDIN_JITTER_MS", "0"))
+ERROR_RATE = float(os.getenv("POKEAPI_STANDIN_ERROR_RATE", "0"))
+
+API_PREFIX = "/api/v2"
+SPRITE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{id}.png"
+
+_random = random.Random(int(os.getenv("POKEAPI_STANDIN_SEED", "42")))
+
+
+class PokedexSnapshot:
+    """Índices em memória sobre o snapshot"""
+
+    def __init__(self, path: Path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        self.stat_names: List[str] = data["stat_names"]
+        self.pokemon: List[dict] = sorted(data["pokemon"], key=lambda p: p["id"])
+        self.by_id: Dict[int, dict] = {p["id"]: p for p in self.pokemon}
+        self.by_name: Dict[str, dict] = {p["name"]: p for p in self.pokemon}
+
+        self.chains: Dict[int, List[List[int]]] = {}
+        self.chain_of_species: Dict[int, int] = {}
+        for chain_id, stages in enumerate(data["evolution_chains"], start=1):
+            self.chains[chain_id] = stages
+            for stage in stages:
+                for species_id in stage:
+                    self.chain_of_species[species_id] = chain_id
+
+        self.types: Dict[str, List[dict]] = {}
+        for p in self.pokemon:
+            for type_name in p["types"]:
+                self.types.setdefault(type_name, []).append(p)
+
+    def find(self, identifier: str) -> Optional[dict]:
+        if identifier.isdigit():
+            return self.by_id.get(int(identifier))
+        return self.by_name.get(identifier.lower())
+
+
+snapshot = PokedexSnapshot(FIXTURE_PATH)
+app = FastAPI(title="PokéAPI stand-in")
+
+
+@app.middleware("http")
+async def inject_latency_and_errors(request: Request, call_next):
+    if LATENCY_MS or JITTER_MS:
+        delay = LATENCY_MS + _random.uniform(-JITTER_MS, JITTER_MS)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+    if ERROR_RATE and _random.random() < ERROR_RATE:
+        return JSONResponse({"detail": "injected error"}, status_code=503)
+
+    return await call_next(request)
+
+
+def _base(request: Request) -> str:
+    return str(request.base_url).rstrip("/") + API_PREFIX
+
+
+def _resource(request: Request, kind: str, name: str, resource_id) -> dict:
+    return {"name": name, "url": f"{_base(request)}/{kind}/{resource_id}/"}
+
+
+def _species_id(pokemon: dict) -> int:
+    # Formas alternativas (Megas) apontam para a espécie base
+    return pokemon.get("species_id", pokemon["id"])
+
+
+@app.get(API_PREFIX + "/pokemon")
+@app.get(API_PREFIX + "/pokemon/")
+async def list_pokemon(request: Request, limit: int = 20, offset: int = 0):
+    page = snapshot.pokemon[offset : offset + limit]
+    total = len(snapshot.pokemon)
+    base = f"{_base(request)}/pokemon"
+    return {
+        "count": total,
+        "next": (
+            f"{base}?offset={offset + limit}&limit={limit}"
+            if offset + limit < total
+            else None
+        ),
+        "previous": (
+            f"{base}?offset={max(0, offset - limit)}&limit={limit}" if offset else None
+        ),
+        "results": [
+            {"name": p["name"], "url": f"{base}/{p['id']}/"} for p in page
+        ],
+    }
+
+
+@app.get(API_PREFIX + "/pokemon/{identifier}")
+@app.get(API_PREFIX + "/pokemon/{identifier}/")
+async def get_pokemon(request: Request, identifier: str):
+    pokemon = snapshot.find(identifier)
+    if not pokemon:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    stats = pokemon["stats"]
+    species_id = _species_id(pokemon)
+    species = snapshot.by_id[species_id]
+    return {
+        "id": pokemon["id"],
+        "name": pokemon["name"],
+        # Campos não usados pelo app são sintéticos, mas determinísticos
+        "height": 5 + sum(stats) // 60,
+        "weight": 50 + sum(stats) // 2,
+        "base_experience": sum(stats) // 3,
+        "abilities": [],
+        "sprites": {
+            "front_default": SPRITE_URL.format(id=pokemon["id"]),
+            "front_shiny": None,
+            "back_default": None,
+            "back_shiny": None,
+        },
+        "types": [
+            {"slot": slot, "type": _resource(request, "type", name, name)}
+            for slot, name in enumerate(pokemon["types"], start=1)
+        ],
+        "stats": [
+            {
+                "base_stat": value,
+                "effort": 0,
+                "stat": _resource(request, "stat", name, index),
+            }
+            for index, (name, value) in enumerate(
+                zip(snapshot.stat_names, stats), start=1
+            )
+        ],
+        "species": _resource(request, "pokemon-species", species["name"], species_id),
+    }
+
+
+@app.get(API_PREFIX + "/pokemon-species/{identifier}")
+@app.get(API_PREFIX + "/pokemon-species/{identifier}/")
+async def get_species(request: Request, identifier: str):
+    pokemon = snapshot.find(identifier)
+    if not pokemon or "species_id" in pokemon:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    chain_id = snapshot.chain_of_species[pokemon["id"]]
+    return {
+        "id": pokemon["id"],
+        "name": pokemon["name"],
+        "evolution_chain": {"url": f"{_base(request)}/evolution-chain/{chain_id}/"},
+        "varieties": [
+            {
+                "is_default": p["id"] == pokemon["id"],
+                "pokemon": _resource(request, "pokemon", p["name"], p["id"]),
+            }
+            for p in snapshot.pokemon
+            if _species_id(p) == pokemon["id"]
+        ],
+    }
+
+
+@app.get(API_PREFIX + "/evolution-chain/{chain_id}")
+@app.get(API_PREFIX + "/evolution-chain/{chain_id}/")
+async def get_evolution_chain(request: Request, chain_id: int):
+    stages = snapshot.chains.get(chain_id)
+    if not stages:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    def link(species_id: int, depth: int) -> dict:
+        species = snapshot.by_id[species_id]
+        next_stage = stages[depth + 1] if depth + 1 < len(stages) else []
+        return {
+            "is_baby": False,
+            "species": _resource(request, "pokemon-species", species["name"], species_id),
+            # Só o primeiro Pokémon de cada estágio tem evoluções
+            "evolves_to": (
+                [link(next_id, depth + 1) for next_id in next_stage]
+                if species_id == stages[depth][0]
+                else []
+            ),
+        }
+
+    return {"id": chain_id, "chain": link(stages[0][0], 0)}
+
+
+@app.get(API_PREFIX + "/type/{type_name}")
+@app.get(API_PREFIX + "/type/{type_name}/")
+async def get_type(request: Request, type_name: str):
+    members = snapshot.types.get(type_name.lower())
+    if members is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    return {
+        "name": type_name.lower(),
+        "pokemon": [
+            {
+                "slot": p["types"].index(type_name.lower()) + 1,
+                "pokemon": _resource(request, "pokemon", p["name"], p["id"]),
+            }
+            for p in members
+        ],
+    }
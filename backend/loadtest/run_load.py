@@ -0,0 +1,470 @@
+"""
+Teste de carga ponta a ponta do backend
+
+Simula usuários virtuais que fazem login e então executam uma mistura
+ponderada de operações (chat single/comparação/equipe, histórico, lista de
+conversas e lista de Pokémon) contra um backend em execução. O relatório em
+JSON traz throughput, p50/p95/p99, taxa de erro e bytes (decodificados e
+trafegados) por endpoint. Com --server-pid, inclui também o tempo de CPU do
+backend por requisição. O atraso do event loop e os bloqueios detectados
+pelo backend (lidos de /metrics antes e depois da carga) também entram; com
+--max-loop-blocks o comando falha se houver mais bloqueios que o permitido.
+
+Uso:
+    # Executa a carga e salva o relatório
+    python -m loadtest.run_load run --base-url http://127.0.0.1:8000 \\
+        --users 20 --duration 60 --output results/branch.json --label branch
+
+    # Sem compressão, medindo a CPU do backend (bytes economizados e custo)
+    python -m loadtest.run_load run --accept-encoding identity --server-pid 1234 \\
+        --output results/identity.json --label identity
+
+    # Guarda de regressão: falha se o event loop bloquear durante a carga
+    python -m loadtest.run_load run --duration 30 --max-loop-blocks 0
+
+    # Compara dois relatórios (baseline vs branch)
+    python -m loadtest.run_load compare results/baseline.json results/branch.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+DEFAULT_MIX = {
+    "chat_single": 30,
+    "chat_compare": 10,
+    "chat_team": 5,
+    "history": 25,
+    "conversations": 20,
+    "pokemon_list": 10,
+}
+
+SINGLE_MESSAGES = [
+    "me fale sobre pikachu",
+    "quais são as stats do charizard?",
+    "mostre informações do gengar",
+    "quero saber sobre dragonite",
+    "fale sobre pikaxu",  # força a correção por fuzzy matching
+    "conta sobre o snorlax",
+]
+COMPARE_MESSAGES = [
+    "compare charizard vs blastoise",
+    "comparar pikachu e raichu",
+    "gengar versus alakazam",
+    "compare dragonite vs gyarados",
+]
+TEAM_MESSAGES = [
+    "monte uma equipe de fogo",
+    "sugira um time ofensivo",
+    "monte uma equipe balanceada",
+    "recomende uma equipe rápida de água",
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil pelo método nearest-rank (valores já ordenados)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    response_bytes: int = 0
+    wire_bytes: int = 0  # corpo como trafegou (comprimido, se for o caso)
+
+    def record(
+        self, latency_ms: float, status_code: Optional[int], size: int, wire_size: int = 0
+    ):
+        self.latencies_ms.append(latency_ms)
+        key = str(status_code) if status_code is not None else "exception"
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+        self.response_bytes += size
+        self.wire_bytes += wire_size
+
+    def summary(self, elapsed: float) -> dict:
+        values = sorted(self.latencies_ms)
+        count = len(values)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(values) / count, 2) if count else 0.0,
+                "p50": round(percentile(values, 50), 2),
+                "p95": round(percentile(values, 95), 2),
+                "p99": round(percentile(values, 99), 2),
+                "max": round(values[-1], 2) if values else 0.0,
+            },
+            "avg_response_bytes": round(self.response_bytes / count) if count else 0,
+            "avg_wire_bytes": round(self.wire_bytes / count) if count else 0,
+            "status_codes": self.status_codes,
+        }
+
+
+class VirtualUser:
+    """Um usuário com sua própria conversa executando a mistura de operações"""
+
+    def __init__(self, client: httpx.AsyncClient, index: int, run_id: str, rng):
+        self.client = client
+        self.username = f"load_{run_id}_{index}"
+        self.password = "loadtest-password"
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+        self.conversation_id: Optional[int] = None
+
+    async def setup(self):
+        await self.client.post(
+            "/api/auth/register",
+            json={
+                "username": self.username,
+                "email": f"{self.username}@example.com",
+                "password": self.password,
+            },
+        )
+        response = await self.client.post(
+            "/api/auth/login",
+            data={"username": self.username, "password": self.password},
+        )
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = await self.client.post(
+            "/api/conversations/",
+            json={"title": "Nova Conversa"},
+            headers=self.headers,
+        )
+        response.raise_for_status()
+        self.conversation_id = response.json()["id"]
+
+    def _chat(self, messages: List[str]) -> Callable:
+        def request():
+            return self.client.post(
+                "/api/chat/message",
+                json={
+                    "message": self.rng.choice(messages),
+                    "conversation_id": self.conversation_id,
+                },
+                headers=self.headers,
+            )
+
+        return request
+
+    def operations(self) -> Dict[str, Callable]:
+        return {
+            "chat_single": self._chat(SINGLE_MESSAGES),
+            "chat_compare": self._chat(COMPARE_MESSAGES),
+            "chat_team": self._chat(TEAM_MESSAGES),
+            "history": lambda: self.client.get(
+                "/api/chat/history",
+                params={"conversation_id": self.conversation_id},
+                headers=self.headers,
+            ),
+            "conversations": lambda: self.client.get(
+                "/api/conversations/", headers=self.headers
+            ),
+            "pokemon_list": lambda: self.client.get("/api/chat/pokemon-list"),
+        }
+
+
+async def _user_loop(
+    user: VirtualUser,
+    mix: Dict[str, int],
+    stats: Dict[str, EndpointStats],
+    stop_at: float,
+    think_time: float,
+):
+    operations = user.operations()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    while time.monotonic() < stop_at:
+        name = user.rng.choices(names, weights=weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await operations[name]()
+            status_code, size = response.status_code, len(response.content)
+            wire_size = response.num_bytes_downloaded
+        except httpx.HTTPError:
+            status_code, size, wire_size = None, 0, 0
+        stats[name].record(
+            (time.perf_counter() - started) * 1000, status_code, size, wire_size
+        )
+
+        if think_time:
+            await asyncio.sleep(user.rng.uniform(0, think_time))
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _process_cpu_seconds(pid: int) -> Optional[float]:
+    """utime + stime de um processo (Linux, via /proc)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # Campos 14 e 15 do stat; fields começa no campo 3
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+LOOP_METRICS = (
+    "event_loop_blocked_total",
+    "event_loop_lag_seconds_sum",
+    "event_loop_lag_seconds_count",
+)
+
+
+async def _loop_metrics(client: httpx.AsyncClient) -> Optional[Dict[str, float]]:
+    """Contadores do monitor do event loop em /metrics (None se indisponível)"""
+    try:
+        response = await client.get("/metrics")
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    values = {}
+    for line in response.text.splitlines():
+        name, _, value = line.partition(" ")
+        if name in LOOP_METRICS:
+            values[name] = float(value)
+    return values if len(values) == len(LOOP_METRICS) else None
+
+
+def _event_loop_summary(before: Dict[str, float], after: Dict[str, float]) -> dict:
+    delta = {name: after[name] - before[name] for name in LOOP_METRICS}
+    ticks = delta["event_loop_lag_seconds_count"]
+    return {
+        "blocked": int(delta["event_loop_blocked_total"]),
+        "avg_lag_ms": round(delta["event_loop_lag_seconds_sum"] * 1000 / ticks, 3)
+        if ticks
+        else 0.0,
+    }
+
+
+async def run_load(args) -> dict:
+    mix = dict(DEFAULT_MIX)
+    for item in args.mix or []:
+        name, weight = item.split("=")
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Operação desconhecida no --mix: {name}")
+        mix[name] = int(weight)
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+
+    rng = random.Random(args.seed)
+    run_id = f"{int(time.time())}{rng.randint(0, 999):03d}"
+    stats = {name: EndpointStats() for name in mix}
+
+    limits = httpx.Limits(max_connections=args.users * 2)
+    headers = {"Accept-Encoding": args.accept_encoding} if args.accept_encoding else None
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits, headers=headers
+    ) as client:
+        users = [
+            VirtualUser(client, i, run_id, random.Random(rng.random()))
+            for i in range(args.users)
+        ]
+        print(f"👥 Preparando {len(users)} usuários virtuais...", file=sys.stderr)
+        await asyncio.gather(*(user.setup() for user in users))
+
+        print(f"🚀 Carga por {args.duration}s...", file=sys.stderr)
+        cpu_before = _process_cpu_seconds(args.server_pid) if args.server_pid else None
+        loop_before = await _loop_metrics(client)
+        started = time.monotonic()
+        stop_at = started + args.duration
+        await asyncio.gather(
+            *(_user_loop(user, mix, stats, stop_at, args.think_time) for user in users)
+        )
+        elapsed = time.monotonic() - started
+        cpu_after = _process_cpu_seconds(args.server_pid) if args.server_pid else None
+        loop_after = await _loop_metrics(client)
+
+    all_stats = EndpointStats()
+    for endpoint_stats in stats.values():
+        all_stats.latencies_ms.extend(endpoint_stats.latencies_ms)
+        all_stats.errors += endpoint_stats.errors
+        all_stats.response_bytes += endpoint_stats.response_bytes
+        all_stats.wire_bytes += endpoint_stats.wire_bytes
+        for code, count in endpoint_stats.status_codes.items():
+            all_stats.status_codes[code] = all_stats.status_codes.get(code, 0) + count
+
+    total = all_stats.summary(elapsed)
+    if cpu_before is not None and cpu_after is not None and total["requests"]:
+        total["server_cpu_ms_per_request"] = round(
+            (cpu_after - cpu_before) * 1000 / total["requests"], 3
+        )
+
+    report = {
+        "label": args.label,
+        "git_revision": _git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "base_url": args.base_url,
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_time_s": args.think_time,
+            "seed": args.seed,
+            "accept_encoding": args.accept_encoding,
+            "mix": mix,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "total": total,
+        "endpoints": {name: s.summary(elapsed) for name, s in stats.items()},
+    }
+    if loop_before is not None and loop_after is not None:
+        report["event_loop"] = _event_loop_summary(loop_before, loop_after)
+    return report
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare_reports(baseline: dict, branch: dict) -> dict:
+    """Diferenças por endpoint entre dois relatórios"""
+    result = {}
+    names = ["total"] + sorted(
+        set(baseline["endpoints"]) | set(branch["endpoints"])
+    )
+    for name in names:
+        before = baseline.get(name) if name == "total" else baseline["endpoints"].get(name)
+        after = branch.get(name) if name == "total" else branch["endpoints"].get(name)
+        if not before or not after:
+            continue
+        result[name] = {
+            "throughput_rps": [before["throughput_rps"], after["throughput_rps"]],
+            "error_rate": [before["error_rate"], after["error_rate"]],
+            "avg_wire_bytes": [before.get("avg_wire_bytes", 0), after.get("avg_wire_bytes", 0)],
+            **{
+                pct: [before["latency_ms"][pct], after["latency_ms"][pct]]
+                for pct in ("p50", "p95", "p99")
+            },
+        }
+        if "server_cpu_ms_per_request" in before and "server_cpu_ms_per_request" in after:
+            result[name]["cpu_ms_per_req"] = [
+                before["server_cpu_ms_per_request"],
+                after["server_cpu_ms_per_request"],
+            ]
+    if "event_loop" in baseline and "event_loop" in branch:
+        result["event_loop"] = {
+            metric: [baseline["event_loop"][metric], branch["event_loop"][metric]]
+            for metric in ("avg_lag_ms", "blocked")
+        }
+    return result
+
+
+def print_comparison(baseline: dict, branch: dict, diff: dict):
+    print(f"baseline: {baseline.get('label')} ({baseline.get('git_revision')})")
+    print(f"branch:   {branch.get('label')} ({branch.get('git_revision')})\n")
+    header = f"{'endpoint':<15}{'metric':<16}{'baseline':>12}{'branch':>12}{'delta':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, metrics in diff.items():
+        for metric, (before, after) in metrics.items():
+            print(
+                f"{name:<15}{metric:<16}{before:>12}{after:>12}{_delta(before, after):>10}"
+            )
+        print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Executa a carga e gera o relatório JSON")
+    run.add_argument("--base-url", default="http://127.0.0.1:8000")
+    run.add_argument("--users", type=int, default=10)
+    run.add_argument("--duration", type=float, default=30.0, help="segundos")
+    run.add_argument("--think-time", type=float, default=0.0, help="pausa máx. (s)")
+    run.add_argument("--timeout", type=float, default=120.0)
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--label", default="run")
+    run.add_argument(
+        "--accept-encoding",
+        help="Accept-Encoding enviado (default do httpx: gzip, deflate, br)",
+    )
+    run.add_argument(
+        "--server-pid", type=int, help="PID do backend para medir CPU por requisição"
+    )
+    run.add_argument(
+        "--mix",
+        nargs="*",
+        metavar="OP=PESO",
+        help=f"ajusta pesos; operações: {', '.join(DEFAULT_MIX)}",
+    )
+    run.add_argument(
+        "--max-loop-blocks",
+        type=int,
+        help="falha (exit 1) se o event loop bloquear mais vezes que isso",
+    )
+    run.add_argument("--output", help="arquivo JSON de saída (default: stdout)")
+
+    cmp_parser = sub.add_parser("compare", help="Compara baseline vs branch")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("branch")
+    cmp_parser.add_argument("--output", help="salva a comparação em JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = asyncio.run(run_load(args))
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            print(f"✅ Relatório salvo em {args.output}", file=sys.stderr)
+        else:
+            print(text)
+
+        if args.max_loop_blocks is not None:
+            if "event_loop" not in report:
+                print("❌ /metrics sem o monitor do event loop", file=sys.stderr)
+                return 1
+            blocked = report["event_loop"]["blocked"]
+            if blocked > args.max_loop_blocks:
+                print(
+                    f"❌ Event loop bloqueado {blocked}x (máximo {args.max_loop_blocks});"
+                    " as pilhas estão no log do backend",
+                    file=sys.stderr,
+                )
+                return 1
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.branch, encoding="utf-8") as f:
+            branch = json.load(f)
+        diff = compare_reports(baseline, branch)
+        print_comparison(baseline, branch, diff)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(diff, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""
+Configuração comum dos testes
+
+As settings são lidas no import de app.core.config: os valores abaixo só
+valem quando o ambiente não define outros.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
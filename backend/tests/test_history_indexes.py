@@ -0,0 +1,36 @@
+"""
+Índices das consultas de histórico no schema das migrações
+
+O schema vem de alembic upgrade head (não de Base.metadata.create_all): um
+índice que exista no modelo mas falte numa migração faz o teste falhar.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks.explain_history_queries import (
+    check_plan,
+    explain,
+    history_queries,
+    migrate_sqlite,
+)
+
+
+@pytest.fixture(scope="module")
+def migrated_connection():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        migrate_sqlite(connection)
+        yield connection
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "description, statement, index_name",
+    history_queries(),
+    ids=[query[0] for query in history_queries()],
+)
+def test_history_query_uses_index(migrated_connection, description, statement, index_name):
+    plan = explain(migrated_connection, statement)
+
+    assert check_plan("sqlite", plan, index_name) == [], plan
@@ -0,0 +1,120 @@
+"""
+Paginação por keyset do histórico (ConversationService.get_messages_page)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.database import Base
+from app.db.models import ChatMessage, Conversation, User
+from app.services.conversation_service import conversation_service
+
+# Mais páginas que isso indica um cursor que não avança
+MAX_PAGES = 100
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _create_conversation(db) -> Conversation:
+    user = User(username="ash", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    conversation = Conversation(
+        user_id=user.id,
+        title="Teste",
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+    )
+    db.add(conversation)
+    await db.flush()
+    return conversation
+
+
+async def _all_pages(db, conversation_id: int, limit: int):
+    """ids de cada página, da mais recente à mais antiga"""
+    pages = []
+    before_id = None
+    for _ in range(MAX_PAGES):
+        page, before_id = await conversation_service.get_messages_page(
+            db, conversation_id, before_id, limit
+        )
+        pages.append([message.id for message in page])
+        if before_id is None:
+            return pages
+    pytest.fail(f"cursor não avança: {pages[-3:]}")
+
+
+def _assert_covers_once(pages, expected_ids):
+    ids = [message_id for page in pages for message_id in page]
+    assert len(ids) == len(set(ids)), f"ids repetidos entre páginas: {pages}"
+    assert sorted(ids) == sorted(expected_ids)
+    # Mais recentes primeiro; dentro da página, ordem cronológica
+    assert pages[0][-1] == max(expected_ids)
+    assert all(page == sorted(page) for page in pages)
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 50])
+async def test_pages_cover_every_message_once(db, limit):
+    conversation = await _create_conversation(db)
+    # Pares pergunta/resposta com o mesmo created_at: o id desempata
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    for i in range(8):
+        db.add(
+            ChatMessage(
+                conversation_id=conversation.id,
+                user_id=conversation.user_id,
+                content=f"mensagem {i}",
+                is_bot=bool(i % 2),
+                created_at=start + timedelta(seconds=i // 2),
+            )
+        )
+    await db.commit()
+
+    pages = await _all_pages(db, conversation.id, limit)
+
+    _assert_covers_once(pages, range(1, 9))
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 50])
+async def test_pages_with_database_timestamps(db, limit):
+    """created_at do server_default (utcnow) comparado com o cursor"""
+    conversation = await _create_conversation(db)
+    # Um INSERT por mensagem; timestamps do banco misturados aos da aplicação
+    for i in range(8):
+        db.add(
+            ChatMessage(
+                conversation_id=conversation.id,
+                user_id=conversation.user_id,
+                content=f"mensagem {i}",
+                is_bot=bool(i % 2),
+                created_at=datetime.utcnow() if i == 0 else None,
+            )
+        )
+        await db.flush()
+    await db.commit()
+
+    pages = await _all_pages(db, conversation.id, limit)
+
+    _assert_covers_once(pages, range(1, 9))
+
+
+async def test_unknown_cursor_returns_empty_page(db):
+    conversation = await _create_conversation(db)
+    await db.commit()
+
+    page, next_cursor = await conversation_service.get_messages_page(
+        db, conversation.id, 999, 10
+    )
+
+    assert page == []
+    assert next_cursor is None
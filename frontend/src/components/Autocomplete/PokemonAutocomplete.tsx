@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Pokemon } from '../../types/pokemon';
+import { api } from '../../services/axiosConfig';
 import './PokemonAutocomplete.css';
 
 interface PokemonAutocompleteProps {
@@ -7,7 +8,12 @@ interface PokemonAutocompleteProps {
   onChange: (value: string) => void;
   onSelect: (pokemon: string) => void;
   placeholder?: string;
-  pokemonList: Pokemon[];
+}
+
+interface SuggestResponse {
+  query: string;
+  fuzzy: boolean;
+  suggestions: Pokemon[];
 }
 
 const formatPokemonName = (name: string): string => {
@@ -27,7 +33,6 @@ function PokemonAutocomplete({
   onChange,
   onSelect,
   placeholder = 'Digite o nome do Pokémon...',
-  pokemonList,
 }: PokemonAutocompleteProps) {
   const [suggestions, setSuggestions] = useState<Pokemon[]>([]);
   const [showSuggestions, setShowSuggestions] = useState(false);
@@ -63,30 +68,39 @@ function PokemonAutocomplete({
     };
   }, [showSuggestions]);
 
-  // Filtro com debounce de 300ms
+  // Sugestões do servidor com debounce de 300ms; respostas de buscas
+  // anteriores que chegam atrasadas são descartadas
   useEffect(() => {
-    const timer = setTimeout(() => {
-      if (value.length >= 2) {
-        const filtered = pokemonList
-          .filter((pokemon) => {
-            const search = value.toLowerCase();
-            return (
-              pokemon.name.toLowerCase().includes(search) ||
-              formatPokemonName(pokemon.name).toLowerCase().includes(search)
-            );
-          })
-          .slice(0, 8);
-        setSuggestions(filtered);
-        setShowSuggestions(filtered.length > 0);
+    let cancelled = false;
+
+    const timer = setTimeout(async () => {
+      if (value.trim().length >= 2) {
+        try {
+          const response = await api.get<SuggestResponse>('/api/pokemon/suggest', {
+            params: { q: value.trim(), limit: 8 },
+          });
+          if (cancelled) return;
+          const results = response.data.suggestions || [];
+          setSuggestions(results);
+          setShowSuggestions(results.length > 0);
+        } catch (error) {
+          if (cancelled) return;
+          console.error('Erro ao buscar sugestões:', error);
+          setSuggestions([]);
+          setShowSuggestions(false);
+        }
       } else {
         setSuggestions([]);
         setShowSuggestions(false);
       }
-      setSelectedIndex(-1);
+      if (!cancelled) setSelectedIndex(-1);
     }, 300);
 
-    return () => clearTimeout(timer);
-  }, [value, pokemonList]);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [value]);
 
   // Fecha dropdown ao clicar fora
   useEffect(() => {
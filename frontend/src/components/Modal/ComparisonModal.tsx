@@ -1,16 +1,14 @@
 import React, { useState } from 'react';
-import { Pokemon } from '../../types/pokemon';
 import PokemonAutocomplete from '../Autocomplete/PokemonAutocomplete';
 import './SearchModal.css';
 
 interface ComparisonModalProps {
   isOpen: boolean;
   onClose: () => void;
-  pokemonList: Pokemon[];
   onCompare: (pokemon1: string, pokemon2: string) => void;
 }
 
-function ComparisonModal({ isOpen, onClose, pokemonList, onCompare }: ComparisonModalProps) {
+function ComparisonModal({ isOpen, onClose, onCompare }: ComparisonModalProps) {
   const [pokemon1, setPokemon1] = useState('');
   const [pokemon2, setPokemon2] = useState('');
 
@@ -55,7 +53,6 @@ function ComparisonModal({ isOpen, onClose, pokemonList, onCompare }: Comparison
                 onChange={setPokemon1}
                 onSelect={setPokemon1}
                 placeholder="Ex: Charizard"
-                pokemonList={pokemonList}
               />
             </div>
 
@@ -70,7 +67,6 @@ function ComparisonModal({ isOpen, onClose, pokemonList, onCompare }: Comparison
                 onChange={setPokemon2}
                 onSelect={setPokemon2}
                 placeholder="Ex: Blastoise"
-                pokemonList={pokemonList}
               />
             </div>
 
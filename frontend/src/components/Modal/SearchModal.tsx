@@ -1,16 +1,14 @@
 import React, { useState } from 'react';
-import { Pokemon } from '../../types/pokemon';
 import PokemonAutocomplete from '../Autocomplete/PokemonAutocomplete';
 import './SearchModal.css';
 
 interface SearchModalProps {
   isOpen: boolean;
   onClose: () => void;
-  pokemonList: Pokemon[];
   onSearch: (pokemon: string) => void;
 }
 
-function SearchModal({ isOpen, onClose, pokemonList, onSearch }: SearchModalProps) {
+function SearchModal({ isOpen, onClose, onSearch }: SearchModalProps) {
   const [searchValue, setSearchValue] = useState('');
 
   if (!isOpen) return null;
@@ -54,7 +52,6 @@ function SearchModal({ isOpen, onClose, pokemonList, onSearch }: SearchModalProp
               onChange={setSearchValue}
               onSelect={handleSelect}
               placeholder="Ex: pikachu, charizard, rayquaza..."
-              pokemonList={pokemonList}
             />
             <button
               className="modal-btn modal-btn-primary"
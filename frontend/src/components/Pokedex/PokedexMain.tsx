@@ -13,8 +13,6 @@ import ComparisonModal from '../Modal/ComparisonModal';
 import TeamModal from '../Modal/TeamModal';
 import { LogoutModal } from '../Modal/LogoutModal';
 import { TeamFilters } from '../Tabs/TeamTab';
-import { api } from '../../services/axiosConfig';
-import { Pokemon } from '../../types/pokemon';
 import './PokedexMain.css';
 
 type LoadingStatus = 'loading' | 'success' | 'error';
@@ -22,7 +20,6 @@ type LoadingStatus = 'loading' | 'success' | 'error';
 export const PokedexMain: React.FC = () => {
   const [inputMessage, setInputMessage] = useState('');
   const [loadingStatus, setLoadingStatus] = useState<LoadingStatus | null>(null);
-  const [pokemonList, setPokemonList] = useState<Pokemon[]>([]);
   const [isConversationLoading, setIsConversationLoading] = useState(false);
 
   const [activeModal, setActiveModal] = useState<'search' | 'comparison' | 'team' | 'logout' | null>(null);
@@ -30,7 +27,15 @@ export const PokedexMain: React.FC = () => {
   const messagesContainerRef = useRef<HTMLDivElement>(null);
   const navigate = useNavigate();
 
-  const { messages, sendMessage, loadHistory, clearMessages } = useChatStore();
+  const {
+    messages,
+    nextCursor,
+    isLoadingOlder,
+    sendMessage,
+    loadHistory,
+    loadOlderMessages,
+    clearMessages,
+  } = useChatStore();
   const logout = useAuthStore((state) => state.logout);
 
   const {
@@ -47,7 +52,6 @@ export const PokedexMain: React.FC = () => {
 
   useEffect(() => {
     fetchConversations();
-    fetchPokemonList();
   }, [fetchConversations]);
 
   useEffect(() => {
@@ -59,21 +63,14 @@ export const PokedexMain: React.FC = () => {
     }
   }, [activeConversationId, loadHistory]);
 
+  // Rola para o fim só quando chega mensagem nova; carregar mensagens
+  // anteriores (no topo) mantém a posição
+  const lastMessageId = messages[messages.length - 1]?.id;
   useEffect(() => {
     if (messagesContainerRef.current) {
       messagesContainerRef.current.scrollTop = messagesContainerRef.current.scrollHeight;
     }
-  }, [messages, loadingStatus]);
-
-  const fetchPokemonList = async () => {
-    try {
-      const response = await api.get('/api/chat/pokemon-list');
-      setPokemonList(response.data.pokemon || []);
-      console.log(`✅ Carregados ${response.data.count} Pokémon para autocomplete`);
-    } catch (error) {
-      console.error('❌ Erro ao carregar lista de Pokémon:', error);
-    }
-  };
+  }, [lastMessageId, loadingStatus]);
 
   const isBlocked = loadingStatus === 'loading' || isConversationLoading;
 
@@ -237,12 +234,23 @@ export const PokedexMain: React.FC = () => {
                 </ul>
               </div>
             ) : (
-              messages.map((msg, index) => (
-                <MessageBubble
-                  key={`${msg.id ?? index}-${index}`}
-                  message={msg}
-                />
-              ))
+              <>
+                {nextCursor !== null && (
+                  <button
+                    className="load-older-btn"
+                    onClick={() => loadOlderMessages(activeConversationId ?? undefined)}
+                    disabled={isLoadingOlder}
+                  >
+                    {isLoadingOlder ? '⏳ Carregando...' : '⬆️ Carregar mensagens anteriores'}
+                  </button>
+                )}
+                {messages.map((msg, index) => (
+                  <MessageBubble
+                    key={`${msg.id ?? index}-${index}`}
+                    message={msg}
+                  />
+                ))}
+              </>
             )}
 
             {/* Pokébola de loading */}
@@ -279,13 +287,11 @@ export const PokedexMain: React.FC = () => {
       <SearchModal
         isOpen={activeModal === 'search'}
         onClose={closeModal}
-        pokemonList={pokemonList}
         onSearch={handleSearch}
       />
       <ComparisonModal
         isOpen={activeModal === 'comparison'}
         onClose={closeModal}
-        pokemonList={pokemonList}
         onCompare={handleCompare}
       />
       <TeamModal
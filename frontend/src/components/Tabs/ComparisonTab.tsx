@@ -1,13 +1,11 @@
 import { useState } from 'react';
-import { Pokemon } from '../../types/pokemon';
 import PokemonAutocomplete from '../Autocomplete/PokemonAutocomplete';
 
 interface ComparisonTabProps {
-  pokemonList: Pokemon[];
   onCompare: (pokemon1: string, pokemon2: string) => void;
 }
 
-function ComparisonTab({ pokemonList, onCompare }: ComparisonTabProps) {
+function ComparisonTab({ onCompare }: ComparisonTabProps) {
   const [pokemon1, setPokemon1] = useState('');
   const [pokemon2, setPokemon2] = useState('');
 
@@ -32,7 +30,6 @@ function ComparisonTab({ pokemonList, onCompare }: ComparisonTabProps) {
               onChange={setPokemon1}
               onSelect={setPokemon1}
               placeholder="Ex: Charizard"
-              pokemonList={pokemonList}
             />
           </div>
 
@@ -47,7 +44,6 @@ function ComparisonTab({ pokemonList, onCompare }: ComparisonTabProps) {
               onChange={setPokemon2}
               onSelect={setPokemon2}
               placeholder="Ex: Blastoise"
-              pokemonList={pokemonList}
             />
           </div>
         </div>
@@ -1,13 +1,11 @@
 import { useState } from 'react';
-import { Pokemon } from '../../types/pokemon';
 import PokemonAutocomplete from '../Autocomplete/PokemonAutocomplete';
 
 interface SearchTabProps {
-  pokemonList: Pokemon[];
   onSearch: (pokemon: string) => void;
 }
 
-function SearchTab({ pokemonList, onSearch }: SearchTabProps) {
+function SearchTab({ onSearch }: SearchTabProps) {
   const [searchValue, setSearchValue] = useState('');
 
   const handleSearch = () => {
@@ -30,7 +28,6 @@ function SearchTab({ pokemonList, onSearch }: SearchTabProps) {
           onChange={setSearchValue}
           onSelect={handleSelect}
           placeholder="Digite o nome do Pokémon..."
-          pokemonList={pokemonList}
         />
         <button 
           className="search-button"
@@ -17,8 +17,12 @@ interface Message {
 interface ChatState {
   messages: Message[];
   isLoading: boolean;
+  // Cursor da página anterior do histórico (null = não há mensagens mais antigas)
+  nextCursor: number | null;
+  isLoadingOlder: boolean;
   sendMessage: (message: string, conversationId?: number) => Promise<void>;
   loadHistory: (conversationId?: number) => Promise<void>;
+  loadOlderMessages: (conversationId?: number) => Promise<void>;
   clearHistory: (conversationId?: number) => Promise<void>;
   clearMessages: () => void;
 }
@@ -26,6 +30,8 @@ interface ChatState {
 export const useChatStore = create<ChatState>((set, get) => ({
   messages: [],
   isLoading: false,
+  nextCursor: null,
+  isLoadingOlder: false,
 
   sendMessage: async (message: string, conversationId?: number) => {
     try {
@@ -105,7 +111,11 @@ export const useChatStore = create<ChatState>((set, get) => ({
       console.log(`📜 [CHAT] Carregando histórico (conversa: ${conversationId || 'padrão'})`);
       const response = await api.get(url);
 
-      set({ messages: response.data.messages, isLoading: false });
+      set({
+        messages: response.data.messages,
+        nextCursor: response.data.next_cursor ?? null,
+        isLoading: false,
+      });
       console.log(`✅ [CHAT] ${response.data.messages.length} mensagens carregadas`);
     } catch (error: any) {
       console.error('❌ [CHAT] Erro ao carregar histórico:', error);
@@ -113,18 +123,42 @@ export const useChatStore = create<ChatState>((set, get) => ({
     }
   },
 
+  loadOlderMessages: async (conversationId?: number) => {
+    const { nextCursor, isLoadingOlder } = get();
+    if (nextCursor === null || isLoadingOlder) return;
+
+    set({ isLoadingOlder: true });
+    try {
+      const params: Record<string, number> = { before_id: nextCursor };
+      if (conversationId) params.conversation_id = conversationId;
+
+      const response = await api.get('/api/chat/history', { params });
+
+      // Página mais antiga vai antes das mensagens já exibidas
+      set((state) => ({
+        messages: [...response.data.messages, ...state.messages],
+        nextCursor: response.data.next_cursor ?? null,
+        isLoadingOlder: false,
+      }));
+      console.log(`✅ [CHAT] ${response.data.messages.length} mensagens anteriores carregadas`);
+    } catch (error: any) {
+      console.error('❌ [CHAT] Erro ao carregar mensagens anteriores:', error);
+      set({ isLoadingOlder: false });
+    }
+  },
+
   clearHistory: async (conversationId?: number) => {
     try {
       const url = conversationId
         ? `/api/chat/history?conversation_id=${conversationId}`
         : '/api/chat/history';
       await api.delete(url);
-      set({ messages: [] });
+      set({ messages: [], nextCursor: null });
       console.log('✅ [CHAT] Histórico limpo');
     } catch (error: any) {
       console.error('❌ [CHAT] Erro ao limpar histórico:', error);
     }
   },
 
-  clearMessages: () => set({ messages: [] }),
+  clearMessages: () => set({ messages: [], nextCursor: null }),
 }));
\ No newline at end of file